@@ -0,0 +1,98 @@
+import threading
+import pandas as pd
+from scoring_system import score_corpus
+from leaderboard import Leaderboard
+from genre_stats import GenreSentiment
+from explanations import ExplanationStore
+from term_stats import MovieTermCounts
+from movie_reviews import MovieReviewIndex
+from distributions import ScoreDistributions
+from movie_profiles import MovieProfiles
+
+"""
+Per-review scores for the whole corpus and the structures derived from them
+
+Scoring is the expensive part, so the corpus is scored once by build() and
+every later review is scored once by add_reviews(), which then updates each
+derived structure incrementally. The scores of added reviews are kept in a
+list of small frames and only concatenated onto the full table when it is
+read, so a write does not copy every score.
+"""
+
+
+class Analytics:
+    def __init__(self, processor, min_reviews=5):
+        """
+        processor: TextProcessor used for scoring
+        min_reviews: minimum reviews for a movie to be ranked
+        """
+        self.processor = processor
+        self.min_reviews = min_reviews
+        self._scores = None  # DataFrame from score_corpus: Review ID, Movie Title, Genres, Average Score
+        self._pending_scores = []  # scores of added reviews, not yet concatenated onto _scores
+        self._scores_lock = threading.Lock()
+        self.leaderboard = Leaderboard(min_reviews=min_reviews)
+        self.genres = GenreSentiment(min_reviews=min_reviews)
+        self.explanations = ExplanationStore()
+        self.term_counts = MovieTermCounts(processor.sentiment_dict)
+        self.movie_reviews = MovieReviewIndex()
+        self.distributions = ScoreDistributions()
+        self.profiles = MovieProfiles(min_reviews=min_reviews)
+
+    @property
+    def scores(self):
+        """Scores of every review so far, in review-id order"""
+        with self._scores_lock:
+            if self._pending_scores:
+                self._scores = pd.concat([self._scores] + self._pending_scores, ignore_index=True)
+                self._pending_scores = []
+            return self._scores
+
+    @scores.setter
+    def scores(self, scores):
+        with self._scores_lock:
+            self._scores, self._pending_scores = scores, []
+
+    def build(self, df_reviews):
+        """Score every review in df_reviews (review id = row position)"""
+        self.scores = score_corpus(df_reviews, self.processor, explanations=self.explanations,
+                                   term_counts=self.term_counts)
+        self.term_counts.compact()
+        self.leaderboard.add_scores(self.scores)
+        self.genres.build(self.scores)
+        self.movie_reviews.add_scores(self.scores)
+        self.distributions.build(self.scores)
+        self.profiles.add_scores(self.scores)
+        return self
+
+    @classmethod
+    def restore(cls, processor, scores, explanations, term_counts, min_reviews=5):
+        """Rebuild from saved scores and hit data without scoring anything (see warm_start.py)"""
+        analytics = cls(processor, min_reviews=min_reviews)
+        analytics.scores = scores
+        analytics.explanations = explanations
+        analytics.term_counts = term_counts
+        analytics.leaderboard.add_scores(scores)
+        analytics.genres.build(scores)
+        analytics.movie_reviews.add_scores(scores)
+        analytics.distributions.build(scores)
+        analytics.profiles.add_scores(scores)
+        return analytics
+
+    def add_reviews(self, df_new, start_id):
+        """
+        Score newly appended reviews and update every derived structure
+        df_new: the appended rows, in order
+        start_id: review id of the first appended row
+        """
+        new_scores = score_corpus(df_new, self.processor, start_id=start_id, explanations=self.explanations,
+                                  term_counts=self.term_counts)
+        with self._scores_lock:
+            self._pending_scores.append(new_scores)
+        for title, genres, score in zip(new_scores["Movie Title"], new_scores["Genres"], new_scores["Average Score"]):
+            self.leaderboard.add(title, score)
+            self.genres.add(title, genres, score)
+            self.distributions.add(title, genres, score)
+        self.movie_reviews.add_scores(new_scores)
+        self.profiles.add_scores(new_scores)
+        return new_scores
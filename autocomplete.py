@@ -0,0 +1,65 @@
+import bisect
+import heapq
+import re
+
+"""
+Prefix autocomplete over movie titles
+"""
+
+
+def normalize_title(title):
+    """Lowercase, trim and collapse whitespace so titles compare the same way everywhere"""
+    return re.sub(r"\s+", " ", str(title).strip().lower())
+
+
+class TitleAutocomplete:
+    def __init__(self):
+        self.keys = []  # sorted normalised titles
+        self.titles = {}  # {normalised title: display title}
+        self.counts = {}  # {normalised title: review count}
+
+    def build(self, df, title_column="movie_title"):
+        """Load every title in df, counting one review per row"""
+        counts = df[title_column].dropna().value_counts()
+        for title, count in counts.items():
+            key = normalize_title(title)
+            self.titles.setdefault(key, title)
+            self.counts[key] = self.counts.get(key, 0) + int(count)
+        self.keys = sorted(self.counts)
+        return self
+
+    def add(self, title, count=1):
+        """Record new reviews for a title, inserting it if it is new"""
+        key = normalize_title(title)
+        if key not in self.counts:
+            bisect.insort(self.keys, key)
+            self.titles[key] = title
+            self.counts[key] = 0
+        self.counts[key] += count
+
+    def complete(self, prefix, limit=10):
+        """
+        Return up to limit titles starting with prefix, most reviewed first
+        Returns list of dicts: {"movie_title": title, "review_count": count}
+        """
+        prefix = normalize_title(prefix)
+        if not prefix:
+            return []
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + "\uffff", lo)
+        best = heapq.nsmallest(limit, self.keys[lo:hi], key=lambda k: (-self.counts[k], k))
+        return [{"movie_title": self.titles[k], "review_count": self.counts[k]} for k in best]
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import pandas as pd
+
+    index = TitleAutocomplete().build(pd.read_csv("datas/cleaned_reviews.csv"))
+    prefix = sys.argv[1] if len(sys.argv) > 1 else "the"
+    start = time.perf_counter()
+    results = index.complete(prefix)
+    print(f"Lookup took {(time.perf_counter() - start) * 1000:.3f} ms")
+    for r in results:
+        print(f"{r['review_count']:>4} | {r['movie_title']}")
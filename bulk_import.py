@@ -0,0 +1,154 @@
+import io
+import json
+import os
+import pandas as pd
+from fuzzywuzzy import process
+from autocomplete import normalize_title
+
+"""
+Import many reviews at once from NDJSON or CSV batches
+"""
+
+
+def parse_batch(data, fmt="ndjson"):
+    """
+    Parse a batch of reviews into a list of dicts
+    data: NDJSON or CSV text
+    fmt: "ndjson" or "csv"
+    Lines that are not valid JSON objects become None so they are reported per row.
+    """
+    if fmt == "csv":
+        df = pd.read_csv(io.StringIO(data), dtype=str, keep_default_na=False)
+        return df.to_dict("records")
+    if fmt != "ndjson":
+        raise ValueError(f"Unsupported batch format: {fmt}")
+
+    rows = []
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            row = None
+        rows.append(row if isinstance(row, dict) else None)
+    return rows
+
+
+def _resolve_titles(names, known, accept_suggestions, min_score=70):
+    """
+    Map each distinct input name to (title, status) in one pass
+    known: {normalised title: display title}
+    """
+    choices = list(known.values())
+    resolved = {}
+    for name in set(names):
+        key = normalize_title(name)
+        if key in known:
+            resolved[name] = (known[key], "ok")
+            continue
+        match = process.extractOne(name, choices) if choices else None
+        if match and match[1] >= min_score:
+            resolved[name] = (match[0], "ok" if accept_suggestions else "suggestion")
+        else:
+            resolved[name] = (None, "unknown_movie")
+    return resolved
+
+
+def plan_import(rows, df, accept_suggestions=False, has_review=None):
+    """
+    Validate, resolve and deduplicate a batch against the reviews in df
+    rows: list of dicts with "movie_name" (or "movie_title") and "review" (or "review_content")
+    accept_suggestions: if True, misspelt titles are replaced by their closest match
+    has_review: callable(title, review) telling whether a review already exists (e.g.
+        DatasetSnapshot.has_review, whose frame has no review_content); by default df is searched
+    Returns (results, new_rows): per-row dicts {"row": i, "status": ..., "movie_name": ...}
+    and the review rows to append.
+    Status is one of added, duplicate, duplicate_in_batch, invalid, unknown_movie, suggestion.
+    """
+    known = {}
+    for title in df["movie_title"].dropna().unique():
+        known.setdefault(normalize_title(title), title)
+    genres = {}
+    if "genres" in df.columns:
+        genres = df.dropna(subset=["genres"]).drop_duplicates("movie_title").set_index("movie_title")["genres"].to_dict()
+    if has_review is None:
+        existing = set(zip(df["movie_title"].astype(str), df["review_content"].astype(str)))
+        has_review = lambda title, review: (title, review) in existing
+
+    # validate every row before resolving titles
+    parsed = []
+    for row in rows:
+        row = row or {}
+        name = str(row.get("movie_name") or row.get("movie_title") or "").strip()
+        review = str(row.get("review") or row.get("review_content") or "").strip()
+        parsed.append((name, review))
+
+    resolved = _resolve_titles([n for n, r in parsed if n and r], known, accept_suggestions)
+
+    results, new_rows, seen = [], [], set()
+    for i, (name, review) in enumerate(parsed):
+        if not name or not review:
+            results.append({"row": i, "status": "invalid", "message": "Missing movie_name or review"})
+            continue
+        title, status = resolved[name]
+        if status == "unknown_movie":
+            results.append({"row": i, "status": status, "movie_name": name})
+        elif status == "suggestion":
+            results.append({"row": i, "status": status, "movie_name": name, "suggestion": title})
+        elif has_review(title, review):
+            results.append({"row": i, "status": "duplicate", "movie_name": title})
+        elif (title, review) in seen:
+            results.append({"row": i, "status": "duplicate_in_batch", "movie_name": title})
+        else:
+            seen.add((title, review))
+            new_rows.append({"movie_title": title, "review_content": review, "genres": genres.get(title)})
+            results.append({"row": i, "status": "added", "movie_name": title})
+
+    return results, new_rows
+
+
+def import_reviews(rows, csv_file="datas/cleaned_reviews.csv", accept_suggestions=False):
+    """
+    Import a batch into csv_file, appending all new reviews in one write
+    Returns the per-row results of plan_import.
+    """
+    if os.path.exists(csv_file):
+        df = pd.read_csv(csv_file, low_memory=False)
+    else:
+        df = pd.DataFrame(columns=["movie_title", "review_content", "genres"])
+
+    results, new_rows = plan_import(rows, df, accept_suggestions)
+
+    if new_rows:
+        columns = df.columns.tolist() if len(df.columns) else ["movie_title", "review_content", "genres"]
+        new_data = pd.DataFrame(new_rows).reindex(columns=columns)
+        dir_path = os.path.dirname(csv_file)
+        if dir_path and not os.path.exists(dir_path):
+            os.makedirs(dir_path)
+        write_header = not os.path.exists(csv_file)
+        new_data.to_csv(csv_file, mode="w" if write_header else "a", header=write_header, index=False)
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    from collections import Counter
+
+    parser = argparse.ArgumentParser(description="Import a batch of reviews from NDJSON or CSV")
+    parser.add_argument("batch", help="path to the .ndjson/.jsonl or .csv batch file")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="batch format (default: from file extension)")
+    parser.add_argument("--csv-file", default="datas/cleaned_reviews.csv", help="review file to append to")
+    parser.add_argument("--accept-suggestions", action="store_true", help="replace misspelt titles with the closest match")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.batch.lower().endswith(".csv") else "ndjson")
+    with open(args.batch, "r", encoding="utf-8") as f:
+        batch = parse_batch(f.read(), fmt)
+
+    results = import_reviews(batch, csv_file=args.csv_file, accept_suggestions=args.accept_suggestions)
+    for r in results:
+        if r["status"] != "added":
+            print(json.dumps(r, ensure_ascii=False))
+    print(dict(Counter(r["status"] for r in results)))
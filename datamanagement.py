@@ -1,39 +1,35 @@
+import hashlib
+import io
+import json
+import os
 import pandas as pd
 import re
+import numpy as np
+from file_utils import atomic_write, prefix_fingerprint
+from title_offsets import iter_rows, update_index
 
-#Loading csv into memory
-reviews = pd.read_csv("datas/rottenTomato.csv")
-title = pd.read_csv("datas/movieNames.csv")
+"""
+Cleaning the raw Rotten Tomatoes reviews into cleaned_reviews.csv
 
+A full run merges every review with its movie name, drops incomplete rows and
+duplicates and writes the cleaned file, plus the title index that lets loaders
+read single movies (see title_offsets.py). An incremental run (--incremental)
+only reads the part of the reviews file after the watermark left by the last
+run, drops rows that are already in the output (checked against a persisted
+set of row digests) and appends the rest. If the reviews file was rewritten
+rather than appended to, or the movie names or the output changed, it falls
+back to a full run.
+"""
 
-#merging the reviews and movie name
-merged_dataset = reviews.merge(
-    title[['rotten_tomatoes_link', 'movie_title', 'genres']],  # only keep needed columns
-    on='rotten_tomatoes_link',
-    how='left'  # keeps all reviews, even if no matching movie name
-)
-# print(merged_dataset[['movie_title', 'review_content']].head())
+REVIEWS_CSV = "datas/rottenTomato.csv"
+TITLES_CSV = "datas/movieNames.csv"
+OUTPUT_CSV = "datas/cleaned_reviews2.csv"
+COLUMNS = ['movie_title', 'review_content', 'genres']
 
 
-# merged_dataset.info() #data info
-# from this info table, i can infer that i can remove all the colomns but leave the movie name and the reviews
-
-
-#keeping only 2 colomns 
-data_table = merged_dataset[['movie_title', 'review_content','genres']]
-
-
-#check for null value
-print("empty:",data_table.isna().sum()) 
-#from this, we can see that there are 130 blank movie title and 65806 empty review
-#now we remove rows with null values in movie_title or review_content
-data_table = data_table.dropna(subset=['movie_title', 'review_content','genres'])
-print("updated null:", data_table)
-
-# check for zero value
-print ("zero value:",(data_table == 0).sum())
-#can see that there are no zero values
-
+def state_paths(output_csv):
+    """(watermark JSON, digest set .npy) kept next to the output file"""
+    return output_csv + ".etl.json", output_csv + ".digests.npy"
 
 
 # 🔹 Function to check duplicates within movies
@@ -48,29 +44,183 @@ def check_duplicates(df):
     return duplicates, duplicate_counts
 
 
-# Before removing
-dups_before, counts_before = check_duplicates(data_table)
-print("Before cleanup:")
-print(counts_before)
-
-
-# Remove duplicates (keep last occurrence)
-data_table = data_table.drop_duplicates(subset=['movie_title', 'review_content'], keep='last')
-
-# After removing
-dups_after, counts_after = check_duplicates(data_table)
-print("\nAfter cleanup:")
-print(counts_after)
-
-
-# # Remove all special characters (keep only letters, numbers, and spaces)
-# data_table['cleaned_review'] = data_table['review_content'].astype(str).apply(
-#     lambda x: re.sub(r'[^A-Za-z0-9\s]', '', x)
-# )
-
-# print(data_table[['review_content', 'cleaned_review']].head(10))
-
-
+def clean(reviews, title, verbose=False):
+    """Merge reviews with their movie names and drop incomplete and duplicate rows"""
+    #merging the reviews and movie name
+    merged_dataset = reviews.merge(
+        title[['rotten_tomatoes_link', 'movie_title', 'genres']],  # only keep needed columns
+        on='rotten_tomatoes_link',
+        how='left'  # keeps all reviews, even if no matching movie name
+    )
 
-# Export cleaned dataset to CSV
-data_table.to_csv("datas/cleaned_reviews2.csv", index=False, encoding='utf-8')
+    #keeping only the colomns we need
+    data_table = merged_dataset[COLUMNS]
+
+    if verbose:
+        #check for null value
+        print("empty:", data_table.isna().sum())
+    #now we remove rows with null values in movie_title or review_content
+    data_table = data_table.dropna(subset=COLUMNS)
+    if verbose:
+        print("updated null:", data_table)
+        # check for zero value
+        print("zero value:", (data_table == 0).sum())
+
+    if verbose:
+        # Before removing
+        dups_before, counts_before = check_duplicates(data_table)
+        print("Before cleanup:")
+        print(counts_before)
+
+    # Remove duplicates (keep last occurrence)
+    data_table = data_table.drop_duplicates(subset=['movie_title', 'review_content'], keep='last')
+
+    if verbose:
+        # After removing
+        dups_after, counts_after = check_duplicates(data_table)
+        print("\nAfter cleanup:")
+        print(counts_after)
+    return data_table
+
+
+def pair_digest(title, review):
+    """64-bit digest of one (movie_title, review_content) pair"""
+    return int.from_bytes(hashlib.blake2b(f"{title}\x1f{review}".encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def row_digests(df):
+    """64-bit digest of each (movie_title, review_content) pair"""
+    return np.array([pair_digest(t, r) for t, r in zip(df['movie_title'], df['review_content'])], dtype=np.uint64)
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def read_complete_rows(f, start, header, to_end=False):
+    """
+    Parse the rows from byte offset start up to the last complete row (or the end with to_end)
+    Returns (DataFrame, offset just after the last parsed row).
+    """
+    f.seek(start)
+    data = f.read()
+    end = len(data)
+    if not to_end:
+        # a partially written last row is left for the next run; a newline inside a quoted
+        # review does not end a row, so the rows are scanned rather than cut at the last newline
+        end = 0
+        for _, end, _ in iter_rows(data, 0):
+            pass
+    df = pd.read_csv(io.BytesIO(header + data[:end]), low_memory=False)
+    return df, start + end
+
+
+def full_run(reviews_csv=REVIEWS_CSV, titles_csv=TITLES_CSV, output_csv=OUTPUT_CSV, verbose=True):
+    """Clean the whole reviews file, overwrite the output and record the watermark"""
+    title = pd.read_csv(titles_csv)
+    with open(reviews_csv, "rb") as f:
+        header = f.readline()
+        reviews, offset = read_complete_rows(f, len(header), header, to_end=True)
+    mark = prefix_fingerprint(reviews_csv, offset)
+
+    data_table = clean(reviews, title, verbose=verbose)
+
+    # Export cleaned dataset to CSV
+    with atomic_write(output_csv, encoding="utf-8") as out:
+        data_table.to_csv(out, index=False)
+    save_state(output_csv, {
+        "reviews_csv": os.path.abspath(reviews_csv),
+        "offset": offset,
+        "header_len": len(header),
+        "fingerprint": mark,
+        "titles_digest": file_digest(titles_csv),
+        "output_size": os.path.getsize(output_csv),
+        "rows": len(data_table),
+    }, np.unique(row_digests(data_table)))
+    update_index(output_csv)
+    return {"mode": "full", "added": len(data_table), "rows": len(data_table)}
+
+
+def save_state(output_csv, state, digests):
+    state_file, digest_file = state_paths(output_csv)
+    with atomic_write(digest_file, "wb") as f:
+        np.save(f, digests)
+    with atomic_write(state_file) as f:
+        json.dump(state, f, indent=2)
+
+
+def load_state(output_csv):
+    state_file, digest_file = state_paths(output_csv)
+    try:
+        with open(state_file, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        return state, np.load(digest_file)
+    except (OSError, ValueError):
+        return None, None
+
+
+def rebuild_reason(state, reviews_csv, titles_csv, output_csv):
+    """Why an incremental run is not possible (None if it is)"""
+    if state is None:
+        return "no previous run"
+    if state["reviews_csv"] != os.path.abspath(reviews_csv):
+        return "different reviews file"
+    if not os.path.exists(output_csv) or os.path.getsize(output_csv) != state["output_size"]:
+        return "output changed since last run"
+    if file_digest(titles_csv) != state["titles_digest"]:
+        return "movie names changed"
+    if os.path.getsize(reviews_csv) < state["offset"]:
+        return "reviews file shrank"
+    if prefix_fingerprint(reviews_csv, state["offset"]) != state["fingerprint"]:
+        return "reviews file was rewritten"
+    return None
+
+
+def incremental_run(reviews_csv=REVIEWS_CSV, titles_csv=TITLES_CSV, output_csv=OUTPUT_CSV, verbose=True):
+    """Clean and append only the rows added after the watermark; falls back to full_run when needed"""
+    state, digests = load_state(output_csv)
+    reason = rebuild_reason(state, reviews_csv, titles_csv, output_csv)
+    if reason:
+        if verbose:
+            print(f"Full rebuild: {reason}")
+        return full_run(reviews_csv, titles_csv, output_csv, verbose=verbose)
+
+    with open(reviews_csv, "rb") as f:
+        header = f.read(state["header_len"])
+        reviews, offset = read_complete_rows(f, state["offset"], header)
+    mark = prefix_fingerprint(reviews_csv, offset)
+
+    new_rows = clean(reviews, pd.read_csv(titles_csv)) if len(reviews) else pd.DataFrame(columns=COLUMNS)
+    new_digests = row_digests(new_rows)
+    keep = ~np.isin(new_digests, digests)
+    new_rows, new_digests = new_rows[keep], new_digests[keep]
+
+    if len(new_rows):
+        new_rows.to_csv(output_csv, mode="a", header=False, index=False, encoding="utf-8")
+    state.update({
+        "offset": offset,
+        "fingerprint": mark,
+        "output_size": os.path.getsize(output_csv),
+        "rows": state["rows"] + len(new_rows),
+    })
+    save_state(output_csv, state, np.union1d(digests, new_digests))
+    update_index(output_csv)
+    if verbose:
+        print(f"Appended {len(new_rows)} new rows ({len(reviews) - len(new_rows)} skipped)")
+    return {"mode": "incremental", "added": len(new_rows), "rows": state["rows"]}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Clean the raw reviews into a CSV for the app")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only process rows appended since the last run")
+    parser.add_argument("--reviews", default=REVIEWS_CSV)
+    parser.add_argument("--titles", default=TITLES_CSV)
+    parser.add_argument("--output", default=OUTPUT_CSV)
+    args = parser.parse_args()
+
+    run = incremental_run if args.incremental else full_run
+    print(run(args.reviews, args.titles, args.output))
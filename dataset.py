@@ -0,0 +1,301 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from datamanagement import pair_digest, read_complete_rows, row_digests
+from file_utils import prefix_fingerprint
+from text_store import CompressedTextStore
+from title_offsets import index_path, update_index
+
+"""
+Snapshot-isolated access to the review dataset
+
+Readers call DatasetStore.current() once per request and use that snapshot
+throughout. Writers append to the CSV under a lock, build a new snapshot and
+publish it with a single reference swap, so readers never block on a write
+and never see a half-applied one. The store also holds the CSV's title index
+(title_offsets.py) and keeps it and its sidecar file up to date, so single
+movies can be read from the file without loading it or reopening the index.
+
+Appends never copy what is already loaded: every column lives in an array
+with spare capacity, appended rows are written after the used part, and a
+snapshot's DataFrame is a view of the first len(snapshot) entries. The
+(title, review) digests used to reject duplicates are extended the same way.
+
+Review texts are not part of the snapshot frames: they are kept once, in a
+CompressedTextStore shared by every snapshot and indexed by review id, and
+read back with DatasetSnapshot.text / review_texts / with_text. Titles and
+genres are categorical, so the frames hold only codes and numeric columns.
+"""
+
+DEFAULT_COLUMNS = ["movie_title", "review_content", "genres"]
+TEXT_COLUMN = "review_content"
+CATEGORY_COLUMNS = ("movie_title", "genres")
+
+
+def code_dtype(n_categories):
+    """Integer dtype pandas uses for the codes of n_categories (codes of another dtype get copied)"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class DatasetSnapshot:
+    def __init__(self, df, version, source_stat=None, pair_ids=None, texts=None, columns=None, genres=None):
+        """
+        An immutable view of the dataset
+        df: review DataFrame without the text column (must not be modified by readers)
+        version: increases by one with every published snapshot
+        source_stat: (size, mtime_ns) of the CSV this snapshot was built from
+        pair_ids: {(title, review) digest: first row id}, shared with later snapshots
+        texts: CompressedTextStore holding the review texts by id, shared with later snapshots
+        columns: the CSV's columns, in order
+        genres: {movie title: genres cell}, shared with later snapshots
+        """
+        self.df = df
+        self.version = version
+        self.source_stat = source_stat
+        self.texts = texts
+        self.columns = list(columns) if columns is not None else df.columns.tolist()
+        self._pair_ids = pair_ids if pair_ids is not None else {}
+        self._genres = genres if genres is not None else {}
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+    def cached(self, name, build):
+        """Return a structure derived from this snapshot, building it at most once"""
+        value = self._cache.get(name)
+        if value is None:
+            with self._cache_lock:
+                value = self._cache.get(name)
+                if value is None:
+                    value = build(self.df)
+                    self._cache[name] = value
+        return value
+
+    def has_review(self, title, review):
+        """Check whether this exact (title, review) pair is already in the dataset"""
+        # ids past the end of this snapshot were appended after it was published
+        return self._pair_ids.get(pair_digest(title, review), len(self)) < len(self)
+
+    def text(self, review_id):
+        """Text of one review, or NaN if it has none"""
+        if not 0 <= review_id < len(self) or self.texts is None:
+            raise IndexError(review_id)
+        return self.texts.get(review_id) or np.nan
+
+    def review_texts(self, review_ids):
+        """Texts of several reviews, in the given order (NaN for reviews without text)"""
+        if self.texts is None:
+            return [np.nan] * len(review_ids)
+        return [t or np.nan for t in self.texts.get_many(list(review_ids))]
+
+    def with_text(self, rows=None):
+        """
+        A DataFrame of the rows with the CSV's columns, text included
+        rows: positions to include (a slice or a list of ids); all rows by default
+        The review ids stay available as the row labels.
+        """
+        ids = np.arange(len(self))
+        if rows is not None:
+            ids = ids[rows]
+        df = self.df.iloc[ids].astype({c: object for c in CATEGORY_COLUMNS if c in self.df.columns})
+        if TEXT_COLUMN in self.columns:
+            df[TEXT_COLUMN] = self.review_texts(ids.tolist())
+        return df.reindex(columns=self.columns)
+
+    def movie_rows(self, titles):
+        """Ids of the reviews of the given movies, titles matched ignoring case and surrounding spaces"""
+        wanted = {str(t).strip().lower() for t in titles}
+        column = self.df["movie_title"]
+        codes = [code for code, title in enumerate(column.cat.categories) if str(title).strip().lower() in wanted]
+        return np.flatnonzero(np.isin(column.cat.codes.to_numpy(), codes))
+
+    def movie_titles(self):
+        """Return the list of unique movie titles"""
+        return self.cached("movie_titles", lambda df: df["movie_title"].dropna().unique().tolist())
+
+    def movie_genres(self):
+        """Return {movie title: genres cell} for movies that have genres (kept up to date, not copied)"""
+        return self._genres
+
+    def __len__(self):
+        return len(self.df)
+
+
+class DatasetStore:
+    def __init__(self, csv_file):
+        """
+        Load the dataset and publish the first snapshot
+        csv_file: review CSV that new reviews are appended to
+        """
+        self.csv_file = str(csv_file)
+        self._write_lock = threading.Lock()
+        self.title_index = None  # TitleOffsetIndex of the CSV (None without a title column), updated by writers
+        self._snapshot = self._load(version=1)
+
+    def _stat(self):
+        st = os.stat(self.csv_file)
+        return (st.st_size, st.st_mtime_ns)
+
+    def _load(self, version):
+        self._arrays = {}  # column -> array whose first self._size entries are the rows
+        self._categories = {}  # categorical column -> (values in code order, {value: code})
+        self._size = 0
+        self._pair_ids = {}
+        self._genres = {}
+        self.texts = CompressedTextStore()
+        self._header = b""
+        self._covered = 0  # bytes of the CSV loaded so far
+        if not os.path.exists(self.csv_file):
+            self.columns = list(DEFAULT_COLUMNS)
+            self._extend(pd.DataFrame(columns=self.columns))
+            return self._snapshot_of(version)
+        with open(self.csv_file, "rb") as f:
+            self._header = f.readline()
+        df = pd.read_csv(self.csv_file, low_memory=False)
+        self.columns = df.columns.tolist()
+        self._extend(df)
+        del df
+        self._update_title_index()
+        return self._publish(version)
+
+    def _update_title_index(self):
+        """Build or extend the CSV's title index and save it (only rows it has not seen are scanned)"""
+        try:
+            if self.title_index is None:
+                self.title_index = update_index(self.csv_file)
+            elif self.title_index.update(self.csv_file):
+                self.title_index.save(index_path(self.csv_file))
+        except ValueError:  # the file has no title column
+            self.title_index = None
+        except OSError:
+            pass  # read-only location: the index still serves this process
+
+    def _codes(self, name, values):
+        """Category codes of values (-1 for missing), adding unseen values as new categories"""
+        categories, index = self._categories.setdefault(name, ([], {}))
+        local, uniques = pd.factorize(values)
+        mapping = np.empty(len(uniques) + 1, dtype=np.int64)
+        for i, value in enumerate(uniques):
+            code = index.get(value)
+            if code is None:
+                code = index[value] = len(categories)
+                categories.append(value)
+            mapping[i] = code
+        mapping[-1] = -1  # factorize marks missing values with -1
+        return mapping[local].astype(code_dtype(len(categories)))
+
+    def _extend(self, rows):
+        """Write rows (columns as self.columns) after the used part of the column arrays"""
+        n, start = len(rows), self._size
+        for name in self.columns:
+            if name == TEXT_COLUMN:
+                continue  # kept compressed in self.texts
+            if name in CATEGORY_COLUMNS:
+                values = self._codes(name, rows[name])
+            else:
+                values = rows[name].to_numpy()
+            array = self._arrays.get(name)
+            if array is None:
+                array = np.empty(max(2 * n, 1024), dtype=values.dtype)
+            elif name in CATEGORY_COLUMNS and values.dtype != array.dtype:
+                array = array.astype(values.dtype)  # more categories than the old codes can hold
+            elif values.dtype != array.dtype and not np.can_cast(values.dtype, array.dtype, "same_kind"):
+                array = array.astype(object)  # e.g. missing values appended to an integer column
+            if start + n > len(array):
+                grown = np.empty(max(start + n, 2 * len(array)), dtype=array.dtype)
+                grown[:start] = array[:start]
+                array = grown
+            array[start:start + n] = values
+            self._arrays[name] = array
+        self._size = start + n
+        if TEXT_COLUMN in self.columns:
+            self.texts.extend(rows[TEXT_COLUMN].tolist())
+        if "movie_title" in rows.columns and TEXT_COLUMN in rows.columns:
+            for offset, digest in enumerate(row_digests(rows).tolist()):
+                self._pair_ids.setdefault(digest, start + offset)
+        if "movie_title" in rows.columns and "genres" in rows.columns:
+            known = rows.dropna(subset=["movie_title", "genres"]).drop_duplicates("movie_title")
+            for title, genres in zip(known["movie_title"], known["genres"]):
+                self._genres.setdefault(title, genres)
+
+    def _frame(self):
+        columns = {}
+        for name in self.columns:
+            if name == TEXT_COLUMN:
+                continue
+            values = self._arrays[name][:self._size]
+            if name in CATEGORY_COLUMNS:
+                categories = pd.Index(self._categories[name][0], dtype=object)  # copied: later ones are not seen
+                values = pd.Categorical.from_codes(values, categories, validate=False)
+            columns[name] = values
+        return pd.DataFrame(columns, index=pd.RangeIndex(self._size), copy=False)
+
+    def _snapshot_of(self, version, stat=None):
+        return DatasetSnapshot(self._frame(), version, stat, self._pair_ids, self.texts, self.columns, self._genres)
+
+    def _publish(self, version):
+        """Record how much of the CSV is loaded and make the rows so far a snapshot"""
+        stat = self._stat()
+        self._covered = stat[0]
+        self._fingerprint = prefix_fingerprint(self.csv_file, self._covered)
+        return self._snapshot_of(version, stat)
+
+    def current(self):
+        """Return the latest published snapshot (never blocks)"""
+        return self._snapshot
+
+    def append(self, new_rows):
+        """
+        Append reviews to the CSV and publish a snapshot that includes them
+        new_rows: DataFrame or list of dicts keyed by column name
+        Returns the new snapshot.
+        """
+        with self._write_lock:
+            old = self._snapshot
+            new_rows = pd.DataFrame(new_rows).reindex(columns=self.columns)
+            if new_rows.empty:
+                return old
+
+            dir_path = os.path.dirname(self.csv_file)
+            if dir_path and not os.path.exists(dir_path):
+                os.makedirs(dir_path)
+            write_header = not os.path.exists(self.csv_file)
+            new_rows.to_csv(self.csv_file, mode="w" if write_header else "a", header=write_header, index=False)
+            if write_header:
+                with open(self.csv_file, "rb") as f:
+                    self._header = f.readline()
+            self._update_title_index()
+
+            self._extend(new_rows)
+            self._snapshot = self._publish(old.version + 1)
+            return self._snapshot
+
+    def refresh(self):
+        """
+        Pick up changes another process made to the CSV since the last snapshot
+        Appended rows are read on their own; a rewritten file is loaded again.
+        Returns (snapshot, id of the first new row): the id is None when nothing changed
+        and 0 when the file was reloaded.
+        """
+        with self._write_lock:
+            old = self._snapshot
+            if not os.path.exists(self.csv_file) or self._stat() == old.source_stat:
+                return old, None
+            size = self._stat()[0]
+            if self._covered and size >= self._covered \
+                    and prefix_fingerprint(self.csv_file, self._covered) == self._fingerprint:
+                with open(self.csv_file, "rb") as f:
+                    rows, end = read_complete_rows(f, self._covered, self._header)
+                if end == self._covered:
+                    return old, None  # only an unfinished row so far
+                self._extend(rows.reindex(columns=self.columns))
+                self._update_title_index()
+                snapshot = self._snapshot_of(old.version + 1, self._stat())
+                self._covered, self._fingerprint = end, prefix_fingerprint(self.csv_file, end)
+                self._snapshot = snapshot
+                return snapshot, len(old)
+            self._snapshot = self._load(old.version + 1)
+            return self._snapshot, 0
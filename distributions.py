@@ -0,0 +1,201 @@
+from array import array
+import math
+import threading
+import numpy as np
+from autocomplete import normalize_title
+from view_movies import split_genres
+
+"""
+Mergeable score-distribution sketches per movie and per genre
+
+Each movie keeps a ScoreSketch: a t-digest for quantiles (about fifty
+weighted centroids, however many reviews there are) plus counts in
+fixed score bins. Both merge exactly by concatenation and addition, so a
+genre's or a shard's distribution is built by merging its movies' sketches
+instead of rescanning the scores.
+"""
+
+HIST_EDGES = np.arange(-10.0, 10.5, 1.0)  # counts[0] is below -10, counts[-1] is 10 and above
+DEFAULT_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+class ScoreSketch:
+    def __init__(self, compression=100):
+        """compression: t-digest size parameter (more centroids, more accurate quantiles)"""
+        self.compression = compression
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        self.hist = np.zeros(len(HIST_EDGES) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer = array("d")  # scores not yet folded into the centroids
+
+    def add(self, score):
+        self._buffer.append(score)
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def add_many(self, scores):
+        scores = np.asarray(scores, dtype=np.float64)
+        self._buffer.frombytes(scores.tobytes())
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+        return self
+
+    def _fold_buffer(self):
+        """Move buffered scores into the counters; returns them as an array"""
+        scores = np.frombuffer(self._buffer, dtype=np.float64).copy()
+        self._buffer = array("d")
+        if len(scores):
+            self.hist += np.bincount(np.searchsorted(HIST_EDGES, scores, "right"), minlength=len(self.hist))
+            self.count += len(scores)
+            self.total += float(scores.sum())
+            self.min = min(self.min, float(scores.min()))
+            self.max = max(self.max, float(scores.max()))
+        return scores
+
+    def _compress(self, extra_means=(), extra_weights=()):
+        """Fold the buffer (and centroids merged from other sketches) into about compression / 2 centroids"""
+        if not len(self._buffer) and not len(extra_means):
+            return  # already compressed: leaves shared sketches untouched for readers
+        scores = self._fold_buffer()
+        means = np.concatenate([self.means, scores, *extra_means])
+        weights = np.concatenate([self.weights, np.ones(len(scores)), *extra_weights])
+        if not len(means):
+            return
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        # t-digest k1 scale: clusters are small near the tails and large around the median
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = self.compression / (2 * math.pi) * np.arcsin(2 * q - 1)
+        cluster = np.floor(k - k[0]).astype(np.int64)
+        cluster_weights = np.bincount(cluster, weights=weights)
+        keep = cluster_weights > 0
+        self.means = (np.bincount(cluster, weights=means * weights) / np.where(keep, cluster_weights, 1))[keep]
+        self.weights = cluster_weights[keep]
+
+    def merge(self, *others):
+        """Merge other sketches into this one"""
+        for other in others:
+            other._compress()
+            self.hist += other.hist
+            self.count += other.count
+            self.total += other.total
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        self._compress([o.means for o in others], [o.weights for o in others])
+        return self
+
+    def copy(self):
+        return ScoreSketch(self.compression).merge(self)
+
+    def quantiles(self, qs=DEFAULT_QUANTILES):
+        """Approximate score quantiles (exact for movies with only a few dozen reviews)"""
+        self._compress()
+        if not self.count:
+            return [None] * len(qs)
+        cumulative = np.cumsum(self.weights)
+        positions = np.concatenate(([0.0], cumulative - self.weights / 2, [cumulative[-1]]))
+        values = np.concatenate(([self.min], self.means, [self.max]))
+        return [float(v) for v in np.interp(np.asarray(qs) * cumulative[-1], positions, values)]
+
+    def summary(self, qs=DEFAULT_QUANTILES):
+        self._compress()
+        return {
+            "review_count": self.count,
+            "average_score": round(self.total / self.count, 4) if self.count else None,
+            "min_score": self.min if self.count else None,
+            "max_score": self.max if self.count else None,
+            "quantiles": {f"p{round(q * 100, 2):g}": v for q, v in zip(qs, self.quantiles(qs))},
+            "histogram": {"edges": HIST_EDGES.tolist(), "counts": self.hist.tolist()},
+        }
+
+    def to_dict(self):
+        """Plain-data form (e.g. to send between processes); see from_dict"""
+        self._compress()
+        return {"compression": self.compression, "means": self.means, "weights": self.weights,
+                "hist": self.hist, "count": self.count, "total": self.total, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(state["compression"])
+        sketch.means, sketch.weights, sketch.hist = state["means"], state["weights"], state["hist"]
+        sketch.count, sketch.total, sketch.min, sketch.max = state["count"], state["total"], state["min"], state["max"]
+        return sketch
+
+    def __len__(self):
+        return self.count + len(self._buffer)
+
+
+class ScoreDistributions:
+    def __init__(self, compression=100):
+        self.compression = compression
+        self.movies = {}  # {movie title: ScoreSketch}
+        self.movie_genres = {}  # {movie title: [genre, ...]}
+        self._titles = {}  # {normalized title: movie title}
+        self._rollups = {}  # merged sketches by ("genre", name) / ("all",), cleared on every update
+        self._lock = threading.RLock()
+
+    def build(self, df_scored, title_column="Movie Title", genres_column="Genres", score_column="Average Score"):
+        """Add every review of a scored corpus (e.g. the output of score_corpus)"""
+        for title, group in df_scored.groupby(title_column, sort=False):
+            self._sketch(title).add_many(group[score_column].to_numpy())
+            if genres_column in group.columns:
+                self.movie_genres.setdefault(title, split_genres(group[genres_column].iloc[0]))
+        self._rollups = {}
+        return self
+
+    def _sketch(self, title):
+        sketch = self.movies.get(title)
+        if sketch is None:
+            sketch = self.movies[title] = ScoreSketch(self.compression)
+            self._titles.setdefault(normalize_title(title), title)
+        return sketch
+
+    def add(self, title, genres, score):
+        """Add one scored review; genres is the comma-separated genres cell"""
+        with self._lock:
+            self._sketch(title).add(score)
+            self.movie_genres.setdefault(title, split_genres(genres))
+            self._rollups = {}
+
+    def genres(self):
+        return sorted({g for genres in self.movie_genres.values() for g in genres})
+
+    def find_movie(self, title):
+        """Stored title of a movie (ignoring case and spacing), or None"""
+        return self._titles.get(normalize_title(title))
+
+    def find_genre(self, name):
+        """Stored name of a genre (ignoring case), or None"""
+        name = name.strip().lower()
+        return next((g for g in self.genres() if g.lower() == name), None)
+
+    def movie(self, title):
+        """Sketch of one movie (a copy), or None"""
+        with self._lock:
+            sketch = self.movies.get(title)
+            return sketch.copy() if sketch is not None else None
+
+    def merged(self, titles):
+        """One sketch merged from the given movies' sketches"""
+        with self._lock:
+            return ScoreSketch(self.compression).merge(*[self.movies[t] for t in titles if t in self.movies])
+
+    def genre(self, name):
+        """Sketch of every review of a genre's movies, merged from their sketches and cached until the next update"""
+        with self._lock:
+            key = ("genre", name)
+            if key not in self._rollups:
+                self._rollups[key] = self.merged([t for t, genres in self.movie_genres.items() if name in genres])
+            return self._rollups[key]
+
+    def overall(self):
+        """Sketch of every review, merged from the movie sketches"""
+        with self._lock:
+            if ("all",) not in self._rollups:
+                self._rollups[("all",)] = self.merged(list(self.movies))
+            return self._rollups[("all",)]
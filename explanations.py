@@ -0,0 +1,149 @@
+import html
+from array import array
+import numpy as np
+
+"""
+Compact, columnar record of which words drove each review's score
+
+For every lexicon hit we keep three numbers: the term id, the character
+offset of the word in the cleaned review text, and the word's weight.
+Hits are stored back to back in review-id order, with review_ptr marking
+where each review's hits start, so an explanation is two array slices.
+"""
+
+
+class ExplanationStore:
+    def __init__(self):
+        self.terms = []  # term id -> word
+        self._term_index = {}  # word -> term id
+        self.review_ptr = array("q", [0])  # hits of review i are [review_ptr[i], review_ptr[i + 1])
+        self.sentence_counts = array("h")  # per review
+        self.term_ids = array("i")  # per hit
+        self.offsets = array("i")  # per hit
+        self.weights = array("h")  # per hit (lexicon weights can exceed a byte)
+
+    def __len__(self):
+        return len(self.sentence_counts)
+
+    def _term_id(self, word):
+        term_id = self._term_index.get(word)
+        if term_id is None:
+            term_id = len(self.terms)
+            self._term_index[word] = term_id
+            self.terms.append(word)
+        return term_id
+
+    @classmethod
+    def from_arrays(cls, terms, review_ptr, sentence_counts, term_ids, offsets, weights):
+        """
+        Wrap existing numpy columns (e.g. memory-mapped ones) without copying
+        They are copied into growable arrays only when the first review is added.
+        """
+        store = cls()
+        store.terms = list(terms)
+        store._term_index = {t: i for i, t in enumerate(store.terms)}
+        store.review_ptr, store.sentence_counts = review_ptr, sentence_counts
+        store.term_ids, store.offsets, store.weights = term_ids, offsets, weights
+        return store
+
+    def _make_growable(self):
+        if not isinstance(self.term_ids, array):
+            self.review_ptr = array("q", np.asarray(self.review_ptr, dtype=np.int64).tobytes())
+            self.sentence_counts = array("h", np.asarray(self.sentence_counts, dtype=np.int16).tobytes())
+            self.term_ids = array("i", np.asarray(self.term_ids, dtype=np.int32).tobytes())
+            self.offsets = array("i", np.asarray(self.offsets, dtype=np.int32).tobytes())
+            self.weights = array("h", np.asarray(self.weights, dtype=np.int16).tobytes())
+
+    def arrays(self):
+        """The hit columns as numpy arrays (views of the stored data, not copies)"""
+        return {
+            "review_ptr": np.frombuffer(self.review_ptr, dtype=np.int64),
+            "sentence_counts": np.frombuffer(self.sentence_counts, dtype=np.int16),
+            "term_ids": np.frombuffer(self.term_ids, dtype=np.int32),
+            "offsets": np.frombuffer(self.offsets, dtype=np.int32),
+            "weights": np.frombuffer(self.weights, dtype=np.int16),
+        }
+
+    def add(self, review_id, sentence_count, hits):
+        """
+        Record the hits of one review (as returned by TextProcessor.explain_review)
+        Review ids must be added in increasing order; skipped ids get empty explanations.
+        """
+        self._make_growable()
+        # len() counts sentence_counts, so a review's hits and end pointer are appended before it is counted:
+        # a concurrent explain() never sees a review whose review_ptr entry is missing
+        while len(self.sentence_counts) < review_id:
+            self.review_ptr.append(len(self.term_ids))
+            self.sentence_counts.append(0)
+        for word, offset, weight in hits:
+            self.term_ids.append(self._term_id(word))
+            self.offsets.append(offset)
+            self.weights.append(weight)
+        self.review_ptr.append(len(self.term_ids))
+        self.sentence_counts.append(min(sentence_count, 32767))
+
+    def explain(self, review_id):
+        """
+        Return {"review_id", "score", "sentence_count", "contributions"} for a review
+        Each contribution: {"term", "offset", "length", "weight", "contribution"}, where
+        contribution is the amount the word added to the review's average score.
+        """
+        if not 0 <= review_id < len(self):
+            raise IndexError(f"Unknown review id: {review_id}")
+        start, end = self.review_ptr[review_id], self.review_ptr[review_id + 1]
+        sentences = int(self.sentence_counts[review_id])
+        contributions = []
+        for term_id, offset, weight in zip(self.term_ids[start:end].tolist(), self.offsets[start:end].tolist(),
+                                           self.weights[start:end].tolist()):
+            term = self.terms[term_id]
+            contributions.append({
+                "term": term,
+                "offset": offset,
+                "length": len(term),
+                "weight": weight,
+                "contribution": round(weight / sentences, 4) if sentences else 0.0,
+            })
+        score = sum(c["weight"] for c in contributions) / sentences if sentences else 0.0
+        return {
+            "review_id": review_id,
+            "score": score,
+            "sentence_count": sentences,
+            "contributions": contributions,
+        }
+
+    def nbytes(self):
+        """Memory used by the hit arrays"""
+        return sum(a.itemsize * len(a) for a in
+                   (self.review_ptr, self.sentence_counts, self.term_ids, self.offsets, self.weights))
+
+    def save(self, path):
+        """Save all columns to an .npz file"""
+        np.savez(path, terms=np.array(self.terms, dtype=str), **self.arrays())
+
+    @classmethod
+    def load(cls, path):
+        """Load a store written by save()"""
+        store = cls()
+        with np.load(path, allow_pickle=False) as data:
+            store.terms = data["terms"].tolist()
+            store._term_index = {t: i for i, t in enumerate(store.terms)}
+            store.review_ptr = array("q", data["review_ptr"].tobytes())
+            store.sentence_counts = array("h", data["sentence_counts"].tobytes())
+            store.term_ids = array("i", data["term_ids"].tobytes())
+            store.offsets = array("i", data["offsets"].tobytes())
+            store.weights = array("h", data["weights"].astype(np.int16).tobytes())
+        return store
+
+
+def highlight(text, contributions):
+    """Return text as HTML with each contributing word wrapped in <mark>"""
+    parts, cursor = [], 0
+    for c in sorted(contributions, key=lambda c: c["offset"]):
+        if c["offset"] < cursor:
+            continue  # offset unknown (-1) or overlapping
+        end = c["offset"] + c["length"]
+        parts.append(html.escape(text[cursor:c["offset"]]))
+        parts.append(f'<mark data-weight="{c["weight"]}">{html.escape(text[c["offset"]:end])}</mark>')
+        cursor = end
+    parts.append(html.escape(text[cursor:]))
+    return "".join(parts)
@@ -0,0 +1,60 @@
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+
+"""
+Helpers for writing files safely and recognising appended files
+"""
+
+FINGERPRINT_WINDOW = 64 * 1024
+
+
+def _read_umask():
+    mask = os.umask(0)  # the only way to read it is to set it, so this is done once, at import
+    os.umask(mask)
+    return mask
+
+
+UMASK = _read_umask()
+
+
+@contextmanager
+def atomic_write(path, mode="w", encoding="utf-8"):
+    """
+    Write to a temporary file next to path and move it into place on success.
+    Readers see either the old file or the complete new one, never a partial write.
+    The file keeps the permissions of the one it replaces; a new file gets the usual 0666 minus the umask
+    (mkstemp creates its file readable by the owner only).
+    """
+    path = os.path.abspath(path)
+    try:
+        permissions = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        permissions = 0o666 & ~UMASK
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-", suffix="-" + os.path.basename(path))
+    try:
+        with os.fdopen(fd, mode, encoding=None if "b" in mode else encoding) as f:
+            yield f
+            f.flush()
+            os.fchmod(f.fileno(), permissions)
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def prefix_fingerprint(path, size):
+    """
+    Hash of the first and last FINGERPRINT_WINDOW bytes of the first size bytes of a file
+    It stays the same when the file is appended to, and changes when it is rewritten.
+    """
+    h = hashlib.sha256(str(size).encode())
+    with open(path, "rb") as f:
+        h.update(f.read(min(size, FINGERPRINT_WINDOW)))
+        start = max(0, size - FINGERPRINT_WINDOW)
+        f.seek(start)
+        h.update(f.read(size - start))
+    return h.hexdigest()
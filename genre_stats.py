@@ -0,0 +1,129 @@
+import math
+import threading
+import pandas as pd
+from view_movies import split_genres
+
+"""
+Per-genre sentiment statistics kept up to date as reviews are scored
+"""
+
+
+def explode_genres(df_scored, genres_column="Genres"):
+    """Return one row per (review, genre) with a clean "Genre" column"""
+    exploded = df_scored.assign(Genre=df_scored[genres_column].str.split(",")).explode("Genre")
+    exploded["Genre"] = exploded["Genre"].str.strip()
+    return exploded[exploded["Genre"].notna() & (exploded["Genre"] != "")]
+
+
+class GenreSentiment:
+    def __init__(self, min_reviews=5, top_n=5):
+        """
+        min_reviews: movies with fewer reviews are left out of a genre's top/bottom lists
+        top_n: number of top and bottom movies kept per genre
+        """
+        self.min_reviews = min_reviews
+        self.top_n = top_n
+        self.genre_totals = {}  # {genre: [review count, score sum, sum of squared scores]}
+        self.movie_totals = {}  # {genre: {movie title: [score sum, review count]}}
+        self._summary = None  # cached result of summary(), cleared on every update
+        # updates and summary() hold this lock, so a summary computed before an update is never cached after it
+        self._lock = threading.Lock()
+
+    def build(self, df_scored, title_column="Movie Title", genres_column="Genres", score_column="Average Score"):
+        """
+        Compute all aggregates from a scored corpus (e.g. the output of score_corpus)
+        df_scored may also be an iterable of such DataFrames; totals are accumulated chunk by chunk.
+        """
+        with self._lock:
+            self.genre_totals = {}
+            self.movie_totals = {}
+            chunks = [df_scored] if isinstance(df_scored, pd.DataFrame) else df_scored
+            for chunk in chunks:
+                self._accumulate(chunk, title_column, genres_column, score_column)
+            self._summary = None
+        return self
+
+    def _accumulate(self, df_scored, title_column, genres_column, score_column):
+        exploded = explode_genres(df_scored, genres_column)
+        exploded = exploded.assign(Squared=exploded[score_column] ** 2)
+
+        totals = exploded.groupby("Genre").agg(
+            count=(score_column, "count"), total=(score_column, "sum"), total_sq=("Squared", "sum")
+        )
+        for genre, r in totals.iterrows():
+            entry = self.genre_totals.setdefault(genre, [0, 0.0, 0.0])
+            entry[0] += int(r["count"])
+            entry[1] += float(r["total"])
+            entry[2] += float(r["total_sq"])
+
+        per_movie = exploded.groupby(["Genre", title_column])[score_column].agg(["sum", "count"])
+        for (genre, title), row in per_movie.iterrows():
+            entry = self.movie_totals.setdefault(genre, {}).setdefault(title, [0.0, 0])
+            entry[0] += float(row["sum"])
+            entry[1] += int(row["count"])
+
+    def add(self, title, genres, score):
+        """Add one scored review; genres is the comma-separated genres cell"""
+        with self._lock:
+            for genre in split_genres(genres):
+                totals = self.genre_totals.setdefault(genre, [0, 0.0, 0.0])
+                totals[0] += 1
+                totals[1] += score
+                totals[2] += score * score
+                movie = self.movie_totals.setdefault(genre, {}).setdefault(title, [0.0, 0])
+                movie[0] += score
+                movie[1] += 1
+            self._summary = None
+
+    def _movie_rankings(self, genre):
+        movies = [
+            {"movie_title": t, "average_score": round(s / c, 2), "review_count": c}
+            for t, (s, c) in self.movie_totals.get(genre, {}).items() if c >= self.min_reviews
+        ]
+        movies.sort(key=lambda m: (m["average_score"], m["movie_title"]))
+        return movies[::-1][:self.top_n], movies[:self.top_n]
+
+    def summary(self):
+        """
+        Return a list of per-genre dicts, most reviewed genre first:
+        {"genre", "review_count", "mean", "std", "top_movies", "bottom_movies"}
+        The result is cached until the next update.
+        """
+        with self._lock:
+            if self._summary is None:
+                self._summary = self._compute_summary()
+            return self._summary
+
+    def _compute_summary(self):
+        rows = []
+        for genre, (count, total, total_sq) in self.genre_totals.items():
+            mean = total / count
+            var = (total_sq - count * mean * mean) / (count - 1) if count > 1 else 0.0
+            top, bottom = self._movie_rankings(genre)
+            rows.append({
+                "genre": genre,
+                "review_count": count,
+                "mean": round(mean, 4),
+                "std": round(math.sqrt(max(var, 0.0)), 4),
+                "top_movies": top,
+                "bottom_movies": bottom,
+            })
+        rows.sort(key=lambda r: (-r["review_count"], r["genre"]))
+        return rows
+
+    def to_frame(self):
+        """Summary statistics (without movie lists) as a DataFrame"""
+        return pd.DataFrame(
+            [{k: r[k] for k in ("genre", "review_count", "mean", "std")} for r in self.summary()],
+            columns=["genre", "review_count", "mean", "std"],
+        )
+
+
+if __name__ == "__main__":
+    from text_processing import TextProcessor
+    from scoring_system import score_corpus
+
+    processor = TextProcessor("datas/AFINN-en-165.txt")
+    df_reviews = processor.load_reviews("datas/cleaned_reviews.csv", return_df=True, n=1000)
+    stats = GenreSentiment().build(score_corpus(df_reviews, processor))
+    print(stats.to_frame().to_string(index=False))
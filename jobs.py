@@ -0,0 +1,374 @@
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from contextlib import nullcontext
+import pandas as pd
+from file_utils import atomic_write
+
+"""
+Persistent background jobs for heavy analytics
+
+Jobs are rows in a SQLite table, so they survive restarts and can be
+inspected from any process. Worker processes claim queued jobs one at a
+time, run them and record progress, results and errors in the same table.
+The web app only inserts rows and reads them back, so a full rescore never
+runs on a request thread.
+
+A job enqueued with coalesce=True is merged into an identical job that is
+still queued, and delay postpones when it may start, so a burst of writes
+followed by "refresh in 5 seconds" results in a single run.
+"""
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    not_before REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    worker TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, not_before, id);
+"""
+
+
+def worker_name():
+    """Name recorded on the jobs a worker claims: host and pid of the worker process"""
+    return f"{os.uname().nodename}:{os.getpid()}"
+
+
+def worker_alive(worker):
+    """
+    Whether the worker process recorded on a job may still be running
+    Workers on other hosts cannot be checked from here and are assumed alive.
+    """
+    host, _, pid = (worker or "").rpartition(":")
+    if not host or not pid.isdigit():
+        return False
+    if host != os.uname().nodename:
+        return True
+    try:
+        os.kill(int(pid), 0)  # signal 0 only checks that the process exists
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # exists, but belongs to another user
+        return True
+    return True
+
+
+class JobStore:
+    def __init__(self, db_path):
+        """Open (and create if needed) the job table in db_path"""
+        self.db_path = str(db_path)
+        dir_path = os.path.dirname(self.db_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # one short-lived connection per call keeps the store safe to share between threads
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return _Closing(conn)
+
+    @staticmethod
+    def _to_dict(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def enqueue(self, kind, params=None, delay=0.0, coalesce=False):
+        """
+        Add a job and return its id
+        delay: seconds before the job may start
+        coalesce: if the same job (kind and params) is already queued, return that one instead
+        """
+        params_json = json.dumps(params or {}, sort_keys=True)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if coalesce:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE kind = ? AND params = ? AND status = ? ORDER BY id LIMIT 1",
+                    (kind, params_json, QUEUED)
+                ).fetchone()
+                if row is not None:
+                    conn.execute("COMMIT")
+                    return row["id"]
+            cur = conn.execute(
+                "INSERT INTO jobs (kind, params, status, created_at, not_before) VALUES (?, ?, ?, ?, ?)",
+                (kind, params_json, QUEUED, now, now + delay)
+            )
+            conn.execute("COMMIT")
+            return cur.lastrowid
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            return self._to_dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def list(self, status=None, limit=50):
+        """Most recent jobs first"""
+        with self._connect() as conn:
+            if status:
+                rows = conn.execute("SELECT * FROM jobs WHERE status = ? ORDER BY id DESC LIMIT ?", (status, limit))
+            else:
+                rows = conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,))
+            return [self._to_dict(r) for r in rows.fetchall()]
+
+    def claim(self, worker):
+        """Mark the oldest runnable queued job as running and return it (None if there is none)"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")  # only one worker can hold the write lock
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? AND not_before <= ? ORDER BY id LIMIT 1",
+                (QUEUED, time.time())
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, worker = ? WHERE id = ?",
+                (RUNNING, time.time(), worker, row["id"])
+            )
+            conn.execute("COMMIT")
+        return self.get(row["id"])
+
+    def progress(self, job_id, progress, message=None):
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET progress = ?, message = ? WHERE id = ?",
+                         (max(0.0, min(float(progress), 1.0)), message, job_id))
+
+    def finish(self, job_id, result=None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, progress = 1, result = ?, finished_at = ? WHERE id = ?",
+                (DONE, json.dumps(result, default=str), time.time(), job_id)
+            )
+
+    def fail(self, job_id, error):
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                         (FAILED, error, time.time(), job_id))
+
+    def fail_interrupted(self):
+        """Mark jobs left running by workers that died as failed (jobs of live workers are kept); returns how many"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute("SELECT id, worker FROM jobs WHERE status = ?", (RUNNING,)).fetchall()
+            dead = [row["id"] for row in rows if not worker_alive(row["worker"])]
+            now = time.time()
+            conn.executemany("UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                             [(FAILED, "Interrupted: worker stopped while running", now, job_id) for job_id in dead])
+            conn.execute("COMMIT")
+            return len(dead)
+
+
+class _Closing:
+    """Context manager that closes (not just commits) a sqlite3 connection"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, *exc):
+        self.conn.close()
+
+
+class ProgressReporter:
+    """Callable passed to jobs: report(done, total, message) updates the job at most every interval seconds"""
+
+    def __init__(self, store, job_id, interval=0.5):
+        self.store = store
+        self.job_id = job_id
+        self.interval = interval
+        self._last = 0.0
+
+    def __call__(self, done, total, message=None):
+        now = time.monotonic()
+        if now - self._last >= self.interval or done >= total:
+            self._last = now
+            self.store.progress(self.job_id, done / total if total else 1.0, message)
+
+
+def _count_rows(csv_file, column):
+    return int(pd.read_csv(csv_file, usecols=[column])[column].notna().sum())
+
+
+def rescore_job(params, report):
+    """
+    Score the whole corpus, write per-review scores and the leaderboard JSON
+    params: csv_file, dict_path, scores_file (optional), leaderboard_file (optional),
+            min_reviews (default 5), top_n (default 5), chunksize (default 5000)
+    """
+    from leaderboard import Leaderboard
+    from scoring_system import iter_chunks, score_corpus, export_top_worst_movies_to_json
+    from text_processing import TextProcessor
+
+    processor = TextProcessor(params["dict_path"])
+    csv_file = params["csv_file"]
+    total = _count_rows(csv_file, "review_content")
+    board = Leaderboard(min_reviews=params.get("min_reviews", 5))
+    chunks = processor.load_reviews(csv_file, chunksize=params.get("chunksize", 5000),
+                                    columns=["movie_title", "review_content", "genres"])
+    scores_file = params.get("scores_file")
+    done = 0
+    with atomic_write(scores_file) if scores_file else nullcontext() as out:
+        for i, scores in enumerate(iter_chunks(score_corpus, chunks, processor)):
+            board.add_scores(scores)
+            if out is not None:
+                scores.to_csv(out, header=(i == 0), index=False)
+            done += len(scores)
+            report(done, total, f"Scored {done} of {total} reviews")
+
+    top_n = params.get("top_n", 5)
+    export_top_worst_movies_to_json(board.top(top_n), board.worst(top_n), output_file=params.get("leaderboard_file"))
+    return {"reviews": done, "ranked_movies": len(board), "scores_file": scores_file,
+            "top_movies": board.top(top_n)["Movie Title"].tolist()}
+
+
+def partition_job(params, report):
+    """
+    Rebuild the movie-partitioned shards (see sharding.partition_csv)
+    params: csv_file, shard_dir, n_shards (default 4)
+    """
+    from sharding import partition_csv
+
+    report(0, 1, "Partitioning")
+    return partition_csv(params["csv_file"], params["shard_dir"], params.get("n_shards", 4))
+
+
+# job kind -> function(params, report) returning a JSON-serialisable result
+JOB_TYPES = {
+    "rescore": rescore_job,
+    "partition": partition_job,
+}
+
+
+def run_job(store, job):
+    """Run one claimed job and record its outcome"""
+    fn = JOB_TYPES.get(job["kind"])
+    if fn is None:
+        store.fail(job["id"], f"Unknown job kind: {job['kind']}")
+        return
+    try:
+        result = fn(job["params"], ProgressReporter(store, job["id"]))
+    except Exception as e:
+        store.fail(job["id"], f"{type(e).__name__}: {e}")
+    else:
+        store.finish(job["id"], result)
+
+
+def work(db_path, stop_event=None, poll_interval=0.5, once=False):
+    """Worker loop: claim and run jobs until stop_event is set (or the queue is empty, with once=True)"""
+    store = JobStore(db_path)
+    name = worker_name()
+    while stop_event is None or not stop_event.is_set():
+        job = store.claim(name)
+        if job is None:
+            if once:
+                return
+            if stop_event is not None:
+                stop_event.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+            continue
+        run_job(store, job)
+
+
+def stop_with_parent(parent_pid, stop_event, interval=1.0):
+    """Set stop_event once process parent_pid has exited (this process is then re-parented)"""
+    while not stop_event.wait(interval):
+        if os.getppid() != parent_pid:
+            stop_event.set()
+
+
+class JobWorkers:
+    def __init__(self, db_path, workers=1, poll_interval=0.5):
+        """
+        Start worker processes for the job table in db_path
+        Jobs left running by workers that are gone are marked failed first.
+        Each worker is a fresh interpreter running "jobs.py worker": it imports only what the jobs
+        need, never the program that started it (such as the web app), and inherits none of its locks.
+        Workers exit after their current job when stopped or when this process exits.
+        """
+        self.db_path = str(db_path)
+        JobStore(self.db_path).fail_interrupted()
+        command = [sys.executable, os.path.abspath(__file__), "--db", self.db_path, "worker",
+                   "--poll-interval", str(poll_interval), "--parent", str(os.getpid())]
+        self._procs = [subprocess.Popen(command) for _ in range(workers)]
+
+    def alive(self):
+        return sum(1 for p in self._procs if p.poll() is None)
+
+    def stop(self, timeout=10):
+        """Stop after the current jobs finish (killed if they take longer than timeout)"""
+        for proc in self._procs:
+            if proc.poll() is None:
+                proc.terminate()  # SIGTERM: the worker finishes its job, then exits
+        for proc in self._procs:
+            try:
+                proc.wait(timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Run or inspect background analytics jobs")
+    parser.add_argument("--db", default=os.path.join(base_dir, "datas", "jobs.sqlite3"))
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("worker", help="run jobs until interrupted")
+    p.add_argument("--once", action="store_true", help="exit when no job is runnable")
+    p.add_argument("--poll-interval", type=float, default=0.5, help="seconds between looks at an empty queue")
+    p.add_argument("--parent", type=int, help="exit when this process does (set by JobWorkers)")
+    p = sub.add_parser("enqueue", help="add a job")
+    p.add_argument("kind", choices=sorted(JOB_TYPES))
+    sub.add_parser("list", help="show recent jobs")
+    args = parser.parse_args()
+
+    store = JobStore(args.db)
+    if args.command == "worker":
+        store.fail_interrupted()
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+        if args.parent is not None:
+            threading.Thread(target=stop_with_parent, args=(args.parent, stop), daemon=True).start()
+        try:
+            work(args.db, stop_event=stop, poll_interval=args.poll_interval, once=args.once)
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "enqueue":
+        params = {
+            "csv_file": os.path.join(base_dir, "datas", "cleaned_reviews.csv"),
+            "dict_path": os.path.join(base_dir, "datas", "AFINN-en-165.txt"),
+            "shard_dir": os.path.join(base_dir, "datas", "shards"),
+        }
+        print(f"Queued job {store.enqueue(args.kind, params)}")
+    else:
+        for job in store.list():
+            print(f"{job['id']:>5}  {job['kind']:<10} {job['status']:<8} {job['progress']:>5.0%}  "
+                  f"{job['error'] or job['message'] or ''}")
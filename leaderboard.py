@@ -0,0 +1,98 @@
+import bisect
+import pandas as pd
+
+"""
+Top/worst movie leaderboard that is kept up to date as reviews are scored
+"""
+
+
+class Leaderboard:
+    def __init__(self, min_reviews=5):
+        """
+        Initialise an empty leaderboard
+        min_reviews: movies with fewer scored reviews are not ranked
+        """
+        self.min_reviews = min_reviews
+        self.totals = {}  # {movie title: [score sum, review count]}
+        self._ranked = []  # sorted (average score, title) for ranked movies only
+
+    def _key(self, title):
+        total, count = self.totals[title]
+        return (total / count, title)
+
+    def _unrank(self, title):
+        """Remove a movie's current entry from the ranking, if it has one"""
+        if self.totals[title][1] < self.min_reviews:
+            return
+        key = self._key(title)
+        i = bisect.bisect_left(self._ranked, key)
+        if i < len(self._ranked) and self._ranked[i] == key:
+            del self._ranked[i]
+
+    def _update(self, title, score_sum, count):
+        if title in self.totals:
+            self._unrank(title)
+        entry = self.totals.setdefault(title, [0.0, 0])
+        entry[0] += score_sum
+        entry[1] += count
+        if entry[1] >= self.min_reviews:
+            bisect.insort(self._ranked, self._key(title))
+
+    def add(self, title, score):
+        """Add one scored review"""
+        self._update(title, float(score), 1)
+
+    def add_totals(self, title, score_sum, count):
+        """Add pre-aggregated reviews of one movie (e.g. entries() of another leaderboard)"""
+        self._update(title, float(score_sum), int(count))
+
+    def add_scores(self, df_sentiment, title_column="Movie Title", score_column="Average Score"):
+        """
+        Add a batch of scored reviews (e.g. the output of process_reviews_df)
+        df_sentiment may also be an iterable of such DataFrames, which are added one at a time.
+        """
+        if not isinstance(df_sentiment, pd.DataFrame):
+            for chunk in df_sentiment:
+                self.add_scores(chunk, title_column, score_column)
+            return self
+        grouped = df_sentiment.groupby(title_column)[score_column].agg(["sum", "count"])
+        for title, row in grouped.iterrows():
+            self._update(title, float(row["sum"]), int(row["count"]))
+        return self
+
+    def _frame(self, entries):
+        return pd.DataFrame(
+            [{"Movie Title": t, "Average Score": round(avg, 2), "Review Count": self.totals[t][1]}
+             for avg, t in entries],
+            columns=["Movie Title", "Average Score", "Review Count"],
+        )
+
+    def top(self, n=5):
+        """Return the n highest-scoring ranked movies as a DataFrame"""
+        return self._frame(self._ranked[max(len(self._ranked) - n, 0):][::-1])
+
+    def worst(self, n=5):
+        """Return the n lowest-scoring ranked movies as a DataFrame"""
+        return self._frame(self._ranked[:n])
+
+    def entries(self, n=5, worst=False):
+        """
+        Return the n highest (or lowest) ranked movies as (title, score sum, review count)
+        Sums rather than averages, so leaderboards over disjoint sets of reviews can be merged.
+        """
+        ranked = self._ranked[:n] if worst else self._ranked[max(len(self._ranked) - n, 0):][::-1]
+        return [(t, *self.totals[t]) for _, t in ranked]
+
+    def __len__(self):
+        return len(self._ranked)
+
+
+if __name__ == "__main__":
+    from text_processing import TextProcessor
+    from scoring_system import process_reviews_df
+
+    processor = TextProcessor("datas/AFINN-en-165.txt")
+    df_reviews = processor.load_reviews("datas/cleaned_reviews.csv", return_df=True, n=1000)
+    board = Leaderboard(min_reviews=5).add_scores(process_reviews_df(df_reviews, processor))
+    print(board.top(5).to_string(index=False))
+    print(board.worst(5).to_string(index=False))
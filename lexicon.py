@@ -0,0 +1,95 @@
+import os
+import threading
+import numpy as np
+from file_utils import atomic_write
+
+"""
+Process-wide registry of sentiment lexicons
+
+Each lexicon file is parsed once per process. The parsed terms and scores are
+also saved as a compiled .npz next to the source file, so later processes load
+two arrays instead of re-parsing the text. Entries are keyed by path and
+modification time, so editing a lexicon file is picked up automatically.
+"""
+
+CACHE_SUFFIX = ".lexicon.npz"
+
+
+def parse_lexicon_file(filepath):
+    """Parse a tab-separated "word<TAB>score" file into {word: score}"""
+    lexicon = {}
+    with open(filepath, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            word, score = line.split("\t")
+            lexicon[word] = int(score)
+    return lexicon
+
+
+def _source_stamp(filepath):
+    st = os.stat(filepath)
+    return np.array([st.st_mtime_ns, st.st_size], dtype=np.int64)
+
+
+def compile_lexicon(filepath, cache_path=None):
+    """Parse filepath and save it as sorted term/score arrays; returns {word: score}"""
+    lexicon = parse_lexicon_file(filepath)
+    terms = np.array(sorted(lexicon), dtype=str)
+    scores = np.array([lexicon[t] for t in terms], dtype=np.int16)
+    cache_path = cache_path or filepath + CACHE_SUFFIX
+    try:
+        with atomic_write(cache_path, "wb") as f:
+            np.savez(f, terms=terms, scores=scores, source=_source_stamp(filepath))
+    except OSError:
+        pass  # read-only location: keep the parsed copy in memory only
+    return lexicon
+
+
+def load_compiled(filepath, cache_path=None):
+    """Load the compiled form of filepath if it is up to date, else None"""
+    cache_path = cache_path or filepath + CACHE_SUFFIX
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as data:
+            if not np.array_equal(data["source"], _source_stamp(filepath)):
+                return None
+            return dict(zip(data["terms"].tolist(), data["scores"].tolist()))
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+class LexiconRegistry:
+    def __init__(self):
+        self._lexicons = {}  # {(absolute path, mtime_ns): {word: score}}
+        self._lock = threading.Lock()
+
+    def get(self, filepath):
+        """
+        Return the shared {word: score} dict for filepath
+        The same dict object is handed to every caller, so it must not be modified.
+        """
+        path = os.path.abspath(filepath)
+        key = (path, os.stat(path).st_mtime_ns)
+        lexicon = self._lexicons.get(key)
+        if lexicon is None:
+            with self._lock:
+                lexicon = self._lexicons.get(key)
+                if lexicon is None:
+                    lexicon = load_compiled(path)
+                    if lexicon is None:
+                        lexicon = compile_lexicon(path)
+                    # drop entries for older versions of the same file
+                    for old in [k for k in self._lexicons if k[0] == path]:
+                        del self._lexicons[old]
+                    self._lexicons[key] = lexicon
+        return lexicon
+
+    def clear(self):
+        with self._lock:
+            self._lexicons.clear()
+
+
+registry = LexiconRegistry()
@@ -0,0 +1,237 @@
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+"""
+Local load generator for the Flask API
+
+Replays a weighted mix of routes at a fixed request rate (open loop: each
+request is scheduled in advance, and latency is measured from its scheduled
+time so a slow server cannot hide its queueing) against either the app
+in-process or a server on localhost. Reports throughput and latency
+percentiles per route and compares them with a saved baseline.
+"""
+
+DEFAULT_MIX = {
+    "search": 2,
+    "compare_movies": 1,
+    "all_movies": 4,
+    "sentiment_analysis": 2,
+    "add_review": 1,
+}
+SEARCH_WORDS = ["great", "boring", "funny", "story", "acting", "love", "worst", "classic"]
+
+
+def parse_mix(text):
+    """Parse "route=weight,route=weight" into {route: weight}"""
+    mix = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        route, _, weight = part.partition("=")
+        route = route.strip()
+        if route not in DEFAULT_MIX:
+            raise ValueError(f"Unknown route in mix: {route}")
+        mix[route] = float(weight) if weight else 1.0
+    return mix
+
+
+def build_request(route, rng, titles):
+    """Return (method, path, json body) for one request to route"""
+    if route == "search":
+        return "GET", "/search?" + urllib.parse.urlencode({"q": rng.choice(SEARCH_WORDS)}), None
+    if route == "compare_movies":
+        movie1, movie2 = rng.sample(titles, 2)
+        return "GET", "/compare_movies?" + urllib.parse.urlencode({"movie1": movie1, "movie2": movie2}), None
+    if route == "all_movies":
+        return "GET", "/all_movies", None
+    if route == "sentiment_analysis":
+        return "GET", "/sentiment_analysis", None
+    if route == "add_review":
+        body = {"movie_name": rng.choice(titles), "review": f"Load test review {rng.getrandbits(64):x}"}
+        return "POST", "/add_review", body
+    raise ValueError(f"Unknown route: {route}")
+
+
+def inprocess_sender(app):
+    """Send requests through Flask's test client (one client per thread)"""
+    local = threading.local()
+
+    def send(method, path, body):
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+        response = local.client.open(path, method=method, json=body)
+        return response.status_code
+
+    return send
+
+
+def http_sender(base_url, timeout=30):
+    """Send requests to a running server, e.g. http://127.0.0.1:5000"""
+    def send(method, path, body):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(base_url.rstrip("/") + path, data=data, method=method)
+        if data is not None:
+            request.add_header("Content-Type", "application/json")
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+        except (urllib.error.URLError, OSError):
+            return 0
+
+    return send
+
+
+def run_load(send, titles, mix=None, rate=20.0, duration=10.0, concurrency=16, seed=None):
+    """
+    Replay the mix at rate requests/second for duration seconds
+    Returns list of (route, status, latency seconds, finished at seconds)
+    """
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    routes, weights = zip(*mix.items())
+    total = int(rate * duration)
+    plan = [build_request(route, rng, titles) + (route,)
+            for route in rng.choices(routes, weights=weights, k=total)]
+
+    records, lock = [], threading.Lock()
+    start = time.perf_counter()
+
+    def fire(scheduled, method, path, body, route):
+        status = send(method, path, body)
+        finished = time.perf_counter()
+        with lock:
+            records.append((route, status, finished - scheduled, finished - start))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i, (method, path, body, route) in enumerate(plan):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, scheduled, method, path, body, route)
+    return records
+
+
+def summarize(records):
+    """Per-route count, errors, throughput and latency percentiles (ms)"""
+    if not records:
+        return {}
+    elapsed = max(r[3] for r in records) or 1e-9
+    summary = {}
+    for route in sorted({r[0] for r in records}):
+        rows = [r for r in records if r[0] == route]
+        latencies = np.array([r[2] for r in rows]) * 1000
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        summary[route] = {
+            "count": len(rows),
+            "errors": sum(1 for r in rows if not 200 <= r[1] < 300),
+            "throughput": round(len(rows) / elapsed, 2),
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+        }
+    return summary
+
+
+def compare_to_baseline(summary, baseline, threshold=0.2):
+    """
+    Compare latency percentiles with a baseline summary
+    Returns {route: {"p50_ms": change, ..., "regressed": bool}} where change is relative (0.1 = 10% slower)
+    """
+    comparison = {}
+    for route, current in summary.items():
+        base = baseline.get(route)
+        if not base:
+            continue
+        changes = {}
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            changes[key] = round((current[key] - base[key]) / base[key], 3) if base[key] else None
+        changes["regressed"] = any(c is not None and c > threshold for c in changes.values())
+        comparison[route] = changes
+    return comparison
+
+
+def print_report(summary, comparison=None):
+    print(f"{'route':<20}{'count':>7}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for route, s in summary.items():
+        line = (f"{route:<20}{s['count']:>7}{s['errors']:>8}{s['throughput']:>9}"
+                f"{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}")
+        if comparison and route in comparison:
+            c = comparison[route]
+            line += f"   p99 {c['p99_ms']:+.0%}" if c["p99_ms"] is not None else ""
+            line += "  REGRESSED" if c["regressed"] else ""
+        print(line)
+
+
+if __name__ == "__main__":
+    import argparse
+    import shutil
+    import sys
+    import tempfile
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Replay a mix of API traffic and report latency per route")
+    parser.add_argument("--url", help="server to test, e.g. http://127.0.0.1:5000 (default: run the app in-process)")
+    parser.add_argument("--rate", type=float, default=20.0, help="requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of traffic")
+    parser.add_argument("--concurrency", type=int, default=16, help="maximum requests in flight")
+    parser.add_argument("--mix", default=None, help='weights, e.g. "search=2,all_movies=4,add_review=0"')
+    parser.add_argument("--allow-writes", action="store_true", help="send /add_review to a --url server")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", help="write this run's summary as a baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown counted as a regression")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix) if args.mix else dict(DEFAULT_MIX)
+    csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datas", "cleaned_reviews.csv")
+    titles = pd.read_csv(csv_path)["movie_title"].dropna().unique().tolist()
+
+    if args.url:
+        if not args.allow_writes:
+            mix.pop("add_review", None)  # never write to a real server by accident
+        send = http_sender(args.url)
+    else:
+        # in-process: the app serves and writes to a throwaway copy of the dataset from the start.
+        # Its settings are read on import, so they are set first.
+        scratch_dir = tempfile.mkdtemp()
+        scratch = os.path.join(scratch_dir, "reviews.csv")
+        shutil.copy(csv_path, scratch)
+        os.environ.update({
+            "REVIEWS_CSV": scratch,
+            "WARM_START_PATH": os.path.join(scratch_dir, "analytics.snapshot"),
+            "JOBS_DB": os.path.join(scratch_dir, "jobs.sqlite3"),
+        })
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "website"))
+        import app as webapp
+
+        send = inprocess_sender(webapp.app)
+
+    records = run_load(send, titles, mix, rate=args.rate, duration=args.duration,
+                       concurrency=args.concurrency, seed=args.seed)
+    summary = summarize(records)
+
+    comparison = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            comparison = compare_to_baseline(summary, json.load(f), args.threshold)
+    print_report(summary, comparison)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"Baseline saved to: {args.save_baseline}")
+
+    if comparison and any(c["regressed"] for c in comparison.values()):
+        sys.exit(1)
@@ -1,43 +1,205 @@
 from pathlib import Path
+from statistics import NormalDist
+import math
+import time
+import numpy as np
 import pandas as pd
 from text_processing import TextProcessor
 from scoring_system import process_reviews_df
+from title_offsets import open_index
+from profiling import maybe_profile, pop_profile_flags
 
-def compare_movies(filepath, movie1, movie2, dict_path="datas/AFINN-en-165.txt"):
+
+REVIEW_CHUNK_SIZE = 20000  # rows per chunk when streaming reviews from a file
+
+
+def _is_title_column(name, loose=False):
+    """Whether a column looks like the movie-title column (loose: any name mentioning movie or title)"""
+    name = name.strip().lower()
+    if name in ("movie title", "movie_title", "title", "movie"):
+        return True
+    return loose and ("movie" in name or "title" in name)
+
+
+def _find_title_column(columns):
+    """Pick the movie-title column, preferring exact names"""
+    for loose in (False, True):
+        for c in columns:
+            if _is_title_column(c, loose):
+                return c
+    return None
+
+
+def _collect_movie_reviews(chunks, titles):
+    """
+    Keep the reviews of the given lowercase titles from an iterable of review chunks
+    Returns (DataFrame, number of reviews read, sorted sample of titles seen).
+    """
+    kept, total, seen, columns = [], 0, set(), []
+    for chunk in chunks:
+        columns = chunk.columns
+        total += len(chunk)
+        title_col = _find_title_column(chunk.columns)
+        if title_col is None:
+            kept.append(chunk)  # reported as a missing title column below
+            continue
+        norm = chunk[title_col].astype(str).str.strip().str.lower()
+        if len(seen) < 200:
+            seen.update(norm.unique().tolist())
+        kept.append(chunk[norm.isin(titles)])
+    df = pd.concat(kept) if kept else pd.DataFrame(columns=columns)
+    return df.copy(), total, sorted(seen)[:200]
+
+
+def _to_python(row):
+    """Convert numpy scalars in a row dict to python types for JSON"""
+    return {k: (v.item() if isinstance(v, np.generic) else v) for k, v in row.items()}
+
+
+def _mean_and_margin(scores, population, z):
+    """Sample mean and confidence margin, with finite population correction"""
+    n = len(scores)
+    if n == 0:
+        return None, None
+    mean = float(np.mean(scores))
+    if n >= population:
+        return mean, 0.0  # every review was scored, so the mean is exact
+    if n < 2:
+        return mean, None
+    se = float(np.std(scores, ddof=1)) / math.sqrt(n) * math.sqrt((population - n) / (population - 1))
+    return mean, z * se
+
+
+def approximate_movie_stats(
+    df_movie,
+    processor,
+    sample_size=200,
+    target_error=None,
+    time_budget=None,
+    confidence=0.95,
+    rng=None
+):
+    """
+    Estimate one movie's average sentiment from a random sample of its reviews.
+
+    Parameters:
+        df_movie (DataFrame): All reviews of the movie.
+        processor (TextProcessor): Processor used for scoring.
+        sample_size (int): Reviews scored in the first round and in each refinement round.
+        target_error (float, optional): Keep sampling until the confidence margin is at most this.
+        time_budget (float, optional): Keep sampling until this many seconds have passed.
+        confidence (float): Confidence level of the reported interval.
+        rng (numpy Generator, optional): Random generator, for reproducible samples.
+
+    Returns:
+        dict: Same keys as compare_movies' exact stats plus mode, sampled_count,
+              margin_of_error and confidence_interval.
+    """
+    rng = rng or np.random.default_rng()
+    start = time.perf_counter()
+    total = len(df_movie)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    # any prefix of a random permutation is a uniform sample, so refining just reads further along it
+    order = rng.permutation(total)
+    scored, taken = [], 0
+    while True:
+        batch = df_movie.iloc[order[taken:taken + sample_size]]
+        taken += len(batch)
+        scored.append(process_reviews_df(batch, processor))
+        df_sentiment = pd.concat(scored, ignore_index=True)
+        mean, margin = _mean_and_margin(df_sentiment["Average Score"].to_numpy(dtype=float), total, z)
+
+        if taken >= total or (target_error is None and time_budget is None):
+            break
+        if target_error is not None and margin is not None and margin <= target_error:
+            break
+        if time_budget is not None and time.perf_counter() - start >= time_budget:
+            break
+
+    if df_sentiment.empty:
+        return {"error": "No reviews for this movie after sentiment processing."}
+
+    exact = len(df_sentiment) >= total
+    return {
+        "mode": "exact" if exact else "approximate",
+        "average_sentiment": mean,
+        "review_count": int(total),
+        "sampled_count": int(len(df_sentiment)),
+        "confidence": confidence,
+        "margin_of_error": margin,
+        "confidence_interval": [mean - margin, mean + margin] if margin is not None else None,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        "most_positive": _to_python(df_sentiment.loc[df_sentiment["Average Score"].idxmax()].to_dict()),
+        "most_negative": _to_python(df_sentiment.loc[df_sentiment["Average Score"].idxmin()].to_dict()),
+    }
+
+
+def compare_movies(
+    filepath,
+    movie1,
+    movie2,
+    dict_path="datas/AFINN-en-165.txt",
+    df_reviews=None,
+    approximate=False,
+    sample_size=200,
+    target_error=None,
+    time_budget=None,
+    seed=None,
+    title_index=None
+):
     """
     Robust compare function:
     - Checks file existence
     - Normalizes title column and input to lowercase
     - Returns helpful debug info in errors
+    df_reviews: already-loaded reviews (e.g. a dataset snapshot) or an iterator of review chunks;
+    skips reading filepath. Without it only the two movies' rows are read if the file has a
+    title index (see title_offsets.py); otherwise the file is streamed in chunks.
+    title_index: TitleOffsetIndex of filepath kept current by the caller (e.g. DatasetStore.title_index),
+    used instead of opening the sidecar file
+    approximate: score a random sample per movie and report a confidence interval
+    (see approximate_movie_stats for sample_size, target_error and time_budget)
+    Each movie's stats say whether they are "exact" or "approximate" under "mode".
     """
     filepath = str(filepath)
     debug = {"filepath": filepath}
+    processor = TextProcessor(dict_path)
 
-    # 1) file exists?
-    p = Path(filepath)
-    if not p.exists():
-        return {"error": f"Data file not found: {filepath}", "debug": debug}
+    m1 = movie1.strip().lower()
+    m2 = movie2.strip().lower()
+    total_reviews, unique_titles, index = None, None, None
 
-    # 2) load reviews using your TextProcessor (keeps your existing loader)
-    processor = TextProcessor(dict_path)
-    df_reviews = processor.load_reviews(filepath, return_df=True)
+    if df_reviews is None:
+        # 1) file exists?
+        p = Path(filepath)
+        if not p.exists():
+            return {"error": f"Data file not found: {filepath}", "debug": debug}
+
+        # 2) read only the title-like and review columns: with a title index next to the file
+        # (see title_offsets.py) just the two movies' rows, otherwise the file streamed in chunks
+        columns = lambda c: c == "review_content" or _is_title_column(c, loose=True)
+        index = title_index if title_index is not None else open_index(filepath)
+        if index is not None:
+            df_reviews = index.read(filepath, [m1, m2], usecols=columns, dtype=str)
+            total_reviews = index.rows  # its titles are only listed when a movie is not found
+        else:
+            df_reviews = processor.load_reviews(filepath, chunksize=REVIEW_CHUNK_SIZE, columns=columns)
+
+    if isinstance(df_reviews, pd.DataFrame):
+        # work on a copy so the caller's frame is never modified
+        df_reviews = df_reviews.dropna(subset=["review_content"]).copy()
+    else:
+        # keep only the two movies' reviews from each chunk, so memory does not grow with the file
+        df_reviews, total_reviews, unique_titles = _collect_movie_reviews(df_reviews, {m1, m2})
 
     if df_reviews is None:
         return {"error": "processor.load_reviews returned None", "debug": debug}
-    if df_reviews.empty:
+    if df_reviews.empty and not total_reviews:
         return {"error": "No reviews loaded from file.", "debug": {"columns": df_reviews.columns.tolist()}}
 
     # 3) find movie title column flexibly
-    title_col = None
-    for c in df_reviews.columns:
-        if c.strip().lower() in ("movie title", "movie_title", "title", "movie"):
-            title_col = c
-            break
-    if title_col is None:
-        for c in df_reviews.columns:
-            if "movie" in c.lower() or "title" in c.lower():
-                title_col = c
-                break
+    title_col = _find_title_column(df_reviews.columns)
     if title_col is None:
         return {
             "error": "No movie-title column found in dataset.",
@@ -47,11 +209,10 @@ def compare_movies(filepath, movie1, movie2, dict_path="datas/AFINN-en-165.txt")
     # 4) normalize titles for case-insensitive matching
     df_reviews['movie_title_norm'] = df_reviews[title_col].astype(str).str.strip().str.lower()
 
-    m1 = movie1.strip().lower()
-    m2 = movie2.strip().lower()
-
     # show a small sample of unique titles for debugging
-    unique_titles = sorted(df_reviews['movie_title_norm'].unique().tolist())[:200]
+    if unique_titles is None and index is None:
+        unique_titles = sorted(df_reviews['movie_title_norm'].unique().tolist())[:200]
+        total_reviews = len(df_reviews)
 
     # 5) filter case-insensitively
     df_filtered = df_reviews[df_reviews['movie_title_norm'].isin([m1, m2])]
@@ -61,11 +222,26 @@ def compare_movies(filepath, movie1, movie2, dict_path="datas/AFINN-en-165.txt")
             "debug": {
                 "m1": m1,
                 "m2": m2,
-                "available_titles_sample": unique_titles[:50],
-                "total_reviews_in_file": int(len(df_reviews))
+                "available_titles_sample": (index.titles() if index is not None else unique_titles)[:50],
+                "total_reviews_in_file": int(total_reviews)
             }
         }
 
+    # 5b) approximate mode: only a sample of each movie's reviews is scored
+    if approximate:
+        rng = np.random.default_rng(seed)
+        stats = {}
+        for orig_name in [movie1, movie2]:
+            df_m = df_filtered[df_filtered['movie_title_norm'] == orig_name.strip().lower()]
+            if df_m.empty:
+                stats[orig_name] = {"error": "No reviews for this movie after sentiment processing."}
+                continue
+            stats[orig_name] = approximate_movie_stats(
+                df_m, processor, sample_size=sample_size, target_error=target_error,
+                time_budget=time_budget, rng=rng
+            )
+        return stats
+
     # 6) process sentiment on the filtered df
     df_sentiment = process_reviews_df(df_filtered.copy(), processor)
     if df_sentiment is None or df_sentiment.empty:
@@ -112,24 +288,17 @@ def compare_movies(filepath, movie1, movie2, dict_path="datas/AFINN-en-165.txt")
 
         average_sentiment = float(df_m[score_col].mean()) if score_col is not None else None
 
+        # numpy values are left as they are: the JSON provider serialises them directly
+        df_rows = df_m.drop(columns=["movie_title_norm"])
         if score_col is not None:
-            most_pos_row = df_m.loc[df_m[score_col].idxmax()].to_dict()
-            most_neg_row = df_m.loc[df_m[score_col].idxmin()].to_dict()
+            most_pos_row = df_rows.loc[df_m[score_col].idxmax()].to_dict()
+            most_neg_row = df_rows.loc[df_m[score_col].idxmin()].to_dict()
         else:
-            most_pos_row = df_m.iloc[0].to_dict()
-            most_neg_row = df_m.iloc[0].to_dict()
-
-        # convert numpy scalars to python types for JSON
-        try:
-            import numpy as _np
-            for d in (most_pos_row, most_neg_row):
-                for k, v in list(d.items()):
-                    if isinstance(v, _np.generic):
-                        d[k] = v.item()
-        except Exception:
-            pass
+            most_pos_row = df_rows.iloc[0].to_dict()
+            most_neg_row = df_rows.iloc[0].to_dict()
 
         stats[orig_name] = {
+            "mode": "exact",
             "average_sentiment": average_sentiment,
             "review_count": int(len(df_m)),
             "most_positive": most_pos_row,
@@ -142,13 +311,15 @@ def compare_movies(filepath, movie1, movie2, dict_path="datas/AFINN-en-165.txt")
 
 if __name__ == "__main__":
     import sys
-    if len(sys.argv) < 3:
-        print("Usage: python movie_comparison.py <movie1> <movie2>")
+    profile, profile_interval, args = pop_profile_flags(sys.argv[1:])
+    if len(args) < 2:
+        print("Usage: python movie_comparison.py <movie1> <movie2> [--profile] [--profile-interval=<ms>]")
         sys.exit(1)
 
-    movie1 = sys.argv[1]
-    movie2 = sys.argv[2]
+    movie1 = args[0]
+    movie2 = args[1]
 
     filepath = "datas/cleaned_reviews.csv"
-    result = compare_movies(filepath, movie1, movie2)
+    with maybe_profile("movie_comparison", profile, profile_interval):
+        result = compare_movies(filepath, movie1, movie2)
     print(result)
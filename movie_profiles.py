@@ -0,0 +1,169 @@
+import threading
+import numpy as np
+import pandas as pd
+from autocomplete import normalize_title
+from distributions import HIST_EDGES
+from review_index import blocked_top_k
+from view_movies import split_genres
+
+"""
+Sentiment profiles of movies, for finding movies that are received alike
+
+A movie's profile is built from its scored reviews: the share of its reviews
+in each 1-point score bin (the bins of distributions.py), the share of
+positive and of negative reviews, and its genres as a bitmask (one bit per
+genre, as in review_index.py). Each part is normalised on its own and
+weighted, and all profiles are stacked in one matrix, so the movies most
+like a given one are a matrix-vector product and a top-k. New reviews
+update their movie's counters and only that movie's row is recomputed
+before the next query.
+"""
+
+N_BINS = len(HIST_EDGES) + 1
+MAX_GENRES = 63  # genre bits fit in an int64
+BLOCK_WEIGHTS = {"histogram": 1.0, "shares": 1.0, "genres": 0.5}
+
+
+def _unit_rows(block):
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    return block / np.where(norms > 0, norms, 1.0)
+
+
+class MovieProfiles:
+    def __init__(self, min_reviews=5):
+        """min_reviews: movies with fewer reviews are not suggested (their profile is too noisy)"""
+        self.min_reviews = min_reviews
+        self.movies = []  # movie code -> display title (first seen)
+        self._movie_index = {}  # normalized title -> movie code
+        self.genres = []  # genre bit -> genre name
+        self._genre_bits = {}
+        self._hist = np.zeros((0, N_BINS))  # review counts per score bin
+        self._signs = np.zeros((0, 2))  # positive, negative review counts
+        self._masks = np.zeros(0, dtype=np.int64)  # genre bitmask
+        self._features = np.zeros((0, N_BINS + 2 + MAX_GENRES), dtype=np.float32)
+        self._dirty = set()  # codes whose feature row is out of date
+        self._lock = threading.Lock()
+
+    def _code(self, title):
+        key = normalize_title(title)
+        code = self._movie_index.get(key)
+        if code is None:
+            code = len(self.movies)
+            self._movie_index[key] = code
+            self.movies.append(title)
+        return code
+
+    def _mask(self, genres):
+        mask = 0
+        for g in split_genres(genres):
+            if g not in self._genre_bits and len(self._genre_bits) < MAX_GENRES:
+                self._genre_bits[g] = 1 << len(self._genre_bits)
+                self.genres.append(g)
+            mask |= self._genre_bits.get(g, 0)
+        return mask
+
+    def _grow(self):
+        """Make room for every known movie (capacity doubles, so growing is amortised)"""
+        n = len(self.movies)
+        if n <= len(self._masks):
+            return
+        capacity = max(n, 2 * len(self._masks), 64)
+        extra = capacity - len(self._masks)
+        self._hist = np.vstack([self._hist, np.zeros((extra, N_BINS))])
+        self._signs = np.vstack([self._signs, np.zeros((extra, 2))])
+        self._masks = np.concatenate([self._masks, np.zeros(extra, dtype=np.int64)])
+        self._features = np.vstack([self._features, np.zeros((extra, self._features.shape[1]), dtype=np.float32)])
+
+    def add_scores(self, df_sentiment, title_column="Movie Title", genres_column="Genres",
+                   score_column="Average Score"):
+        """Add a batch of scored reviews (e.g. the output of score_corpus)"""
+        title_codes, titles = pd.factorize(df_sentiment[title_column])
+        scores = df_sentiment[score_column].to_numpy(dtype=np.float64)
+        if genres_column in df_sentiment.columns:
+            first_genres = df_sentiment[genres_column].groupby(title_codes).first().to_dict()
+        else:
+            first_genres = {}
+        with self._lock:
+            codes = np.array([self._code(t) for t in titles], dtype=np.int64)
+            self._grow()
+            for i, code in enumerate(codes):
+                if not self._masks[code]:
+                    self._masks[code] = self._mask(first_genres.get(i))
+            codes = codes[title_codes]
+            bins = np.searchsorted(HIST_EDGES, scores, "right")
+            np.add.at(self._hist, (codes, bins), 1)
+            np.add.at(self._signs, (codes, 0), scores > 0)
+            np.add.at(self._signs, (codes, 1), scores < 0)
+            self._dirty.update(np.unique(codes).tolist())
+        return self
+
+    def add(self, title, genres, score):
+        """Add one scored review"""
+        with self._lock:
+            code = self._code(title)
+            self._grow()
+            if not self._masks[code]:
+                self._masks[code] = self._mask(genres)
+            self._hist[code, np.searchsorted(HIST_EDGES, score, "right")] += 1
+            self._signs[code] += (score > 0, score < 0)
+            self._dirty.add(code)
+
+    def _refresh(self):
+        """Recompute the feature rows of movies that got reviews since the last query"""
+        if not self._dirty:
+            return
+        codes = np.fromiter(self._dirty, dtype=np.int64, count=len(self._dirty))
+        counts = self._hist[codes].sum(axis=1, keepdims=True)
+        counts[counts == 0] = 1
+        genre_bits = (self._masks[codes, None] >> np.arange(MAX_GENRES)) & 1
+        blocks = [
+            BLOCK_WEIGHTS["histogram"] * _unit_rows(self._hist[codes] / counts),
+            BLOCK_WEIGHTS["shares"] * _unit_rows(self._signs[codes] / counts),
+            BLOCK_WEIGHTS["genres"] * _unit_rows(genre_bits.astype(np.float64)),
+        ]
+        self._features[codes] = _unit_rows(np.hstack(blocks))
+        self._dirty = set()
+
+    def find(self, title):
+        """Display title of a movie (ignoring case and spacing), or None"""
+        code = self._movie_index.get(normalize_title(title))
+        return None if code is None else self.movies[code]
+
+    def profile(self, title):
+        """Review count, positive/negative review shares and genres of a movie; raises KeyError if unknown"""
+        code = self._movie_index[normalize_title(title)]
+        with self._lock:
+            count = int(self._hist[code].sum())
+            positive, negative = self._signs[code]
+            mask = int(self._masks[code])
+        return {
+            "movie_title": self.movies[code],
+            "review_count": count,
+            "positive_share": round(positive / count, 4) if count else None,
+            "negative_share": round(negative / count, 4) if count else None,
+            "genres": sorted(g for bit, g in enumerate(self.genres) if mask >> bit & 1),
+        }
+
+    def similar(self, title, k=10, scope=None):
+        """
+        The k movies whose profiles are closest to title's (cosine similarity)
+        scope: None for every movie, "genre" for movies sharing a genre with it
+        Returns a list of (display title, similarity, review count); raises KeyError for an unknown movie.
+        """
+        if scope not in (None, "genre"):
+            raise ValueError(f"Unknown scope: {scope}")
+        code = self._movie_index[normalize_title(title)]
+        with self._lock:
+            self._refresh()
+            n = len(self.movies)
+            counts = self._hist[:n].sum(axis=1)
+            scores = self._features[:n] @ self._features[code]
+            scores[counts < self.min_reviews] = -np.inf
+            if scope == "genre":
+                scores[(self._masks[:n] & self._masks[code]) == 0] = -np.inf
+            scores[code] = -np.inf  # never suggest the movie itself
+            top = blocked_top_k(scores, k)
+            return [(self.movies[i], float(scores[i]), int(counts[i])) for i in top if np.isfinite(scores[i])]
+
+    def __len__(self):
+        return len(self.movies)
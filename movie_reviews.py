@@ -0,0 +1,126 @@
+from array import array
+import threading
+import numpy as np
+import pandas as pd
+from autocomplete import normalize_title
+
+"""
+Each movie's reviews sorted by sentiment score, for browsing one movie at a time
+
+Every movie owns a run of two arrays (scores, review ids) sorted by score,
+then review id. A score range is found with two binary searches and a page
+continues after a (score, review id) cursor with two more, so a deep page
+costs the same as the first. Reviews scored later wait in a small pending
+list; before the next query they are inserted into their own movies' runs
+at positions found by binary search, so a write costs in proportion to the
+movies it touches, not to the corpus.
+"""
+
+EMPTY_RUN = (np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.int64))
+
+
+def merge_run(run, new_scores, new_ids):
+    """Insert reviews sorted by (score, review id) into a run sorted the same way; returns the new run"""
+    scores, ids = run
+    if not len(scores):
+        return new_scores.copy(), new_ids.copy()  # not views that keep the whole pending batch alive
+    positions = np.searchsorted(scores, new_scores, "left")
+    ends = np.searchsorted(scores, new_scores, "right")
+    for i in np.flatnonzero(ends > positions):  # equal scores already in the run: place by review id
+        positions[i] += np.searchsorted(ids[positions[i]:ends[i]], new_ids[i])
+    return np.insert(scores, positions, new_scores), np.insert(ids, positions, new_ids)
+
+
+class MovieReviewIndex:
+    def __init__(self):
+        self.movies = []  # movie code -> display title (first seen)
+        self._movie_index = {}  # normalized title -> movie code
+        # movie code -> (scores, review ids), a movie's run is replaced as a whole so readers always see one version
+        self._runs = []
+        self._size = 0  # reviews in the runs
+        self._lock = threading.Lock()
+        self._pending_codes = array("i")
+        self._pending_scores = array("d")
+        self._pending_ids = array("q")
+
+    def _code(self, title):
+        key = normalize_title(title)
+        code = self._movie_index.get(key)
+        if code is None:
+            code = len(self.movies)
+            self._runs.append(EMPTY_RUN)
+            self._movie_index[key] = code
+            self.movies.append(title)
+        return code
+
+    def add_scores(self, df_sentiment, title_column="Movie Title", score_column="Average Score"):
+        """Add a batch of scored reviews (e.g. the output of score_corpus)"""
+        title_codes, titles = pd.factorize(df_sentiment[title_column])
+        with self._lock:
+            codes = np.array([self._code(t) for t in titles], dtype=np.int32)[title_codes]
+            self._pending_codes.frombytes(codes.tobytes())
+            self._pending_scores.frombytes(df_sentiment[score_column].to_numpy(dtype=np.float64).tobytes())
+            self._pending_ids.frombytes(df_sentiment["Review ID"].to_numpy(dtype=np.int64).tobytes())
+        return self
+
+    def compact(self):
+        """Merge the pending reviews into their movies' runs (the other movies' runs are not touched)"""
+        with self._lock:
+            if not self._pending_ids:
+                return
+            codes = np.frombuffer(self._pending_codes, dtype=np.int32)
+            scores = np.frombuffer(self._pending_scores, dtype=np.float64)
+            review_ids = np.frombuffer(self._pending_ids, dtype=np.int64)
+            order = np.lexsort((review_ids, scores, codes))  # copies, so the pending arrays can be dropped
+            codes, scores, review_ids = codes[order], scores[order], review_ids[order]
+            bounds = np.flatnonzero(np.diff(codes)) + 1
+            for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(codes)]):
+                code = codes[start]
+                self._runs[code] = merge_run(self._runs[code], scores[start:end], review_ids[start:end])
+            self._size += len(order)
+            self._pending_codes = array("i")
+            self._pending_scores = array("d")
+            self._pending_ids = array("q")
+
+    def find(self, title):
+        """Display title of a movie (matched like the rest of the app, ignoring case and spacing), or None"""
+        code = self._movie_index.get(normalize_title(title))
+        return None if code is None else self.movies[code]
+
+    def page(self, title, descending=True, min_score=None, max_score=None, after=None, limit=20):
+        """
+        One page of a movie's reviews ordered by score (ties by review id)
+        min_score, max_score: inclusive score range (None = unbounded)
+        after: (score, review id) of the last review of the previous page, None for the first page
+        Returns (list of (review id, score), number of reviews in the score range, cursor for the
+        next page or None on the last page). Raises KeyError for an unknown movie.
+        """
+        code = self._movie_index[normalize_title(title)]
+        self.compact()
+        scores, ids = self._runs[code]
+
+        lo = 0 if min_score is None else int(np.searchsorted(scores, min_score, "left"))
+        hi = len(scores) if max_score is None else int(np.searchsorted(scores, max_score, "right"))
+        total = max(0, hi - lo)
+        if after is not None:
+            # position of the cursor inside its run of equal scores
+            score, review_id = after
+            a = int(np.searchsorted(scores, score, "left"))
+            b = int(np.searchsorted(scores, score, "right"))
+            if descending:
+                hi = min(hi, a + int(np.searchsorted(ids[a:b], review_id, "left")))
+            else:
+                lo = max(lo, a + int(np.searchsorted(ids[a:b], review_id, "right")))
+
+        if descending:
+            picked = np.arange(hi - 1, max(lo, hi - limit) - 1, -1)
+        else:
+            picked = np.arange(lo, min(hi, lo + limit))
+        rows = [(int(ids[i]), float(scores[i])) for i in picked]
+        cursor = None
+        if rows and (picked[-1] > lo if descending else picked[-1] < hi - 1):
+            cursor = (rows[-1][1], rows[-1][0])
+        return rows, total, cursor
+
+    def __len__(self):
+        return self._size + len(self._pending_ids)
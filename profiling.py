@@ -0,0 +1,127 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+"""
+Opt-in sampling profiler that writes folded call stacks
+
+Output files use the "folded" format understood by flamegraph.pl, speedscope
+and inferno: one line per distinct stack, frames root-first separated by ";",
+followed by the number of samples. Nothing here runs unless profiling is
+switched on, so leaving the hooks in place costs nothing.
+"""
+
+DEFAULT_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 5))
+DEFAULT_PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, interval_ms=None):
+        """
+        interval_ms: time between samples in milliseconds
+        Only threads registered with add_thread are sampled.
+        """
+        self.interval = (interval_ms or DEFAULT_INTERVAL_MS) / 1000.0
+        self.samples = Counter()
+        self._threads = {}  # {thread ident: label}
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def add_thread(self, ident=None, label=None):
+        ident = ident or threading.get_ident()
+        self._threads[ident] = label or threading.current_thread().name
+
+    def remove_thread(self, ident=None):
+        self._threads.pop(ident or threading.get_ident(), None)
+
+    def wrap(self, fn):
+        """Return fn wrapped so whichever thread runs it is sampled while it runs"""
+        def profiled(*args, **kwargs):
+            self.add_thread()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.remove_thread()
+        return profiled
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for ident, label in list(self._threads.items()):
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if stack:
+                    stack.append(label)
+                    self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        """Start sampling the calling thread"""
+        self.add_thread()
+        self._sampler = threading.Thread(target=self._sample, name="profiler", daemon=True)
+        self._sampler.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+    def folded(self):
+        """Return the samples as folded-stack lines"""
+        return [f"{stack} {count}" for stack, count in self.samples.most_common()]
+
+    def write(self, name, out_dir=None):
+        """Write the folded stacks to <out_dir>/<name>-<timestamp>.folded and return the path"""
+        out_dir = out_dir or DEFAULT_PROFILE_DIR
+        os.makedirs(out_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}"
+        path = os.path.join(out_dir, f"{name}-{stamp}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.folded()) + "\n")
+        return path
+
+
+@contextmanager
+def profile_run(name, interval_ms=None, out_dir=None):
+    """Profile the body of a with-block and write one folded profile when it ends"""
+    profiler = SamplingProfiler(interval_ms).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        path = profiler.write(name, out_dir)
+        print(f"Profile written to: {path} ({sum(profiler.samples.values())} samples)")
+
+
+def maybe_profile(name, enabled, interval_ms=None):
+    """profile_run when enabled, otherwise a no-op context"""
+    return profile_run(name, interval_ms) if enabled else nullcontext()
+
+
+def pop_profile_flags(argv):
+    """
+    Remove --profile and --profile-interval=<ms> from an argument list
+    Returns (enabled, interval_ms, remaining arguments).
+    """
+    enabled, interval_ms, rest = False, None, []
+    for arg in argv:
+        if arg == "--profile":
+            enabled = True
+        elif arg.startswith("--profile-interval="):
+            enabled = True
+            interval_ms = float(arg.split("=", 1)[1])
+        else:
+            rest.append(arg)
+    return enabled, interval_ms, rest
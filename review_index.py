@@ -0,0 +1,263 @@
+import threading
+import zlib
+import numpy as np
+import pandas as pd
+from text_processing import TextProcessor
+from view_movies import split_genres
+from text_store import CompressedTextStore
+
+"""
+Hashed TF-IDF vectors for finding reviews similar to a given review
+"""
+
+
+def blocked_top_k(scores, k, block_size=4096):
+    """
+    Return the indices of the k largest scores, best first.
+    The array is scanned in blocks so only k candidates per block are kept.
+    """
+    if k <= 0 or len(scores) == 0:
+        return np.array([], dtype=np.int64)
+
+    candidates = []
+    for start in range(0, len(scores), block_size):
+        block = scores[start:start + block_size]
+        if len(block) > k:
+            idx = np.argpartition(-block, k - 1)[:k]
+        else:
+            idx = np.arange(len(block))
+        candidates.append(idx + start)
+
+    candidates = np.concatenate(candidates)
+    if len(candidates) > k:
+        keep = np.argpartition(-scores[candidates], k - 1)[:k]
+        candidates = candidates[keep]
+    order = np.argsort(-scores[candidates], kind="stable")
+    return candidates[order]
+
+
+class ReviewIndex:
+    def __init__(self, n_features=2 ** 18, block_size=4096, merge_every=2048):
+        """
+        Initialise an empty index
+        n_features: size of the hashed feature space
+        block_size: number of reviews scanned per block during top-k search
+        merge_every: reviews added after build() that are kept apart before the postings are rebuilt
+        """
+        self.n_features = n_features
+        self.block_size = block_size
+        self.merge_every = merge_every
+        self.processor = TextProcessor()
+        self._hash_cache = {}
+        self._lock = threading.RLock()
+        self.n_docs = 0
+
+    def _hash(self, token):
+        """Map a token to its feature id"""
+        h = self._hash_cache.get(token)
+        if h is None:
+            h = zlib.crc32(token.encode("utf-8")) % self.n_features
+            self._hash_cache[token] = h
+        return h
+
+    def _term_counts(self, text):
+        """Return (feature ids, counts) for one piece of text"""
+        ids = [self._hash(t) for t in self.processor.tokenize(text)]
+        if not ids:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+        features, counts = np.unique(np.array(ids, dtype=np.int64), return_counts=True)
+        return features, counts.astype(np.float32)
+
+    def _rows(self, df, title_column, text_column, genre_column):
+        """Movie codes, genre masks and (doc offset, feature ids, counts) of the rows of df"""
+        titles = df[title_column].astype(str).tolist()
+        codes = np.empty(len(titles), dtype=np.int64)
+        for i, title in enumerate(titles):
+            code = self._movie_index.get(title)
+            if code is None:
+                code = self._movie_index[title] = len(self.movies)
+                self.movies.append(title)
+            codes[i] = code
+
+        # one bit per genre so "same genre" is a single AND
+        genre_lists = df[genre_column].map(split_genres) if genre_column in df.columns else [[]] * len(df)
+        masks = np.zeros(len(df), dtype=np.int64)
+        for i, genres in enumerate(genre_lists):
+            for g in genres:
+                if g not in self._genre_bits and len(self._genre_bits) < 63:
+                    self._genre_bits[g] = 1 << len(self._genre_bits)
+                masks[i] |= self._genre_bits.get(g, 0)
+
+        # term counts per review
+        texts = df[text_column].fillna("").astype(str).tolist()
+        doc_ids, feature_ids, counts = [], [], []
+        for i, text in enumerate(texts):
+            f, c = self._term_counts(text)
+            doc_ids.append(np.full(len(f), i, dtype=np.int64))
+            feature_ids.append(f)
+            counts.append(c)
+        doc_ids = np.concatenate(doc_ids) if doc_ids else np.array([], dtype=np.int64)
+        feature_ids = np.concatenate(feature_ids) if feature_ids else np.array([], dtype=np.int64)
+        counts = np.concatenate(counts) if counts else np.array([], dtype=np.float32)
+        return texts, codes, masks, doc_ids, feature_ids, counts
+
+    def _weights(self, doc_ids, feature_ids, counts, n_docs):
+        """tf-idf weights, l2-normalised per review"""
+        weights = counts * self.idf[feature_ids]
+        norms = np.sqrt(np.bincount(doc_ids, weights=weights ** 2, minlength=n_docs))
+        norms[norms == 0] = 1.0
+        return (weights / norms[doc_ids]).astype(np.float32)
+
+    def _set_rows(self, doc_ids, feature_ids, weights):
+        """Store the row-major vectors (review -> terms) and the postings (term -> reviews) built from them"""
+        self.row_ptr = np.concatenate(([0], np.cumsum(np.bincount(doc_ids, minlength=self.n_docs))))
+        self.row_features = feature_ids
+        self.row_weights = weights
+        order = np.argsort(feature_ids, kind="stable")
+        sorted_features = feature_ids[order]
+        self.terms, starts = np.unique(sorted_features, return_index=True)
+        self.term_ptr = np.append(starts, len(sorted_features))
+        self.post_docs = doc_ids[order]
+        self.post_weights = weights[order]
+        self._added = []  # (features, weights) of reviews added since, ids from self.row_ptr's end
+        self._added_flat = None  # the same, concatenated: (position in _added, features, weights)
+
+    def build(self, df, title_column="movie_title", text_column="review_content", genre_column="genres",
+              texts=None):
+        """
+        Build vectors for every row of df.
+        The review id of a row is its position in df.
+        texts: a CompressedTextStore already holding the texts by review id (e.g. DatasetStore.texts),
+        kept up to date by its owner; by default the texts of df are compressed into a store of the index's own
+        """
+        df = df.reset_index(drop=True)
+        with self._lock:
+            self.movies, self._movie_index, self._genre_bits = [], {}, {}
+            self.n_docs = len(df)
+            rows_texts, codes, masks, doc_ids, feature_ids, counts = self._rows(
+                df, title_column, text_column, genre_column)
+            self._own_texts = texts is None
+            # only read back for the few reviews returned
+            self.texts = CompressedTextStore().extend(rows_texts) if texts is None else texts
+            self.movie_codes, self.genre_masks = codes, masks
+
+            # smoothed idf, then l2-normalise each review vector
+            df_counts = np.bincount(feature_ids, minlength=self.n_features)
+            self.idf = (np.log((1 + self.n_docs) / (1 + df_counts)) + 1).astype(np.float32)
+            self._set_rows(doc_ids, feature_ids, self._weights(doc_ids, feature_ids, counts, self.n_docs))
+        return self
+
+    def add_reviews(self, df, title_column="movie_title", text_column="review_content", genre_column="genres"):
+        """
+        Add reviews appended to the dataset after build() (review ids continue from n_docs)
+        They are weighted with the idf of the build. Their postings are kept apart and scanned
+        directly until merge_every of them are pending, then all postings are rebuilt once.
+        """
+        df = df.reset_index(drop=True)
+        with self._lock:
+            texts, codes, masks, doc_ids, feature_ids, counts = self._rows(
+                df, title_column, text_column, genre_column)
+            weights = self._weights(doc_ids, feature_ids, counts, len(df))
+            ptr = np.concatenate(([0], np.cumsum(np.bincount(doc_ids, minlength=len(df)))))
+            self._added.extend((feature_ids[ptr[i]:ptr[i + 1]], weights[ptr[i]:ptr[i + 1]]) for i in range(len(df)))
+            self._added_flat = None
+            if self._own_texts:
+                self.texts.extend(texts)
+            self.movie_codes = np.concatenate([self.movie_codes, codes])
+            self.genre_masks = np.concatenate([self.genre_masks, masks])
+            self.n_docs += len(df)
+            if len(self._added) >= self.merge_every:
+                self._merge()
+        return self
+
+    def _merge(self):
+        """Fold the added reviews into the row arrays and postings"""
+        built = len(self.row_ptr) - 1
+        lengths = np.concatenate([np.diff(self.row_ptr), [len(f) for f, _ in self._added]]).astype(np.int64)
+        doc_ids = np.repeat(np.arange(built + len(self._added)), lengths)
+        feature_ids = np.concatenate([self.row_features] + [f for f, _ in self._added])
+        weights = np.concatenate([self.row_weights] + [w for _, w in self._added]).astype(np.float32)
+        self._set_rows(doc_ids, feature_ids, weights)
+
+    def vector(self, review_id):
+        """Return (feature ids, weights) of a stored review"""
+        built = len(self.row_ptr) - 1
+        if review_id >= built:
+            return self._added[review_id - built]
+        start, end = self.row_ptr[review_id], self.row_ptr[review_id + 1]
+        return self.row_features[start:end], self.row_weights[start:end]
+
+    def cosine_scores(self, features, weights):
+        """Cosine similarity of a normalised query vector against every review"""
+        scores = np.zeros(self.n_docs, dtype=np.float64)
+        if len(self.terms):
+            pos = np.clip(np.searchsorted(self.terms, features), 0, len(self.terms) - 1)
+            found = self.terms[pos] == features
+            docs, contrib = [], []
+            for p, w in zip(pos[found], weights[found]):
+                start, end = self.term_ptr[p], self.term_ptr[p + 1]
+                docs.append(self.post_docs[start:end])
+                contrib.append(self.post_weights[start:end] * w)
+            if docs:
+                scores += np.bincount(np.concatenate(docs), weights=np.concatenate(contrib), minlength=self.n_docs)
+        # reviews added since the postings were built: matched against the query terms directly
+        if self._added:
+            if self._added_flat is None:
+                self._added_flat = (
+                    np.repeat(np.arange(len(self._added)), [len(f) for f, _ in self._added]),
+                    np.concatenate([f for f, _ in self._added]),
+                    np.concatenate([w for _, w in self._added]),
+                )
+            docs, added_features, added_weights = self._added_flat
+            order = np.argsort(features)
+            query_features, query_weights = features[order], weights[order]
+            if len(query_features):
+                pos = np.clip(np.searchsorted(query_features, added_features), 0, len(query_features) - 1)
+                hit = query_features[pos] == added_features
+                built = len(self.row_ptr) - 1
+                scores[built:] = np.bincount(docs[hit], weights=added_weights[hit] * query_weights[pos[hit]],
+                                             minlength=len(self._added))
+        return scores
+
+    def similar(self, review_id, k=10, scope=None):
+        """
+        Find the k reviews most similar to review_id
+        scope: None for the whole corpus, "movie" for the same movie, "genre" for any shared genre
+        Returns list of (review_id, similarity)
+        """
+        if not 0 <= review_id < self.n_docs:
+            raise IndexError(f"Unknown review id: {review_id}")
+        if scope not in (None, "movie", "genre"):
+            raise ValueError(f"Unknown scope: {scope}")
+
+        with self._lock:
+            features, weights = self.vector(review_id)
+            scores = self.cosine_scores(features, weights)
+            if scope == "movie":
+                scores[self.movie_codes != self.movie_codes[review_id]] = -np.inf
+            elif scope == "genre":
+                scores[(self.genre_masks & self.genre_masks[review_id]) == 0] = -np.inf
+        scores[review_id] = -np.inf  # never return the query review itself
+
+        top = blocked_top_k(scores, k, self.block_size)
+        return [(int(i), float(scores[i])) for i in top if np.isfinite(scores[i]) and scores[i] > 0]
+
+    def review(self, review_id):
+        """Return the stored title and text for a review id"""
+        return {
+            "review_id": int(review_id),
+            "movie_title": self.movies[self.movie_codes[review_id]],
+            "review_content": self.texts.get(review_id),
+        }
+
+
+if __name__ == "__main__":
+    import time
+
+    index = ReviewIndex().build(pd.read_csv("datas/cleaned_reviews.csv"))
+    start = time.perf_counter()
+    matches = index.similar(0, k=5)
+    print(f"Query took {(time.perf_counter() - start) * 1000:.2f} ms")
+    print(index.review(0)["review_content"][:80])
+    for rid, sim in matches:
+        print(f"{sim:.3f} | {index.review(rid)['movie_title']} | {index.review(rid)['review_content'][:80]}")
@@ -1,7 +1,11 @@
 import os
+import numpy as np
 import pandas as pd
 import json
 from text_processing import TextProcessor
+from leaderboard import Leaderboard
+from file_utils import atomic_write
+from profiling import maybe_profile, pop_profile_flags
 import nltk
 
 # Download the NLTK 'punkt' tokeniser quietly (used for sentence splitting)
@@ -19,7 +23,8 @@ def process_reviews_df(
     Process a DataFrame of movie reviews and calculate sentiment scores.
 
     Parameters:
-        df_reviews (DataFrame): The input DataFrame containing movie reviews.
+        df_reviews (DataFrame or iterable of DataFrames): The input movie reviews, or chunks
+            of them (e.g. from TextProcessor.load_reviews(..., chunksize=...)).
         processor (TextProcessor): The text processor object used for cleaning and scoring text.
         review_col (str): Column name containing the review text.
         movie_title_col (str): Column name containing the movie title.
@@ -29,6 +34,10 @@ def process_reviews_df(
         DataFrame: A new DataFrame containing each review’s average sentiment score,
                    most positive and most negative sentences, and their scores.
     """
+    if not isinstance(df_reviews, pd.DataFrame):
+        frames = list(iter_chunks(process_reviews_df, df_reviews, processor,
+                                  review_col=review_col, movie_title_col=movie_title_col, limit=limit))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
     # Drop any rows missing required columns
     df_reviews = df_reviews.dropna(subset=[review_col, movie_title_col])
@@ -79,20 +88,168 @@ def process_reviews_df(
     return pd.DataFrame(records)
 
 
-def summarize_movies(df_sentiment, top_n=5):
+def iter_chunks(score, chunks, processor, **kwargs):
+    """
+    Apply a scoring function (process_reviews_df or score_corpus) to each chunk of reviews
+    Yields one result DataFrame per chunk, so a pipeline such as
+    Leaderboard().add_scores(iter_chunks(score_corpus, processor.load_reviews(path, chunksize=5000), processor))
+    only ever holds one chunk in memory. Review IDs from score_corpus are start_id plus the row
+    labels of the chunks (the row numbers iter_reviews keeps), so rows dropped for having no text
+    leave gaps instead of shifting the IDs after them.
+    """
+    limit = kwargs.get("limit")
+    offset = kwargs.pop("start_id", 0) if score in (score_corpus, score_lexicons) else None
+    for chunk in chunks:
+        if limit is not None and len(chunk) and chunk.index[0] >= limit:
+            break  # limit is compared with row labels, which only grow from chunk to chunk
+        if offset is not None:
+            kwargs["review_ids"] = offset + chunk.index.to_numpy()
+        yield score(chunk, processor, **kwargs)
+
+
+def score_corpus(
+    df_reviews,
+    processor,
+    review_col="review_content",
+    movie_title_col="movie_title",
+    genres_col="genres",
+    start_id=0,
+    explanations=None,
+    term_counts=None,
+    review_ids=None
+):
+    """
+    Score every review with its average sentence score only (cheaper than process_reviews_df).
+
+    Parameters:
+        df_reviews (DataFrame or iterable of DataFrames): Reviews to score, in dataset order.
+        processor (TextProcessor): The text processor object used for cleaning and scoring text.
+        review_col (str): Column name containing the review text.
+        movie_title_col (str): Column name containing the movie title.
+        genres_col (str): Column name containing the comma-separated genres (optional).
+        start_id (int): Review ID of the first row (its position in the full dataset);
+                        for an iterable of chunks, added to their row labels.
+        explanations (ExplanationStore, optional): If given, the words behind each score are recorded in it.
+        term_counts (MovieTermCounts, optional): If given, each review's lexicon words are counted for its movie.
+        review_ids (array-like, optional): Review ID of each row, instead of numbering the rows from start_id.
+
+    Returns:
+        DataFrame: Review ID, Movie Title, Genres and Average Score for every valid review.
+    """
+    if not isinstance(df_reviews, pd.DataFrame):
+        frames = list(iter_chunks(score_corpus, df_reviews, processor, review_col=review_col,
+                                  movie_title_col=movie_title_col, genres_col=genres_col,
+                                  start_id=start_id, explanations=explanations, term_counts=term_counts))
+        if frames:
+            return pd.concat(frames, ignore_index=True)
+        df_reviews = pd.DataFrame(columns=[movie_title_col, review_col])
+    df = pd.DataFrame({
+        "Review ID": range(start_id, start_id + len(df_reviews)) if review_ids is None else review_ids,
+        "Movie Title": df_reviews[movie_title_col].to_numpy(),
+        "Genres": df_reviews[genres_col].to_numpy() if genres_col in df_reviews.columns else None,
+        "Review Text": df_reviews[review_col].to_numpy(),
+    })
+    df = df[df["Movie Title"].notna() & df["Review Text"].map(lambda t: isinstance(t, str))]
+    if explanations is None and term_counts is None:
+        df["Average Score"] = [processor.score_review(processor.preprocess_text(t)) for t in df["Review Text"]]
+    else:
+        scores = []
+        for review_id, title, text in zip(df["Review ID"], df["Movie Title"], df["Review Text"]):
+            score, sentence_count, hits = processor.explain_review(processor.preprocess_text(text))
+            if explanations is not None:
+                explanations.add(review_id, sentence_count, hits)
+            if term_counts is not None:
+                term_counts.add(title, [word for word, _, _ in hits])
+            scores.append(score)
+        df["Average Score"] = scores
+    return df.drop(columns=["Review Text"]).reset_index(drop=True)
+
+
+def score_lexicons(
+    df_reviews,
+    processor,
+    review_col="review_content",
+    movie_title_col="movie_title",
+    start_id=0,
+    review_ids=None
+):
+    """
+    Score every review against each of processor.lexicons, tokenizing every review only once.
+
+    Parameters:
+        df_reviews (DataFrame or iterable of DataFrames): Reviews to score, in dataset order.
+        processor (TextProcessor): Processor holding the named lexicons to compare.
+        review_col (str): Column name containing the review text.
+        movie_title_col (str): Column name containing the movie title.
+        start_id (int): Review ID of the first row (its position in the full dataset);
+                        for an iterable of chunks, added to their row labels.
+        review_ids (array-like, optional): Review ID of each row, instead of numbering the rows from start_id.
+
+    Returns:
+        DataFrame: Review ID, Movie Title and one average score column per lexicon name
+                   (the same valid reviews as score_corpus).
+    """
+    if not isinstance(df_reviews, pd.DataFrame):
+        frames = list(iter_chunks(score_lexicons, df_reviews, processor, review_col=review_col,
+                                  movie_title_col=movie_title_col, start_id=start_id))
+        if frames:
+            return pd.concat(frames, ignore_index=True)
+        df_reviews = pd.DataFrame(columns=[movie_title_col, review_col])
+    df = pd.DataFrame({
+        "Review ID": range(start_id, start_id + len(df_reviews)) if review_ids is None else review_ids,
+        "Movie Title": df_reviews[movie_title_col].to_numpy(),
+        "Review Text": df_reviews[review_col].to_numpy(),
+    })
+    df = df[df["Movie Title"].notna() & df["Review Text"].map(lambda t: isinstance(t, str))]
+    scores = processor.score_reviews_multi(processor.preprocess_text(t) for t in df["Review Text"])
+    df = df.drop(columns=["Review Text"]).reset_index(drop=True)
+    for j, name in enumerate(processor.lexicon_names):
+        df[name] = scores[:, j]
+    return df
+
+
+def compare_lexicons(df_scores, names, baseline=None):
+    """
+    Summarise per-lexicon scores from score_lexicons for an A/B comparison.
+
+    Parameters:
+        df_scores (DataFrame): Output of score_lexicons.
+        names (list): Lexicon columns to compare.
+        baseline (str, optional): Lexicon the others are compared with (default: the first name).
+
+    Returns:
+        DataFrame: One row per lexicon with its mean score, share of positive and negative
+                   reviews, and correlation and sign agreement with the baseline.
+    """
+    baseline = baseline or names[0]
+    base = df_scores[baseline]
+    return pd.DataFrame([{
+        "Lexicon": name,
+        "Mean Score": df_scores[name].mean(),
+        "Positive Share": (df_scores[name] > 0).mean(),
+        "Negative Share": (df_scores[name] < 0).mean(),
+        "Correlation": df_scores[name].corr(base),
+        "Sign Agreement": (np.sign(df_scores[name]) == np.sign(base)).mean(),
+    } for name in names])
+
+
+def summarize_movies(df_sentiment, top_n=5, min_reviews=1):
     """
     Summarise movies by their average sentiment score.
 
     Parameters:
         df_sentiment (DataFrame): DataFrame containing sentiment scores for each review.
         top_n (int): Number of top and bottom movies to return.
+        min_reviews (int): Movies with fewer reviews than this are left out.
 
     Returns:
         tuple: Two DataFrames (top, bottom) representing the highest- and lowest-scoring movies.
     """
 
     # Calculate average sentiment score per movie
-    movie_avg = df_sentiment.groupby("Movie Title")["Average Score"].mean().reset_index()
+    movie_avg = df_sentiment.groupby("Movie Title")["Average Score"].agg(["mean", "count"]).reset_index()
+    movie_avg = movie_avg[movie_avg["count"] >= min_reviews]
+    movie_avg = movie_avg[["Movie Title", "mean"]].rename(columns={"mean": "Average Score"})
     movie_avg["Average Score"] = movie_avg["Average Score"].round(2)
 
     # Sort movies from highest to lowest score
@@ -105,16 +262,17 @@ def summarize_movies(df_sentiment, top_n=5):
     return top, bottom
 
 
-def print_top_bottom_movies(df_sentiment, top_n=5):
+def print_top_bottom_movies(df_sentiment, top_n=5, min_reviews=5):
     """
     Print the top and bottom movies by average sentiment score.
 
     Parameters:
         df_sentiment (DataFrame): DataFrame containing sentiment scores for each review.
         top_n (int): Number of movies to display in each category.
+        min_reviews (int): Movies with fewer reviews are left out, as on the leaderboard.
     """
 
-    top_movies, worst_movies = summarize_movies(df_sentiment, top_n)
+    top_movies, worst_movies = summarize_movies(df_sentiment, top_n, min_reviews=min_reviews)
     print("\nTop Movies by Sentiment:")
     print(top_movies.to_string(index=False))
     print("\nWorst Movies by Sentiment:")
@@ -184,29 +342,34 @@ def export_top_worst_movies_to_json(top_df, worst_df, output_file=None):
         os.makedirs(website_folder, exist_ok=True)  # Ensure target folder exists
         output_file = os.path.join(website_folder, "top_worst_movies.json")
 
-    # Write results to JSON
-    with open(output_file, "w", encoding="utf-8") as f:
+    # Write results to JSON via a temporary file so readers never see a partial file
+    with atomic_write(output_file) as f:
         json.dump(result, f, indent=4, ensure_ascii=False)
 
     print(f"Exported top/worst movies JSON to: {output_file}")
 
 
 if __name__ == "__main__":
-    # Initialise the text processor with a sentiment lexicon
-    processor = TextProcessor("datas/AFINN-en-165.txt")
+    import sys
+    profile, profile_interval, _ = pop_profile_flags(sys.argv[1:])
+
+    with maybe_profile("scoring_system", profile, profile_interval):
+        # Initialise the text processor with a sentiment lexicon
+        processor = TextProcessor("datas/AFINN-en-165.txt")
 
-    # Load cleaned movie review data
-    df_reviews = processor.load_reviews("datas/cleaned_reviews.csv", return_df=True, n=1000)
+        # Load cleaned movie review data
+        df_reviews = processor.load_reviews("datas/cleaned_reviews.csv", return_df=True, n=1000)
 
-    # Process reviews and calculate sentiment statistics
-    df_sentiment = process_reviews_df(df_reviews, processor, limit=1000)
+        # Process reviews and calculate sentiment statistics
+        df_sentiment = process_reviews_df(df_reviews, processor, limit=1000)
 
-    # Summarise top and bottom movies by sentiment
-    top_movies, worst_movies = summarize_movies(df_sentiment, top_n=5)
+        # Rank movies with enough reviews to be meaningful
+        board = Leaderboard(min_reviews=5).add_scores(df_sentiment)
+        top_movies, worst_movies = board.top(5), board.worst(5)
 
-    # Export results to JSON for website display
-    export_top_worst_movies_to_json(top_movies, worst_movies)
+        # Export results to JSON for website display
+        export_top_worst_movies_to_json(top_movies, worst_movies)
 
-    # Display results in console
-    print_top_bottom_movies(df_sentiment, top_n=5)
-    print_extreme_sentences(df_sentiment, processor, top_n=5)
+        # Display results in console
+        print_top_bottom_movies(df_sentiment, top_n=5, min_reviews=board.min_reviews)
+        print_extreme_sentences(df_sentiment, processor, top_n=5)
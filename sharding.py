@@ -0,0 +1,382 @@
+import heapq
+import json
+import os
+import threading
+import zlib
+import multiprocessing
+from contextlib import ExitStack
+import pandas as pd
+from autocomplete import normalize_title
+from file_utils import atomic_write
+
+"""
+Movie-partitioned shards of the review dataset with scatter-gather queries
+
+partition_csv() hashes every review by its movie title into one of N shard
+CSVs, so all reviews of a movie live in the same shard. ShardCoordinator
+starts one worker process per shard and fans queries out to them:
+
+- search: every shard returns its first matches in review-id order, the
+  coordinator merges the sorted lists and keeps the global first k
+- leaderboard: every shard returns its top/worst k movies as score sums and
+  counts; since a movie never spans shards, the union contains the global
+  top/worst k, and means are recomputed from the merged sums
+- compare: only the shards owning the two movies are asked
+- distribution: a movie's score sketch comes from its shard; genre and
+  all-review sketches are merged from every shard's sketch
+
+Everything runs on one machine with local processes; the pipe protocol is
+plain picklable tuples, so the same layout can later be served over a network.
+"""
+
+MANIFEST = "manifest.json"
+REVIEW_ID = "review_id"  # original row position, kept so results can be merged in dataset order
+
+
+class ShardError(RuntimeError):
+    pass
+
+
+def shard_for(title, n_shards):
+    """Shard number of a movie (stable across processes and runs)"""
+    key = normalize_title(title) if isinstance(title, str) else ""
+    return zlib.crc32(key.encode("utf-8")) % n_shards
+
+
+def shard_path(shard_dir, shard):
+    return os.path.join(shard_dir, f"shard-{shard:03d}.csv")
+
+
+def partition_csv(csv_file, shard_dir, n_shards, title_column="movie_title", chunksize=20000):
+    """
+    Split csv_file into n_shards movie-partitioned CSVs plus a manifest
+    Reads the source in chunks; each shard file gets a review_id column with the original row number.
+    Returns the manifest dict.
+    """
+    if n_shards < 1:
+        raise ValueError("n_shards must be at least 1")
+    os.makedirs(shard_dir, exist_ok=True)
+    counts = [0] * n_shards
+    with ExitStack() as stack:
+        files = [stack.enter_context(atomic_write(shard_path(shard_dir, i))) for i in range(n_shards)]
+        first, next_id = True, 0
+        for chunk in pd.read_csv(csv_file, chunksize=chunksize, low_memory=False):
+            chunk.insert(0, REVIEW_ID, range(next_id, next_id + len(chunk)))
+            next_id += len(chunk)
+            shards = chunk[title_column].map(lambda t: shard_for(t, n_shards))
+            for i in range(n_shards):
+                part = chunk[shards == i]
+                counts[i] += len(part)
+                part.to_csv(files[i], header=first, index=False)
+            first = False
+        if first:
+            raise ValueError(f"{csv_file} has no header row")
+
+    manifest = {
+        "source": os.path.abspath(csv_file),
+        "n_shards": n_shards,
+        "title_column": title_column,
+        "reviews": next_id,
+        "shard_reviews": counts,
+    }
+    with atomic_write(os.path.join(shard_dir, MANIFEST)) as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_manifest(shard_dir):
+    with open(os.path.join(shard_dir, MANIFEST), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ShardWorker:
+    """Serves one shard; runs inside its own process"""
+
+    def __init__(self, path, dict_path, min_reviews=5):
+        from dataset import DatasetStore
+        from text_processing import TextProcessor
+
+        self.store = DatasetStore(path)
+        self.dict_path = dict_path
+        self.processor = TextProcessor(dict_path)
+        self.min_reviews = min_reviews
+        self.analytics = None
+
+    def get_analytics(self):
+        if self.analytics is None:
+            from analytics import Analytics
+            self.analytics = Analytics(self.processor, self.min_reviews).build(self.store.current().with_text())
+        return self.analytics
+
+    def stats(self):
+        df = self.store.current().df
+        return {
+            "reviews": len(df),
+            "max_review_id": int(df[REVIEW_ID].max()) if len(df) else -1,
+            "scored": self.analytics is not None,
+        }
+
+    def warm(self):
+        self.get_analytics()
+        return self.stats()
+
+    def search(self, keyword, limit=20):
+        """(number of matches, first limit matches in review-id order)"""
+        from website.search import search_reviews_df
+
+        matches = search_reviews_df(self.store.current().with_text(), keyword)
+        head = matches.head(limit)[[REVIEW_ID, "movie_title", "review_content"]].fillna("")
+        return len(matches), head.to_dict(orient="records")
+
+    def leaderboard(self, n=5):
+        board = self.get_analytics().leaderboard
+        return {"top": board.entries(n), "worst": board.entries(n, worst=True)}
+
+    def compare(self, movie1, movie2, **kwargs):
+        from movie_comparison import compare_movies
+        snapshot = self.store.current()
+        df_reviews = snapshot.with_text(snapshot.movie_rows([movie1, movie2]))
+        return compare_movies(self.store.csv_file, movie1, movie2,
+                              dict_path=self.dict_path, df_reviews=df_reviews, **kwargs)
+
+    def distribution(self, movie=None, genre=None):
+        """(matched name, ScoreSketch.to_dict()) of a movie, a genre or all reviews; None if unknown"""
+        distributions = self.get_analytics().distributions
+        if movie is not None:
+            name = distributions.find_movie(movie)
+            sketch = distributions.movie(name) if name is not None else None
+        elif genre is not None:
+            name = distributions.find_genre(genre)
+            sketch = distributions.genre(name) if name is not None else None
+        else:
+            name, sketch = None, distributions.overall()
+        return None if sketch is None else (name, sketch.to_dict())
+
+    def add(self, rows):
+        snapshot = self.store.current()
+        start_id = len(snapshot)
+        self.store.append(rows)
+        if self.analytics is not None:
+            self.analytics.add_reviews(pd.DataFrame(rows), start_id)
+        return len(rows)
+
+
+SHARD_OPS = {"stats", "warm", "search", "leaderboard", "compare", "distribution", "add"}
+
+
+def _serve(path, dict_path, min_reviews, conn):
+    """Worker process main loop: answer (op, kwargs) messages until None arrives"""
+    try:
+        worker = ShardWorker(path, dict_path, min_reviews)
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+        return
+    conn.send(("ok", "ready"))
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        op, kwargs = message
+        try:
+            if op not in SHARD_OPS:
+                raise ValueError(f"Unknown shard operation: {op}")
+            conn.send(("ok", getattr(worker, op)(**kwargs)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+    conn.close()
+
+
+class ShardCoordinator:
+    def __init__(self, shard_dir, dict_path, min_reviews=5, start_method=None):
+        """
+        Start one worker process per shard in shard_dir (see partition_csv)
+        dict_path: sentiment lexicon used by the workers
+        min_reviews: minimum reviews for a movie to be on the leaderboard
+        """
+        self.manifest = load_manifest(shard_dir)
+        self.n_shards = self.manifest["n_shards"]
+        self.min_reviews = min_reviews
+        context = multiprocessing.get_context(start_method)
+        self._conns, self._procs = [], []
+        self._locks = [threading.Lock() for _ in range(self.n_shards)]
+        self._id_lock = threading.Lock()
+        for i in range(self.n_shards):
+            parent, child = context.Pipe()
+            proc = context.Process(
+                target=_serve, args=(shard_path(shard_dir, i), dict_path, min_reviews, child),
+                name=f"shard-{i}", daemon=True
+            )
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+        for i, conn in enumerate(self._conns):
+            self._receive(i, conn)
+        self._next_id = max(s["max_review_id"] for s in self.scatter("stats")) + 1
+
+    def _receive(self, shard, conn):
+        try:
+            status, value = conn.recv()
+        except EOFError:
+            raise ShardError(f"Shard {shard} worker exited")
+        if status != "ok":
+            raise ShardError(f"Shard {shard}: {value}")
+        return value
+
+    def call(self, shard, op, **kwargs):
+        """Run op on one shard and return its result"""
+        with self._locks[shard]:
+            self._conns[shard].send((op, kwargs))
+            return self._receive(shard, self._conns[shard])
+
+    def scatter(self, op, shards=None, **kwargs):
+        """
+        Send op to several shards (default: all) at once and gather their results in shard order
+        Locks are taken in shard order so concurrent scatters cannot deadlock.
+        """
+        shards = sorted(set(range(self.n_shards) if shards is None else shards))
+        for i in shards:
+            self._locks[i].acquire()
+        try:
+            for i in shards:
+                self._conns[i].send((op, kwargs))
+            results, error = [], None
+            for i in shards:
+                try:
+                    results.append(self._receive(i, self._conns[i]))
+                except ShardError as e:
+                    error = error or e  # keep reading so every pipe stays in step
+            if error:
+                raise error
+            return results
+        finally:
+            for i in shards:
+                self._locks[i].release()
+
+    def shard_for(self, title):
+        return shard_for(title, self.n_shards)
+
+    def warm(self):
+        """Score every shard in parallel"""
+        return self.scatter("warm")
+
+    def search(self, keyword, limit=20):
+        """Return (total matches, first limit matches in dataset order)"""
+        results = self.scatter("search", keyword=keyword, limit=limit)
+        total = sum(count for count, _ in results)
+        merged = heapq.merge(*(records for _, records in results), key=lambda r: r[REVIEW_ID])
+        return total, [r for _, r in zip(range(limit), merged)]
+
+    def leaderboard(self, n=5):
+        """Merge the shards' leaderboards; returns (top, worst) DataFrames as Leaderboard.top/worst"""
+        from leaderboard import Leaderboard
+
+        board = Leaderboard(min_reviews=self.min_reviews)
+        seen = set()
+        for partial in self.scatter("leaderboard", n=n):
+            for title, score_sum, count in partial["top"] + partial["worst"]:
+                if title not in seen:  # a movie can be in both lists of a small shard
+                    seen.add(title)
+                    board.add_totals(title, score_sum, count)
+        return board.top(n), board.worst(n)
+
+    def compare(self, movie1, movie2, **kwargs):
+        """Same result as compare_movies on the whole dataset; only the owning shards are asked"""
+        owners = {movie1: self.shard_for(movie1), movie2: self.shard_for(movie2)}
+        shards = sorted(set(owners.values()))
+        by_shard = dict(zip(shards, self.scatter("compare", shards=shards, movie1=movie1, movie2=movie2, **kwargs)))
+        stats = {movie: by_shard[shard].get(movie) for movie, shard in owners.items()}
+        if all(s is None for s in stats.values()):
+            return {"error": "No reviews found for the given movies."}
+        missing = {"error": "No reviews for this movie after sentiment processing."}
+        return {movie: s if s is not None else missing for movie, s in stats.items()}
+
+    def distribution(self, movie=None, genre=None):
+        """
+        (matched name, ScoreSketch) of a movie, a genre or, with neither, all reviews; None if unknown
+        A movie's sketch comes from its own shard, the others are merged from every shard's sketch.
+        """
+        from distributions import ScoreSketch
+
+        if movie is not None:
+            result = self.call(self.shard_for(movie), "distribution", movie=movie)
+            return None if result is None else (result[0], ScoreSketch.from_dict(result[1]))
+        results = [r for r in self.scatter("distribution", genre=genre) if r is not None]
+        if not results:
+            return None
+        sketches = [ScoreSketch.from_dict(state) for _, state in results]
+        return results[0][0], ScoreSketch(sketches[0].compression).merge(*sketches)
+
+    def add_reviews(self, rows, title_column="movie_title"):
+        """Assign review ids and append each review to its movie's shard"""
+        by_shard = {}
+        with self._id_lock:
+            for row in rows:
+                row = dict(row, **{REVIEW_ID: self._next_id})
+                self._next_id += 1
+                by_shard.setdefault(self.shard_for(row[title_column]), []).append(row)
+            for shard, shard_rows in sorted(by_shard.items()):
+                self.call(shard, "add", rows=shard_rows)
+        return sum(len(r) for r in by_shard.values())
+
+    def close(self):
+        for i, conn in enumerate(self._conns):
+            with self._locks[i]:
+                try:
+                    conn.send(None)
+                except (OSError, BrokenPipeError):
+                    pass
+                conn.close()
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Partition the reviews by movie and query the shards")
+    parser.add_argument("--shard-dir", default=os.path.join(base_dir, "datas", "shards"))
+    parser.add_argument("--dict", default=os.path.join(base_dir, "datas", "AFINN-en-165.txt"))
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("partition", help="split the review CSV into shards")
+    p.add_argument("--csv", default=os.path.join(base_dir, "datas", "cleaned_reviews.csv"))
+    p.add_argument("--shards", type=int, default=4)
+    p = sub.add_parser("search", help="keyword search across all shards")
+    p.add_argument("keyword")
+    p.add_argument("--limit", type=int, default=10)
+    p = sub.add_parser("leaderboard", help="top and worst movies across all shards")
+    p.add_argument("--n", type=int, default=5)
+    p = sub.add_parser("compare", help="compare two movies")
+    p.add_argument("movie1")
+    p.add_argument("movie2")
+    args = parser.parse_args()
+
+    if args.command == "partition":
+        manifest = partition_csv(args.csv, args.shard_dir, args.shards)
+        print(f"{manifest['reviews']} reviews -> {manifest['shard_reviews']} in {args.shard_dir}")
+    else:
+        with ShardCoordinator(args.shard_dir, args.dict) as coordinator:
+            if args.command == "search":
+                total, records = coordinator.search(args.keyword, limit=args.limit)
+                print(f"Found {total} results:\n")
+                for r in records:
+                    print(f"[{r[REVIEW_ID]}] {r['movie_title']}: {r['review_content'][:100]}")
+            elif args.command == "leaderboard":
+                coordinator.warm()
+                top, worst = coordinator.leaderboard(args.n)
+                print(top.to_string(index=False))
+                print(worst.to_string(index=False))
+            else:
+                print(json.dumps(coordinator.compare(args.movie1, args.movie2), indent=2, default=str))
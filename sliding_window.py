@@ -30,15 +30,25 @@ from text_processing import TextProcessor
 from scoring_system import process_reviews_df
 from pathlib import Path
 import nltk
+import sys
+from profiling import maybe_profile, pop_profile_flags
 
 nltk.download("punkt", quiet=True)
 
 # Initialize TextProcessor for the AFINN dictionary
 processor = TextProcessor(str(Path(__file__).parent / "datas" / "AFINN-en-165.txt"))
 
-# Load reviews and process them with sentiment scores
-df_reviews = processor.load_reviews("datas/cleaned_reviews.csv", return_df=True, n=100)
-df_sentiment = process_reviews_df(df_reviews, processor, limit=100)
+# Reviews are loaded and scored on first use, see get_df_sentiment()
+df_sentiment = None
+
+
+def get_df_sentiment():
+    """Load reviews and process them with sentiment scores (once)"""
+    global df_sentiment
+    if df_sentiment is None:
+        df_reviews = processor.load_reviews("datas/cleaned_reviews.csv", return_df=True, n=100)
+        df_sentiment = process_reviews_df(df_reviews, processor, limit=100)
+    return df_sentiment
 
 def sliding_window_analysis(reviews_sentiment, reviews_text, movie_titles, window_size=3):
     # Handle empty inputs
@@ -66,6 +76,7 @@ def sliding_window_analysis(reviews_sentiment, reviews_text, movie_titles, windo
 
 
 def get_sentiment_windows():
+    df_sentiment = get_df_sentiment()
     reviews_sentiment = df_sentiment['Average Score'].tolist()
     reviews_text = df_sentiment['Review Text'].tolist()
     movie_titles = df_sentiment['Movie Title'].tolist()
@@ -78,7 +89,9 @@ def get_sentiment_windows():
 
 # Example usage you had for console output (optional)
 if __name__ == "__main__":
-    max_score_idx, min_score_idx, window_reviews, window_scoring, window_movie_titles = get_sentiment_windows()
+    profile, profile_interval, _ = pop_profile_flags(sys.argv[1:])
+    with maybe_profile("sliding_window", profile, profile_interval):
+        max_score_idx, min_score_idx, window_reviews, window_scoring, window_movie_titles = get_sentiment_windows()
 
     print("\nMost Positive Window Reviews and Score:")
     for i in range(len(window_reviews[max_score_idx])):
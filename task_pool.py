@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+"""
+Bounded worker pool for CPU-heavy requests
+
+Heavy routes hand their work to a small pool instead of running it on the
+request thread. At most max_workers tasks run and max_queue more may wait;
+beyond that the caller is told immediately (Overloaded) so it can answer 503
+instead of piling up. Every task has a deadline: a task still queued when its
+deadline passes is dropped without running.
+"""
+
+
+class Overloaded(Exception):
+    """Raised when the pool and its queue are full"""
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a task did not finish before its deadline"""
+
+
+def _percentiles(samples):
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None}
+    ordered = sorted(samples)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+class RouteStats:
+    def __init__(self, window=1000):
+        """Counters and recent timings (seconds) for one route"""
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.failed = 0
+        self.queue_times = deque(maxlen=window)
+        self.exec_times = deque(maxlen=window)
+
+    def to_dict(self):
+        return {
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "failed": self.failed,
+            "queue_ms": _percentiles(list(self.queue_times)),
+            "exec_ms": _percentiles(list(self.exec_times)),
+        }
+
+
+class BoundedExecutor:
+    def __init__(self, max_workers=2, max_queue=8):
+        """
+        max_workers: tasks that may run at the same time
+        max_queue: tasks that may wait for a worker before new ones are rejected
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="heavy-route")
+        self._in_flight = 0
+        self._slots_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {}
+
+    def _route(self, name):
+        with self._stats_lock:
+            return self.stats.setdefault(name, RouteStats())
+
+    def run(self, name, fn, *args, timeout=10.0, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the pool and wait for its result
+        name: route name used for statistics
+        timeout: seconds from submission until the task is abandoned
+        Raises Overloaded if the queue is full, DeadlineExceeded if the deadline passes.
+        """
+        stats = self._route(name)
+        with self._slots_lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                stats.rejected += 1
+                raise Overloaded(f"{name}: {self.max_workers} running and {self.max_queue} queued")
+            self._in_flight += 1
+
+        submitted = time.perf_counter()
+        deadline = submitted + timeout
+        abandoned = threading.Event()
+
+        def task():
+            started = time.perf_counter()
+            stats.queue_times.append(started - submitted)
+            if abandoned.is_set() or started > deadline:
+                raise DeadlineExceeded(f"{name}: deadline passed while queued")
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stats.exec_times.append(time.perf_counter() - started)
+
+        future = self._pool.submit(task)
+        future.add_done_callback(self._release)  # also fires when the task is cancelled
+
+        try:
+            result = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+        except FutureTimeout:
+            abandoned.set()
+            future.cancel()
+            stats.timed_out += 1
+            raise DeadlineExceeded(f"{name}: no result after {timeout:.1f}s")
+        except DeadlineExceeded:
+            stats.timed_out += 1
+            raise
+        except Exception:
+            stats.failed += 1
+            raise
+        stats.completed += 1
+        return result
+
+    def _release(self, future):
+        with self._slots_lock:
+            self._in_flight -= 1
+
+    def queue_depth(self):
+        """Number of tasks currently running or waiting"""
+        return self._in_flight
+
+    def snapshot_stats(self):
+        """Return per-route statistics as plain dicts"""
+        with self._stats_lock:
+            routes = {name: s.to_dict() for name, s in self.stats.items()}
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.queue_depth(),
+            "routes": routes,
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,156 @@
+from array import array
+import threading
+import numpy as np
+
+"""
+Sparse movie x lexicon-term counts of the sentiment words found while scoring
+
+Rows are movies, columns are lexicon terms. The counts are kept in CSR form
+(indptr, indices, data) plus a small append-only list of (movie, term) hits
+from reviews added since the last compaction. Queries sum the wanted rows
+with one bincount and never look at review text again. The CSR triple is
+replaced as a whole and the pending hits are only touched under a lock, so
+queries can run while reviews are being added.
+"""
+
+
+class MovieTermCounts:
+    def __init__(self, lexicon, compact_every=50000):
+        """
+        lexicon: {word: weight} used for scoring (e.g. TextProcessor.sentiment_dict)
+        compact_every: pending hits kept before they are merged into the CSR arrays
+        """
+        self.terms = np.array(sorted(lexicon), dtype=object)
+        self.weights = np.array([lexicon[t] for t in self.terms], dtype=np.int16)
+        self._term_index = {t: i for i, t in enumerate(self.terms)}
+        self.movies = []  # row -> movie title
+        self._movie_index = {}  # movie title -> row
+        self.compact_every = compact_every
+
+        # CSR part (indptr, indices, data): row r's terms are indices[indptr[r]:indptr[r + 1]]
+        self._csr = (np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32))
+        # hits not merged yet, one (row, term) pair per occurrence
+        self._pending_rows = array("i")
+        self._pending_terms = array("i")
+        self._lock = threading.RLock()
+
+    @property
+    def indptr(self):
+        return self._csr[0]
+
+    @property
+    def indices(self):
+        return self._csr[1]
+
+    @property
+    def data(self):
+        return self._csr[2]
+
+    @classmethod
+    def from_arrays(cls, lexicon, movies, indptr, indices, data, **kwargs):
+        """Restore counts saved with arrays(); the CSR arrays are used as they are (they may be memory-mapped)"""
+        counts = cls(lexicon, **kwargs)
+        counts.movies = list(movies)
+        counts._movie_index = {t: i for i, t in enumerate(counts.movies)}
+        counts._csr = (indptr, indices, data)
+        return counts
+
+    def arrays(self):
+        """The CSR arrays after merging pending hits"""
+        self.compact()
+        indptr, indices, data = self._csr
+        return {"indptr": indptr, "indices": indices, "data": data}
+
+    def _row(self, title):
+        row = self._movie_index.get(title)
+        if row is None:
+            row = len(self.movies)
+            self._movie_index[title] = row
+            self.movies.append(title)
+        return row
+
+    def add(self, title, words):
+        """Count the lexicon words of one review (e.g. the words of TextProcessor.explain_review hits)"""
+        terms = [self._term_index[word] for word in words if word in self._term_index]
+        with self._lock:
+            row = self._row(title)
+            self._pending_rows.extend([row] * len(terms))
+            self._pending_terms.extend(terms)
+            if len(self._pending_rows) >= self.compact_every:
+                self.compact()
+
+    def compact(self):
+        """Merge the pending hits into the CSR arrays"""
+        with self._lock:
+            n_rows = len(self.movies)
+            indptr, indices, data = self._csr
+            if not self._pending_rows and len(indptr) == n_rows + 1:
+                return
+            n_terms = len(self.terms)
+            csr_rows = np.repeat(np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr))
+            keys = np.concatenate([
+                csr_rows * n_terms + indices,
+                np.array(self._pending_rows, dtype=np.int64) * n_terms + np.array(self._pending_terms, dtype=np.int64),
+            ])
+            counts = np.concatenate([data, np.ones(len(self._pending_rows), dtype=np.int32)])
+            unique, inverse = np.unique(keys, return_inverse=True)  # sorted by row, then term
+            rows = unique // n_terms
+            indptr = np.zeros(n_rows + 1, dtype=np.int64)
+            np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+            self._csr = (indptr, (unique % n_terms).astype(np.int32),
+                         np.bincount(inverse, weights=counts).astype(np.int32))
+            self._pending_rows = array("i")
+            self._pending_terms = array("i")
+
+    @property
+    def nnz(self):
+        return len(self._csr[2]) + len(self._pending_rows)
+
+    def counts(self, titles):
+        """Total count of every lexicon term over the given movies (unknown titles are ignored)"""
+        with self._lock:
+            # one consistent view: copies of the pending hits and the CSR triple they were not merged into
+            indptr, indices, data = self._csr
+            pending_rows = np.array(self._pending_rows, dtype=np.int32)
+            pending_terms = np.array(self._pending_terms, dtype=np.int32)
+            rows = np.unique(np.array([self._movie_index[t] for t in titles if t in self._movie_index],
+                                      dtype=np.int64))
+        n_terms = len(self.terms)
+        total = np.zeros(n_terms, dtype=np.int64)
+        if not len(rows):
+            return total
+        built = rows[rows < len(indptr) - 1]
+        if len(built):
+            starts, ends = indptr[built], indptr[built + 1]
+            lengths = ends - starts
+            # positions of every stored entry of the wanted rows, without a Python loop over rows
+            positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            total += np.bincount(indices[positions], weights=data[positions], minlength=n_terms).astype(np.int64)
+        if len(pending_rows):
+            mask = np.isin(pending_rows, rows)
+            total += np.bincount(pending_terms[mask], minlength=n_terms)
+        return total
+
+    def top_terms(self, titles, k=10):
+        """
+        Most frequent positive and negative lexicon terms over the given movies
+        Returns {"positive": [...], "negative": [...]}, each entry {"term", "count", "weight"}.
+        """
+        counts = self.counts(titles)
+        result = {}
+        for name, mask in (("positive", self.weights > 0), ("negative", self.weights < 0)):
+            candidates = np.flatnonzero(mask & (counts > 0))
+            if len(candidates) > k:
+                # partition first, then sort only the k winners (ties broken by term order)
+                kth = np.argpartition(-counts[candidates], k - 1)[:k]
+                cutoff = counts[candidates[kth]].min()
+                candidates = candidates[counts[candidates] >= cutoff]
+            order = np.lexsort((candidates, -counts[candidates]))[:k]
+            result[name] = [
+                {"term": self.terms[i], "count": int(counts[i]), "weight": int(self.weights[i])}
+                for i in candidates[order]
+            ]
+        return result
+
+    def __len__(self):
+        return len(self.movies)
@@ -0,0 +1,287 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+import pandas as pd
+
+# the app reads its settings when it is imported: the fixture CSV (written below), no warm-start file,
+# a throwaway job table and no worker processes
+TEMP_DIR = tempfile.mkdtemp()
+os.environ.update({
+    "REVIEWS_CSV": os.path.join(TEMP_DIR, "reviews.csv"),
+    "WARM_START_PATH": "",
+    "JOBS_DB": os.path.join(TEMP_DIR, "jobs.sqlite3"),
+    "JOB_WORKERS": "0",
+})
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "website"))
+
+POSITIVE = ["Good fun.", "A great film.", "Amazing cast, good story.", "I love it.", "Good. Great.", "Nice and good."]
+NEGATIVE = ["Bad plot.", "Terrible acting.", "Awful and boring.", "Bad. Bad.", "A terrible mess.", "Boring."]
+
+
+def fixture_rows():
+    """Six reviews each of two liked and two disliked movies, plus one review without text (id 24)"""
+    rows = []
+    for title, genres, texts in [("Alpha", "Comedy", POSITIVE), ("Beta", "Comedy, Drama", POSITIVE),
+                                 ("Gamma", "Horror", NEGATIVE), ("Delta", "Horror, Drama", NEGATIVE)]:
+        rows += [{"movie_title": title, "review_content": f"{text} ({title} {i})", "genres": genres}
+                 for i, text in enumerate(texts)]
+    rows.append({"movie_title": "Gamma", "review_content": None, "genres": "Horror"})
+    return rows
+
+
+pd.DataFrame(fixture_rows()).to_csv(os.environ["REVIEWS_CSV"], index=False)
+import app as web  # noqa: E402
+import profiling  # noqa: E402
+from autocomplete import TitleAutocomplete  # noqa: E402
+from dataset import DatasetStore  # noqa: E402
+
+
+def tearDownModule():
+    shutil.rmtree(TEMP_DIR)
+
+
+class TestRoutes(unittest.TestCase):
+
+    def setUp(self):
+        """Serve a fresh copy of the fixture CSV, with nothing built yet."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv = os.path.join(self.temp_dir, "reviews.csv")
+        pd.DataFrame(fixture_rows()).to_csv(self.csv, index=False)
+        web.store = DatasetStore(self.csv)
+        web.analytics = web.review_index = None
+        web.title_autocomplete = TitleAutocomplete().build(web.store.current().df)
+        self.client = web.app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def get(self, path, code=200, **params):
+        response = self.client.get(path, query_string=params)
+        self.assertEqual(response.status_code, code, response.get_data(as_text=True))
+        return response.get_json()
+
+    def test_serves_the_configured_csv(self):
+        self.assertEqual(web.CSV_PATH, os.environ["REVIEWS_CSV"])
+
+    def test_similar_reviews(self):
+        result = self.get("/similar_reviews", review_id=0, k=3)
+        self.assertEqual(result["review"]["movie_title"], "Alpha")
+        self.assertTrue(result["similar"])
+        same_movie = self.get("/similar_reviews", review_id=0, k=10, scope="movie")["similar"]
+        self.assertEqual({r["movie_title"] for r in same_movie}, {"Alpha"})
+        self.get("/similar_reviews", 400, review_id="first")
+        self.get("/similar_reviews", 400, review_id=0, scope="year")
+        self.get("/similar_reviews", 404, review_id=99)
+
+    def test_leaderboard(self):
+        result = self.get("/leaderboard", n=2)
+        self.assertEqual({m["Movie Title"] for m in result["top_movies"]}, {"Alpha", "Beta"})
+        self.assertEqual({m["Movie Title"] for m in result["worst_movies"]}, {"Gamma", "Delta"})
+        self.get("/leaderboard", 400, n="two")
+
+    def test_autocomplete(self):
+        result = self.get("/autocomplete", q="al")
+        self.assertEqual(result["suggestions"], [{"movie_title": "Alpha", "review_count": 6}])
+        self.get("/autocomplete", 400, q="al", limit="many")
+
+    def test_bulk_import(self):
+        batch = "\n".join([
+            '{"movie_name": "alpha", "review": "Good again"}',
+            '{"movie_name": "Alpha", "review": "Good fun. (Alpha 0)"}',
+            '{"movie_name": "Alpha"}',
+            '{"movie_name": "Zeta", "review": "Who?"}',
+        ])
+        response = self.client.post("/bulk_import", data=batch)
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()["results"]
+        self.assertEqual([r["status"] for r in results], ["added", "duplicate", "invalid", "suggestion"])
+        self.assertEqual(results[3]["suggestion"], "Beta")
+        self.assertEqual(len(pd.read_csv(self.csv)), 26)
+
+        response = self.client.post("/bulk_import?format=csv", data="movie_name,review\nBeta,Great again\n")
+        self.assertEqual(response.get_json()["added"], 1)
+        self.assertEqual(self.client.post("/bulk_import?format=xml", data="x").status_code, 400)
+        self.assertEqual(self.client.post("/bulk_import", data="").status_code, 400)
+
+    def test_builds_do_not_wait_for_writers(self):
+        with web.write_lock:  # a write in progress
+            reader = threading.Thread(target=self.get, args=("/leaderboard",))
+            reader.start()
+            reader.join(60)
+            self.assertFalse(reader.is_alive())
+        self.assertIsNotNone(web.analytics)
+
+    def test_writes_do_not_wait_for_analytics(self):
+        self.get("/leaderboard")
+        with web.build_lock:  # a build or catch-up in progress
+            writer = threading.Thread(target=self.client.post, args=("/add_review",),
+                                      kwargs={"json": {"movie_name": "Alpha", "review": "Good again"}})
+            writer.start()
+            writer.join(60)
+            self.assertFalse(writer.is_alive())
+            self.assertEqual(len(web.store.current()), 26)
+        web.catch_up()
+        self.assertEqual(web.analytics_rows, 26)
+
+    def test_rows_appended_during_a_build_are_replayed(self):
+        build = web.load_or_build_analytics
+
+        def build_while_writing(snapshot):
+            web.store.append([{"movie_title": "Gamma", "review_content": "Awful.", "genres": "Horror"}])
+            return build(snapshot)
+
+        web.load_or_build_analytics = build_while_writing
+        try:
+            self.assertEqual(self.get("/distribution", movie="Gamma")["review_count"], 7)
+        finally:
+            web.load_or_build_analytics = build
+        self.assertEqual(web.analytics_rows, 26)
+
+    def test_search_pages(self):
+        first = self.get("/search", q="good", page_size=2)
+        second = self.get("/search", q="good", page_size=2, page=2)
+        self.assertEqual([r["review_content"] for r in first],
+                         ["Good fun. (Alpha 0)", "Amazing cast, good story. (Alpha 2)"])
+        self.assertEqual(second[0]["review_content"], "Good. Great. (Alpha 4)")
+        self.assertEqual(self.get("/search", q="gamma", fields="movie_title")[0], {"movie_title": "Gamma"})
+        self.get("/search", 400, q="(")
+        self.get("/search", 400)
+
+    def test_pool_stats(self):
+        self.get("/search", q="good")
+        result = self.get("/pool_stats")
+        self.assertIn("search", result["routes"])
+        self.assertEqual(result["in_flight"], 0)
+
+    def test_genre_sentiment(self):
+        genres = {g["genre"]: g for g in self.get("/genre_sentiment")["genres"]}
+        self.assertEqual(set(genres), {"Comedy", "Drama", "Horror"})
+        self.assertGreater(genres["Comedy"]["mean"], 0)
+        self.assertLess(genres["Horror"]["mean"], 0)
+        self.assertEqual(len(self.get("/genre_sentiment", genre="horror")["genres"]), 1)
+        self.get("/genre_sentiment", 404, genre="Western")
+
+    def test_explain(self):
+        result = self.get("/explain", review_id=2)
+        self.assertEqual(result["movie_title"], "Alpha")
+        self.assertEqual([c["term"] for c in result["contributions"]], ["amazing", "good"])
+        self.assertIn("<mark", result["highlighted"])
+        self.get("/explain", 400, review_id="x")
+        self.get("/explain", 404, review_id=24)  # no text, so never scored
+
+    def test_jobs(self):
+        self.assertEqual(self.client.post("/jobs", json={"kind": "bogus"}).status_code, 400)
+        response = self.client.post("/jobs", json={"kind": "partition"})
+        self.assertEqual(response.status_code, 202)
+        job = response.get_json()["job"]
+        self.assertEqual(response.headers["Location"], f"/jobs/{job['id']}")
+        self.assertEqual(self.client.post("/jobs", json={"kind": "partition"}).get_json()["job"]["id"], job["id"])
+        self.assertEqual(self.get(f"/jobs/{job['id']}")["status"], "queued")
+        self.assertIn(job["id"], [j["id"] for j in self.get("/jobs", status="queued")["jobs"]])
+        self.get("/jobs/999999", 404)
+        self.get("/jobs", 400, limit="all")
+
+    def test_top_terms(self):
+        result = self.get("/top_terms", movie="alpha", k=3)
+        self.assertEqual(result["movie_title"], "Alpha")
+        self.assertEqual(result["positive"][0]["term"], "good")
+        self.assertEqual(self.get("/top_terms", genre="horror")["movie_count"], 2)
+        self.get("/top_terms", 400)
+        self.get("/top_terms", 400, movie="Alpha", genre="Comedy")
+        self.get("/top_terms", 400, movie="Alpha", k="x")
+        self.get("/top_terms", 404, movie="Zeta")
+        self.get("/top_terms", 404, genre="Western")
+
+    def test_movie_reviews_pages_with_cursor(self):
+        seen, params = [], {"limit": 4}
+        while True:
+            page = self.get("/movies/Alpha/reviews", **params)
+            self.assertEqual(page["total"], 6)
+            seen += page["reviews"]
+            if not page["next_cursor"]:
+                break
+            params["cursor"] = page["next_cursor"]
+        self.assertEqual(sorted(r["review_id"] for r in seen), list(range(6)))
+        scores = [r["score"] for r in seen]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all(r["review_content"].endswith(")") for r in seen))
+
+        ascending = self.get("/movies/alpha/reviews", order="asc", max_score=3)
+        self.assertTrue(all(r["score"] <= 3 for r in ascending["reviews"]))
+        self.get("/movies/Alpha/reviews", 400, cursor="not-a-cursor")
+        self.get("/movies/Alpha/reviews", 400, order="random")
+        self.get("/movies/Alpha/reviews", 400, min_score="low")
+        self.get("/movies/Zeta/reviews", 404)
+
+    def test_distribution(self):
+        self.assertEqual(self.get("/distribution")["review_count"], 24)
+        movie = self.get("/distribution", movie="gamma", q="0.5")
+        self.assertEqual((movie["movie_title"], movie["review_count"]), ("Gamma", 6))
+        self.assertLess(movie["quantiles"]["p50"], 0)
+        self.assertEqual(self.get("/distribution", genre="drama")["review_count"], 12)
+        self.get("/distribution", 400, movie="Alpha", genre="Comedy")
+        self.get("/distribution", 400, q="2")
+        self.get("/distribution", 404, movie="Zeta")
+        self.get("/distribution", 404, genre="Western")
+
+    def test_similar_movies(self):
+        result = self.get("/similar_movies", movie="alpha", k=3)
+        self.assertEqual(result["movie"]["movie_title"], "Alpha")
+        self.assertEqual(result["similar"][0]["movie_title"], "Beta")
+        in_genre = self.get("/similar_movies", movie="Delta", scope="genre")["similar"]
+        self.assertEqual({m["movie_title"] for m in in_genre}, {"Beta", "Gamma"})
+        self.get("/similar_movies", 400)
+        self.get("/similar_movies", 400, movie="Alpha", scope="movie")
+        self.get("/similar_movies", 400, movie="Alpha", k="x")
+        self.get("/similar_movies", 404, movie="Zeta")
+
+    def test_add_review_updates_analytics(self):
+        self.get("/leaderboard")  # build the analytics and the review index first
+        self.get("/similar_reviews", review_id=0)
+        response = self.client.post("/add_review", json={"movie_name": "gamma", "review": "Amazing and good!"})
+        self.assertEqual(response.status_code, 200)
+        web.catch_up()  # what the background thread does after the write
+
+        self.assertEqual(self.get("/movies/Gamma/reviews", limit=1)["reviews"][0]["review_id"], 25)
+        self.assertEqual(self.get("/distribution", movie="Gamma")["review_count"], 7)
+        self.assertEqual(self.get("/explain", review_id=25)["movie_title"], "Gamma")
+        self.assertEqual(self.get("/similar_reviews", review_id=25)["review"]["review_content"], "Amazing and good!")
+        self.assertEqual(self.get("/autocomplete", q="gam")["suggestions"][0]["review_count"], 8)
+
+        again = self.client.post("/add_review", json={"movie_name": "Gamma", "review": "Amazing and good!"})
+        self.assertEqual(again.status_code, 409)
+        self.assertEqual(self.client.post("/add_review", json={"movie_name": "Gamma"}).status_code, 400)
+        suggestion = self.client.post("/add_review", json={"movie_name": "Gamme", "review": "Fine"})
+        self.assertEqual((suggestion.status_code, suggestion.get_json()["suggestion"]), (206, "Gamma"))
+
+    def test_compare_movies_parameters(self):
+        result = self.get("/compare_movies", movie1="alpha", movie2="Gamma")
+        self.assertEqual(result["alpha"]["review_count"], 6)
+        self.assertLess(result["Gamma"]["average_sentiment"], 0)
+        self.get("/compare_movies", 400, movie1="Alpha")
+        self.get("/compare_movies", 400, movie1="Alpha", movie2="Gamma", target_error="small")
+        self.get("/compare_movies", 400, movie1="Alpha", movie2="Gamma", time_budget="0")
+        self.get("/compare_movies", 400, movie1="Alpha", movie2="Gamma", sample_size="1")
+
+    def test_profiling_needs_the_secret(self):
+        response = self.client.get("/autocomplete?q=a", headers={"X-Profile": "1"})
+        self.assertNotIn("X-Profile-File", response.headers)
+
+        secret, out_dir = web.PROFILE_SECRET, profiling.DEFAULT_PROFILE_DIR
+        web.PROFILE_SECRET, profiling.DEFAULT_PROFILE_DIR = "s3cret", self.temp_dir
+        try:
+            response = self.client.get("/autocomplete?q=a", headers={"X-Profile": "s3cret"})
+        finally:
+            web.PROFILE_SECRET, profiling.DEFAULT_PROFILE_DIR = secret, out_dir
+        name = response.headers["X-Profile-File"]
+        self.assertEqual(os.path.basename(name), name)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, name)))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# to test: python -m unittest tests/app_test.py
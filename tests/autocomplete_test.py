@@ -0,0 +1,42 @@
+import unittest
+import pandas as pd
+from autocomplete import TitleAutocomplete, normalize_title
+
+
+class TestTitleAutocomplete(unittest.TestCase):
+
+    def setUp(self):
+        df = pd.DataFrame({
+            "movie_title": ["The Matrix", "The Matrix", "The Mask", "Titanic", "The Matrix Reloaded",
+                            "The Mask", "The Mask", "Avatar"],
+        })
+        self.index = TitleAutocomplete().build(df)
+
+    def test_normalize_title(self):
+        self.assertEqual(normalize_title("  The   MATRIX "), "the matrix")
+
+    def test_ranked_by_review_count(self):
+        titles = [r["movie_title"] for r in self.index.complete("the ma")]
+        self.assertEqual(titles, ["The Mask", "The Matrix", "The Matrix Reloaded"])
+
+    def test_case_insensitive_prefix(self):
+        result = self.index.complete("TIT")
+        self.assertEqual(result, [{"movie_title": "Titanic", "review_count": 1}])
+
+    def test_limit_and_empty_prefix(self):
+        self.assertEqual(len(self.index.complete("t", limit=2)), 2)
+        self.assertEqual(self.index.complete("   "), [])
+        self.assertEqual(self.index.complete("zzz"), [])
+
+    def test_add_new_title(self):
+        self.index.add("The Mandalorian")
+        self.index.add("The Mandalorian", count=5)
+        self.assertEqual(self.index.complete("the man")[0], {"movie_title": "The Mandalorian", "review_count": 6})
+        self.assertEqual(self.index.keys, sorted(self.index.keys))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# to test: python -m unittest tests/autocomplete_test.py
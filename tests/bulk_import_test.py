@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from bulk_import import parse_batch, import_reviews, plan_import
+from dataset import DatasetStore
+
+
+class TestBulkImport(unittest.TestCase):
+
+    def setUp(self):
+        """Create a temporary review file before each test."""
+        self.test_csv = os.path.join(tempfile.mkdtemp(), "reviews.csv")
+        pd.DataFrame({
+            "movie_title": ["Inception", "Interstellar"],
+            "review_content": ["Amazing visuals!", "Great story."],
+            "genres": ["Sci-Fi", "Drama"],
+        }).to_csv(self.test_csv, index=False)
+
+    def tearDown(self):
+        os.remove(self.test_csv)
+
+    def test_parse_ndjson(self):
+        rows = parse_batch('{"movie_name": "Inception", "review": "Wow"}\n\nnot json\n')
+        self.assertEqual(rows, [{"movie_name": "Inception", "review": "Wow"}, None])
+
+    def test_parse_csv(self):
+        rows = parse_batch("movie_name,review\nInception,Wow\n", fmt="csv")
+        self.assertEqual(rows, [{"movie_name": "Inception", "review": "Wow"}])
+
+    def test_import_statuses(self):
+        rows = [
+            {"movie_name": "inception", "review": "Loved it"},
+            {"movie_name": "Inception", "review": "Loved it"},
+            {"movie_name": "Inception", "review": "Amazing visuals!"},
+            {"movie_name": "Interstelar", "review": "So long"},
+            {"movie_name": "CompletelyDifferent", "review": "Hmm"},
+            {"movie_name": "Inception"},
+            None,
+        ]
+        statuses = [r["status"] for r in import_reviews(rows, csv_file=self.test_csv)]
+        self.assertEqual(statuses, ["added", "duplicate_in_batch", "duplicate", "suggestion",
+                                    "unknown_movie", "invalid", "invalid"])
+
+        df = pd.read_csv(self.test_csv)
+        self.assertEqual(len(df), 3)
+        self.assertEqual(df.iloc[-1]["genres"], "Sci-Fi")  # genres copied from the existing movie
+
+    def test_accept_suggestions(self):
+        results = import_reviews([{"movie_name": "Interstelar", "review": "So long"}],
+                                 csv_file=self.test_csv, accept_suggestions=True)
+        self.assertEqual(results[0], {"row": 0, "status": "added", "movie_name": "Interstellar"})
+
+
+    def test_plan_against_snapshot(self):
+        """A snapshot's frame has no review texts: duplicates are checked with has_review."""
+        snapshot = DatasetStore(self.test_csv).current()
+        results, new_rows = plan_import([{"movie_name": "Inception", "review": "Amazing visuals!"},
+                                         {"movie_name": "interstellar", "review": "Long"}],
+                                        snapshot.df, has_review=snapshot.has_review)
+        self.assertEqual([r["status"] for r in results], ["duplicate", "added"])
+        self.assertEqual(new_rows[0]["genres"], "Drama")
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# to test: python -m unittest tests/bulk_import_test.py
@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from datamanagement import full_run, incremental_run
+
+
+class TestIncrementalETL(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.reviews = os.path.join(self.temp_dir, "reviews.csv")
+        self.titles = os.path.join(self.temp_dir, "titles.csv")
+        self.output = os.path.join(self.temp_dir, "cleaned.csv")
+        pd.DataFrame({
+            "rotten_tomatoes_link": ["m/a", "m/b"],
+            "movie_title": ["Movie A", "Movie B"],
+            "genres": ["Drama", "Comedy"],
+        }).to_csv(self.titles, index=False)
+        self.write_reviews([("m/a", "Good film"), ("m/b", "Bad film"), ("m/a", "Good film"), ("m/x", "No movie")])
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_reviews(self, rows, mode="w"):
+        pd.DataFrame(rows, columns=["rotten_tomatoes_link", "review_content"]).to_csv(
+            self.reviews, mode=mode, header=(mode == "w"), index=False)
+
+    def run_incremental(self):
+        return incremental_run(self.reviews, self.titles, self.output, verbose=False)
+
+    def output_rows(self):
+        return list(pd.read_csv(self.output)[["movie_title", "review_content"]].itertuples(index=False, name=None))
+
+    def test_first_incremental_run_is_full(self):
+        result = self.run_incremental()
+        self.assertEqual(result["mode"], "full")
+        self.assertEqual(self.output_rows(), [("Movie B", "Bad film"), ("Movie A", "Good film")])
+
+    def test_appended_rows_only(self):
+        self.run_incremental()
+        self.write_reviews([("m/b", "Bad film"), ("m/b", "Funny film"), ("m/b", "Funny film")], mode="a")
+        result = self.run_incremental()
+        self.assertEqual((result["mode"], result["added"], result["rows"]), ("incremental", 1, 3))
+        self.assertEqual(self.output_rows()[-1], ("Movie B", "Funny film"))
+
+        # nothing new: nothing appended
+        self.assertEqual(self.run_incremental()["added"], 0)
+        self.assertEqual(len(self.output_rows()), 3)
+
+    def test_partial_last_line_waits(self):
+        self.run_incremental()
+        with open(self.reviews, "a", encoding="utf-8") as f:
+            f.write("m/a,Half writ")
+        self.assertEqual(self.run_incremental()["added"], 0)
+        with open(self.reviews, "a", encoding="utf-8") as f:
+            f.write("ten review\n")
+        self.assertEqual(self.run_incremental()["added"], 1)
+        self.assertEqual(self.output_rows()[-1], ("Movie A", "Half written review"))
+
+    def test_half_written_multiline_review_waits(self):
+        self.run_incremental()
+        with open(self.reviews, "a", encoding="utf-8") as f:
+            f.write('m/a,"Great\n')
+        self.assertEqual(self.run_incremental()["added"], 0)
+        with open(self.reviews, "a", encoding="utf-8") as f:
+            f.write('acting, ""really""\n')
+        self.assertEqual(self.run_incremental()["added"], 0)
+        with open(self.reviews, "a", encoding="utf-8") as f:
+            f.write('good"\nm/b,Next film\n')
+        self.assertEqual(self.run_incremental()["added"], 2)
+        self.assertEqual(self.output_rows()[-2:], [("Movie A", 'Great\nacting, "really"\ngood'), ("Movie B", "Next film")])
+
+    def test_rewritten_input_rebuilds(self):
+        self.run_incremental()
+        self.write_reviews([("m/a", "Different film"), ("m/b", "Other film"), ("m/b", "Third film")])
+        result = self.run_incremental()
+        self.assertEqual(result["mode"], "full")
+        self.assertEqual(len(self.output_rows()), 3)
+
+    def test_full_run_matches_incremental(self):
+        self.run_incremental()
+        self.write_reviews([("m/b", "Funny film")], mode="a")
+        self.run_incremental()
+        incremental = sorted(self.output_rows())
+        full_run(self.reviews, self.titles, self.output, verbose=False)
+        self.assertEqual(sorted(self.output_rows()), incremental)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# to test: python -m unittest tests/datamanagement_test.py
@@ -0,0 +1,146 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import numpy as np
+import pandas as pd
+from dataset import DatasetStore
+from title_offsets import TitleOffsetIndex, index_path
+
+
+class TestDatasetStore(unittest.TestCase):
+
+    def setUp(self):
+        """Create a temporary review file before each test."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.test_csv = os.path.join(self.temp_dir, "reviews.csv")
+        pd.DataFrame({
+            "movie_title": ["Inception", "Titanic"],
+            "review_content": ["Amazing visuals!", "So emotional."],
+            "genres": ["Sci-Fi", "Romance"],
+        }).to_csv(self.test_csv, index=False)
+        self.store = DatasetStore(self.test_csv)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_append_publishes_new_snapshot(self):
+        old = self.store.current()
+        new = self.store.append([{"movie_title": "Avatar", "review_content": "Blue people"}])
+
+        self.assertIs(self.store.current(), new)
+        self.assertEqual(new.version, old.version + 1)
+        self.assertEqual(len(old), 2)  # readers holding the old snapshot are unaffected
+        self.assertEqual(len(new), 3)
+        self.assertTrue(new.has_review("Avatar", "Blue people"))
+        self.assertFalse(old.has_review("Avatar", "Blue people"))
+        self.assertEqual(len(pd.read_csv(self.test_csv)), 3)
+
+    def test_title_index_kept_current(self):
+        """The store builds the CSV's title index and extends it with every append."""
+        self.assertEqual(TitleOffsetIndex.load(index_path(self.test_csv)).rows, 2)
+        self.store.append([{"movie_title": "Titanic", "review_content": "Cold water"}])
+        index = TitleOffsetIndex.load(index_path(self.test_csv))
+        self.assertEqual(index.rows, 3)
+        self.assertEqual(index.read(self.test_csv, ["titanic"])["review_content"].tolist(),
+                         ["So emotional.", "Cold water"])
+        # the store's own index is the one extended, not reopened
+        held = self.store.title_index
+        self.store.append([{"movie_title": "Titanic", "review_content": "Iceberg"}])
+        self.assertIs(self.store.title_index, held)
+        self.assertEqual(held.read(self.test_csv, ["titanic"])["review_content"].tolist(),
+                         ["So emotional.", "Cold water", "Iceberg"])
+
+    def test_append_nothing_keeps_snapshot(self):
+        old = self.store.current()
+        self.assertIs(self.store.append([]), old)
+
+    def test_cached_built_once_per_snapshot(self):
+        calls = []
+        snapshot = self.store.current()
+        build = lambda df: calls.append(1) or len(df)
+        self.assertEqual(snapshot.cached("n", build), 2)
+        self.assertEqual(snapshot.cached("n", build), 2)
+        self.assertEqual(len(calls), 1)
+
+    def test_refresh_after_external_append(self):
+        self.assertEqual(self.store.refresh()[1], None)
+        pd.DataFrame({"movie_title": ["Up"], "review_content": ["Balloons"], "genres": ["Kids"]}).to_csv(
+            self.test_csv, mode="a", header=False, index=False)
+        with open(self.test_csv, "a", encoding="utf-8") as f:
+            f.write('Up,"Half\nwritten')  # another writer is still busy with this row
+        snapshot, start = self.store.refresh()
+        self.assertEqual((len(snapshot), start), (3, 2))
+        self.assertTrue(snapshot.has_review("Up", "Balloons"))
+        with open(self.test_csv, "a", encoding="utf-8") as f:
+            f.write(' review",Kids\n')
+        snapshot, start = self.store.refresh()
+        self.assertEqual((len(snapshot), start), (4, 3))
+        self.assertEqual(snapshot.text(3), "Half\nwritten review")
+
+    def test_refresh_after_rewrite_reloads(self):
+        pd.DataFrame({"movie_title": ["Up"], "review_content": ["Balloons"], "genres": ["Kids"]}).to_csv(
+            self.test_csv, index=False)
+        snapshot, start = self.store.refresh()
+        self.assertEqual((len(snapshot), start), (1, 0))
+        self.assertFalse(snapshot.has_review("Inception", "Amazing visuals!"))
+
+    def test_append_does_not_copy_loaded_rows(self):
+        old = self.store.current()
+        new = self.store.append([{"movie_title": "Avatar", "review_content": "Blue people"}])
+        self.assertTrue(np.shares_memory(old.df["movie_title"].cat.codes.to_numpy(),
+                                         new.df["movie_title"].cat.codes.to_numpy()))
+        self.assertIs(old.texts, new.texts)
+
+    def test_texts_are_kept_out_of_the_frame(self):
+        self.store.append([{"movie_title": "Avatar", "review_content": "Blue people", "genres": "Sci-Fi"},
+                           {"movie_title": "Avatar", "review_content": None, "genres": "Sci-Fi"}])
+        snapshot = self.store.current()
+        self.assertEqual(snapshot.df.columns.tolist(), ["movie_title", "genres"])
+        self.assertEqual(snapshot.text(1), "So emotional.")
+        self.assertTrue(pd.isna(snapshot.text(3)))
+        with self.assertRaises(IndexError):
+            snapshot.text(4)
+        self.assertEqual(snapshot.review_texts([2, 0]), ["Blue people", "Amazing visuals!"])
+        rows = snapshot.with_text(snapshot.movie_rows([" avatar "]))
+        self.assertEqual(rows.columns.tolist(), ["movie_title", "review_content", "genres"])
+        self.assertEqual(rows.index.tolist(), [2, 3])
+        self.assertEqual(rows["review_content"].iloc[0], "Blue people")
+        pd.testing.assert_frame_equal(snapshot.with_text(), pd.read_csv(self.test_csv))
+        self.assertEqual(snapshot.movie_genres()["Avatar"], "Sci-Fi")
+
+    def test_many_titles_widen_codes(self):
+        old = self.store.current()
+        self.store.append([{"movie_title": f"Movie {i}", "review_content": "Fine"} for i in range(300)])
+        snapshot = self.store.current()
+        self.assertEqual(snapshot.df["movie_title"].iloc[-1], "Movie 299")
+        self.assertEqual(old.df["movie_title"].tolist(), ["Inception", "Titanic"])
+        self.assertEqual(len(snapshot.movie_titles()), 302)
+        self.assertEqual(old.df["movie_title"].tolist(), ["Inception", "Titanic"])
+
+    def test_readers_see_consistent_snapshots(self):
+        """Concurrent readers only ever see whole snapshots whose size matches their version."""
+        errors = []
+
+        def read():
+            for _ in range(200):
+                snap = self.store.current()
+                if len(snap.df) != snap.version + 1:
+                    errors.append((snap.version, len(snap.df)))
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for t in readers:
+            t.start()
+        for i in range(20):
+            self.store.append([{"movie_title": "Avatar", "review_content": f"Review {i}"}])
+        for t in readers:
+            t.join()
+        self.assertEqual(errors, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# to test: python -m unittest tests/dataset_test.py
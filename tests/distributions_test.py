@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from distributions import ScoreSketch, ScoreDistributions, HIST_EDGES
+from analytics import Analytics
+from text_processing import TextProcessor
+
+
+class TestScoreSketch(unittest.TestCase):
+
+    def setUp(self):
+        self.scores = np.random.default_rng(0).normal(1.0, 3.0, 20000)
+
+    def test_quantiles_close_to_exact(self):
+        sketch = ScoreSketch().add_many(self.scores)
+        qs = [0.01, 0.1, 0.5, 0.9, 0.99]
+        ranks = [(self.scores < v).mean() for v in sketch.quantiles(qs)]
+        np.testing.assert_allclose(ranks, qs, atol=0.002)
+        self.assertLess(len(sketch.means), 100)
+
+    def test_small_sketch_is_exact(self):
+        sketch = ScoreSketch()
+        for score in [3.0, -1.0, 2.0]:
+            sketch.add(score)
+        self.assertEqual(sketch.quantiles([0, 0.5, 1]), [-1.0, 2.0, 3.0])
+        summary = sketch.summary()
+        self.assertEqual(summary["review_count"], 3)
+        self.assertEqual(summary["average_score"], round(4 / 3, 4))
+        self.assertEqual(sum(summary["histogram"]["counts"]), 3)
+
+    def test_merge_matches_single_sketch(self):
+        parts = [ScoreSketch().add_many(part) for part in np.array_split(self.scores, 7)]
+        merged = ScoreSketch().merge(*parts)
+        whole = ScoreSketch().add_many(self.scores)
+        self.assertEqual(merged.count, len(self.scores))
+        np.testing.assert_array_equal(merged.hist, whole.hist)
+        self.assertEqual((merged.min, merged.max), (whole.min, whole.max))
+        self.assertAlmostEqual(merged.total, whole.total, places=6)
+        ranks = [(self.scores < v).mean() for v in merged.quantiles()]
+        np.testing.assert_allclose(ranks, [0.1, 0.25, 0.5, 0.75, 0.9], atol=0.002)
+
+    def test_histogram_bins(self):
+        sketch = ScoreSketch().add_many([-12.0, -0.5, 0.0, 0.5, 10.0, 11.0])
+        counts = sketch.summary()["histogram"]["counts"]
+        self.assertEqual(len(counts), len(HIST_EDGES) + 1)
+        self.assertEqual(counts[0], 1)
+        self.assertEqual(counts[-1], 2)
+        self.assertEqual(counts[np.searchsorted(HIST_EDGES, 0.0, "right")], 2)
+
+    def test_dict_round_trip(self):
+        sketch = ScoreSketch().add_many(self.scores[:1000])
+        copy = ScoreSketch.from_dict(sketch.to_dict())
+        self.assertEqual(copy.summary(), sketch.summary())
+
+
+class TestScoreDistributions(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.df = pd.DataFrame({
+            "Review ID": range(300),
+            "Movie Title": [f"Movie {i % 6}" for i in range(300)],
+            "Genres": ["Drama, Comedy" if i % 6 < 3 else "Horror" for i in range(300)],
+            "Average Score": rng.normal(0, 2, 300),
+        })
+        self.distributions = ScoreDistributions().build(self.df)
+
+    def test_genre_rollup_is_merge_of_movies(self):
+        drama = self.distributions.genre("Drama")
+        expected = self.df[self.df["Genres"].str.contains("Drama")]["Average Score"]
+        self.assertEqual(drama.count, len(expected))
+        self.assertAlmostEqual(drama.total, expected.sum(), places=6)
+        self.assertEqual(self.distributions.overall().count, 300)
+        self.assertEqual(self.distributions.genres(), ["Comedy", "Drama", "Horror"])
+
+    def test_add_updates_movie_and_rollups(self):
+        before = self.distributions.genre("Horror").count
+        self.distributions.add("Movie 5", "Horror", 9.5)
+        self.distributions.add("New Movie", "Horror", -9.5)
+        self.assertEqual(self.distributions.genre("Horror").count, before + 2)
+        self.assertEqual(self.distributions.genre("Horror").max, 9.5)
+        self.assertEqual(self.distributions.movie("New Movie").count, 1)
+
+    def test_find(self):
+        self.assertEqual(self.distributions.find_movie("  movie 3 "), "Movie 3")
+        self.assertEqual(self.distributions.find_genre("horror"), "Horror")
+        self.assertIsNone(self.distributions.find_movie("Nope"))
+        self.assertIsNone(self.distributions.find_genre("Western"))
+
+
+class TestAnalyticsDistributions(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.dict_path = os.path.join(self.temp_dir, "dict.txt")
+        with open(self.dict_path, "w", encoding="utf-8") as f:
+            f.write("good\t3\nbad\t-2\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_add_reviews_updates_distributions(self):
+        df = pd.DataFrame({
+            "movie_title": ["Movie A", "Movie A", "Movie B"],
+            "review_content": ["good good", "bad", "good"],
+            "genres": ["Drama", "Drama", "Comedy"],
+        })
+        analytics = Analytics(TextProcessor(self.dict_path), min_reviews=1).build(df)
+        self.assertEqual(analytics.distributions.overall().count, 3)
+        analytics.add_reviews(pd.DataFrame({
+            "movie_title": ["Movie B"], "review_content": ["bad bad bad"], "genres": ["Comedy"],
+        }), start_id=3)
+        comedy = analytics.distributions.genre("Comedy")
+        self.assertEqual(comedy.count, 2)
+        self.assertEqual(comedy.min, analytics.scores["Average Score"].iloc[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# to test: python -m unittest tests/distributions_test.py
@@ -0,0 +1,106 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from explanations import ExplanationStore, highlight
+from text_processing import TextProcessor
+
+
+class TestExplanations(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dict = tempfile.NamedTemporaryFile(delete=False, mode="w", encoding="utf-8")
+        cls.temp_dict.write("good\t3\nbad\t-2\namazing\t4\nterrible\t-3\n")
+        cls.temp_dict.close()
+        cls.processor = TextProcessor(cls.temp_dict.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.temp_dict.name)
+
+    def test_explain_review_matches_score(self):
+        review = "A good and amazing film. But a bad ending."
+        score, sentences, hits = self.processor.explain_review(review)
+        self.assertEqual(score, self.processor.score_review(review))
+        self.assertEqual([h[0] for h in hits], ["good", "amazing", "bad"])
+        for word, offset, _ in hits:
+            self.assertEqual(review[offset:offset + len(word)].lower(), word)
+
+    def test_store_round_trip(self):
+        store = ExplanationStore()
+        reviews = ["Good film.", "Nothing here.", "Terrible. Bad."]
+        for review_id, review in enumerate(reviews):
+            _, sentences, hits = self.processor.explain_review(review)
+            store.add(review_id, sentences, hits)
+
+        explained = store.explain(2)
+        self.assertEqual([c["term"] for c in explained["contributions"]], ["terrible", "bad"])
+        self.assertAlmostEqual(explained["score"], self.processor.score_review(reviews[2]))
+        self.assertAlmostEqual(sum(c["contribution"] for c in explained["contributions"]), explained["score"])
+        self.assertEqual(store.explain(1)["contributions"], [])
+
+        path = os.path.join(tempfile.mkdtemp(), "explanations.npz")
+        store.save(path)
+        loaded = ExplanationStore.load(path)
+        self.assertEqual(loaded.explain(2), explained)
+        os.remove(path)
+
+    def test_skipped_review_ids(self):
+        store = ExplanationStore()
+        store.add(2, 1, [("good", 0, 3)])
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.explain(0)["contributions"], [])
+        self.assertEqual(store.explain(2)["score"], 3.0)
+
+    def test_weights_beyond_a_byte(self):
+        store = ExplanationStore()
+        store.add(0, 1, [("masterpiece", 0, 300), ("disaster", 12, -300)])
+        self.assertEqual([c["weight"] for c in store.explain(0)["contributions"]], [300, -300])
+        restored = ExplanationStore.from_arrays(store.terms, **store.arrays())
+        restored.add(1, 1, [("masterpiece", 0, 200)])
+        self.assertEqual(restored.explain(1)["score"], 200.0)
+
+    def test_concurrent_add_and_explain(self):
+        """A review counted by len() can always be explained while others are being added."""
+        store = ExplanationStore()
+        errors, done = [], threading.Event()
+
+        def read():
+            while not done.is_set():
+                try:
+                    n = len(store)
+                    if n:
+                        store.explain(n - 1)
+                except Exception as e:
+                    errors.append(e)
+                    return
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        readers = [threading.Thread(target=read) for _ in range(3)]
+        try:
+            for t in readers:
+                t.start()
+            for review_id in range(0, 200000, 2):  # with skipped ids, so the padding loop runs too
+                store.add(review_id, 1, [("good", 0, 3)])
+        finally:
+            done.set()
+            for t in readers:
+                t.join()
+            sys.setswitchinterval(interval)
+        self.assertEqual(errors, [])
+
+    def test_highlight(self):
+        text = "good <b> bad"
+        contributions = [{"offset": 0, "length": 4, "weight": 3}, {"offset": 9, "length": 3, "weight": -2}]
+        self.assertEqual(highlight(text, contributions),
+                         '<mark data-weight="3">good</mark> &lt;b&gt; <mark data-weight="-2">bad</mark>')
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# to test: python -m unittest tests/explanations_test.py
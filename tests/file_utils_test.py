@@ -0,0 +1,61 @@
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from file_utils import UMASK, atomic_write, prefix_fingerprint
+
+
+class TestFileUtils(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "out.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def mode(self):
+        return stat.S_IMODE(os.stat(self.path).st_mode)
+
+    def test_new_file_gets_umask_permissions(self):
+        with atomic_write(self.path) as f:
+            f.write("{}")
+        self.assertEqual(self.mode(), 0o666 & ~UMASK)
+        self.assertEqual(os.listdir(self.temp_dir), ["out.json"])
+
+    def test_replaced_file_keeps_its_permissions(self):
+        with open(self.path, "w") as f:
+            f.write("old")
+        os.chmod(self.path, 0o640)
+        with atomic_write(self.path) as f:
+            f.write("new")
+        self.assertEqual(self.mode(), 0o640)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "new")
+
+    def test_failed_write_keeps_old_file(self):
+        with open(self.path, "w") as f:
+            f.write("old")
+        with self.assertRaises(RuntimeError):
+            with atomic_write(self.path) as f:
+                f.write("partial")
+                raise RuntimeError("boom")
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "old")
+        self.assertEqual(os.listdir(self.temp_dir), ["out.json"])
+
+    def test_prefix_fingerprint_survives_append(self):
+        with open(self.path, "wb") as f:
+            f.write(b"a,b\n1,2\n")
+        before = prefix_fingerprint(self.path, 8)
+        with open(self.path, "ab") as f:
+            f.write(b"3,4\n")
+        self.assertEqual(prefix_fingerprint(self.path, 8), before)
+        self.assertNotEqual(prefix_fingerprint(self.path, 12), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# to test: python -m unittest tests/file_utils_test.py
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from genre_stats import GenreSentiment
+from analytics import Analytics
+from text_processing import TextProcessor
+
+
+class TestGenreSentiment(unittest.TestCase):
+
+    def setUp(self):
+        self.df_scored = pd.DataFrame({
+            "Movie Title": ["A", "A", "B", "B", "C"],
+            "Genres": ["Drama, Comedy", "Drama, Comedy", "Drama", "Drama", "Horror"],
+            "Average Score": [1.0, 3.0, -1.0, -3.0, 2.0],
+        })
+        self.stats = GenreSentiment(min_reviews=2, top_n=1).build(self.df_scored)
+
+    def by_genre(self):
+        return {g["genre"]: g for g in self.stats.summary()}
+
+    def test_aggregates(self):
+        drama = self.by_genre()["Drama"]
+        self.assertEqual(drama["review_count"], 4)
+        self.assertAlmostEqual(drama["mean"], 0.0)
+        self.assertAlmostEqual(drama["std"], pd.Series([1.0, 3.0, -1.0, -3.0]).std(), places=4)
+        self.assertEqual(self.by_genre()["Comedy"]["review_count"], 2)
+
+    def test_top_and_bottom_movies(self):
+        drama = self.by_genre()["Drama"]
+        self.assertEqual(drama["top_movies"][0]["movie_title"], "A")
+        self.assertEqual(drama["bottom_movies"][0]["movie_title"], "B")
+        # C has a single review, below min_reviews
+        self.assertEqual(self.by_genre()["Horror"]["top_movies"], [])
+
+    def test_incremental_add_matches_rebuild(self):
+        self.stats.summary()  # fill the cache first, add() must invalidate it
+        self.stats.add("C", "Horror", 4.0)
+        extra = pd.DataFrame({"Movie Title": ["C"], "Genres": ["Horror"], "Average Score": [4.0]})
+        rebuilt = GenreSentiment(min_reviews=2, top_n=1).build(pd.concat([self.df_scored, extra]))
+        self.assertEqual(self.stats.summary(), rebuilt.summary())
+
+    def test_build_from_chunks(self):
+        chunks = (self.df_scored.iloc[i:i + 2] for i in range(0, len(self.df_scored), 2))
+        chunked = GenreSentiment(min_reviews=2, top_n=1).build(chunks)
+        self.assertEqual(chunked.summary(), self.stats.summary())
+
+
+class TestAnalytics(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dict = tempfile.NamedTemporaryFile(delete=False, mode="w", encoding="utf-8")
+        cls.temp_dict.write("good\t3\nbad\t-2\namazing\t4\nterrible\t-3\n")
+        cls.temp_dict.close()
+        cls.processor = TextProcessor(cls.temp_dict.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.temp_dict.name)
+
+    def test_add_reviews_updates_everything(self):
+        df = pd.DataFrame({
+            "movie_title": ["A", "B"],
+            "review_content": ["good and amazing", "bad"],
+            "genres": ["Drama", "Drama"],
+        })
+        analytics = Analytics(self.processor, min_reviews=1).build(df)
+        self.assertEqual(analytics.scores["Review ID"].tolist(), [0, 1])
+
+        new = pd.DataFrame({"movie_title": ["B"], "review_content": ["terrible"], "genres": ["Drama"]})
+        analytics.add_reviews(new, start_id=2)
+        self.assertEqual(len(analytics._pending_scores), 1)  # concatenated only when read
+
+        self.assertEqual(analytics.scores["Review ID"].tolist(), [0, 1, 2])
+        self.assertEqual(analytics._pending_scores, [])
+        self.assertEqual(analytics.leaderboard.worst(1)["Review Count"].iloc[0], 2)
+        self.assertEqual(analytics.genres.summary()[0]["review_count"], 3)
+        negative = analytics.term_counts.top_terms(["B"])["negative"]
+        self.assertEqual({t["term"] for t in negative}, {"bad", "terrible"})
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# to test: python -m unittest tests/genre_stats_test.py
@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+import pandas as pd
+from jobs import JobStore, JobWorkers, work, worker_name, QUEUED, RUNNING, DONE, FAILED
+
+
+class TestJobStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = JobStore(os.path.join(self.temp_dir, "jobs.sqlite3"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_coalesce_merges_queued_jobs(self):
+        first = self.store.enqueue("rescore", {"a": 1}, coalesce=True)
+        self.assertEqual(self.store.enqueue("rescore", {"a": 1}, coalesce=True), first)
+        self.assertNotEqual(self.store.enqueue("rescore", {"a": 2}, coalesce=True), first)
+        self.assertNotEqual(self.store.enqueue("rescore", {"a": 1}), first)
+
+    def test_claim_respects_delay_and_order(self):
+        later = self.store.enqueue("rescore", delay=60)
+        now = self.store.enqueue("partition")
+        job = self.store.claim("test")
+        self.assertEqual((job["id"], job["status"]), (now, RUNNING))
+        self.assertIsNone(self.store.claim("test"))
+        self.assertEqual(self.store.get(later)["status"], QUEUED)
+
+    def test_interrupted_jobs_fail(self):
+        """Only jobs whose worker process is gone are failed."""
+        finished = subprocess.Popen([sys.executable, "-c", "pass"])
+        finished.wait()
+        workers = [f"{os.uname().nodename}:{finished.pid}", worker_name(), "other-host:1", "test"]
+        job_ids = []
+        for worker in workers:
+            job_ids.append(self.store.enqueue("rescore"))
+            self.store.claim(worker)
+        self.assertEqual(self.store.fail_interrupted(), 2)
+        self.assertEqual([self.store.get(j)["status"] for j in job_ids], [FAILED, RUNNING, RUNNING, FAILED])
+
+    def test_persistent_across_instances(self):
+        job_id = self.store.enqueue("rescore", {"x": "y"})
+        reopened = JobStore(self.store.db_path)
+        self.assertEqual(reopened.get(job_id)["params"], {"x": "y"})
+
+
+class TestJobRuns(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = os.path.join(self.temp_dir, "jobs.sqlite3")
+        self.store = JobStore(self.db)
+        self.dict_path = os.path.join(self.temp_dir, "dict.txt")
+        with open(self.dict_path, "w", encoding="utf-8") as f:
+            f.write("good\t3\nbad\t-2\n")
+        self.csv = os.path.join(self.temp_dir, "reviews.csv")
+        pd.DataFrame({
+            "movie_title": ["A"] * 6 + ["B"] * 6,
+            "review_content": ["good"] * 6 + ["bad"] * 6,
+            "genres": ["Drama"] * 12,
+        }).to_csv(self.csv, index=False)
+        self.params = {
+            "csv_file": self.csv,
+            "dict_path": self.dict_path,
+            "scores_file": os.path.join(self.temp_dir, "scores.csv"),
+            "leaderboard_file": os.path.join(self.temp_dir, "board.json"),
+            "chunksize": 5,
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_rescore_job(self):
+        job_id = self.store.enqueue("rescore", self.params)
+        work(self.db, once=True)
+        job = self.store.get(job_id)
+        self.assertEqual(job["status"], DONE, job["error"])
+        self.assertEqual(job["progress"], 1.0)
+        self.assertEqual(job["result"]["reviews"], 12)
+        self.assertEqual(len(pd.read_csv(self.params["scores_file"])), 12)
+        with open(self.params["leaderboard_file"], encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["top_movies"][0], "A")
+
+    def test_failures_are_recorded(self):
+        bad = self.store.enqueue("rescore", dict(self.params, csv_file=os.path.join(self.temp_dir, "missing.csv")))
+        unknown = self.store.enqueue("no_such_kind")
+        work(self.db, once=True)
+        self.assertEqual(self.store.get(bad)["status"], FAILED)
+        self.assertIn("Unknown job kind", self.store.get(unknown)["error"])
+
+    def test_worker_processes(self):
+        workers = JobWorkers(self.db, workers=1, poll_interval=0.05)
+        try:
+            job_id = self.store.enqueue("rescore", self.params)
+            deadline = time.time() + 30
+            while self.store.get(job_id)["status"] in (QUEUED, RUNNING) and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            workers.stop()
+        self.assertEqual(self.store.get(job_id)["status"], DONE)
+        self.assertEqual(workers.alive(), 0)
+
+    def test_worker_exits_with_its_parent(self):
+        """A worker started for a process that has gone stops on its own."""
+        parent = subprocess.Popen([sys.executable, "-c", "pass"])
+        parent.wait()
+        worker = subprocess.Popen([sys.executable, "jobs.py", "--db", self.db, "worker",
+                                   "--poll-interval", "0.05", "--parent", str(parent.pid)])
+        try:
+            self.assertEqual(worker.wait(10), 0)
+        finally:
+            if worker.poll() is None:
+                worker.kill()
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# to test: python -m unittest tests/jobs_test.py
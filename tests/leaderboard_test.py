@@ -0,0 +1,91 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+import pandas as pd
+from leaderboard import Leaderboard
+from scoring_system import summarize_movies, export_top_worst_movies_to_json, score_corpus, iter_chunks
+from scoring_system import print_top_bottom_movies
+from text_processing import TextProcessor
+
+
+class TestLeaderboard(unittest.TestCase):
+
+    def setUp(self):
+        self.df_sentiment = pd.DataFrame({
+            "Movie Title": ["A", "A", "A", "B", "B", "B", "C", "D", "D", "D"],
+            "Average Score": [1.0, 2.0, 3.0, -1.0, -2.0, 0.0, 9.0, 0.5, 0.5, 0.5],
+        })
+        self.board = Leaderboard(min_reviews=3).add_scores(self.df_sentiment)
+
+    def test_min_reviews_threshold(self):
+        """C has one glowing review and must not be ranked."""
+        self.assertNotIn("C", self.board.top(10)["Movie Title"].tolist())
+        self.assertEqual(len(self.board), 3)
+
+    def test_top_and_worst_order(self):
+        self.assertEqual(self.board.top(3)["Movie Title"].tolist(), ["A", "D", "B"])
+        self.assertEqual(self.board.worst(2)["Movie Title"].tolist(), ["B", "D"])
+
+    def test_incremental_add_matches_rebuild(self):
+        """Adding reviews one at a time gives the same ranking as a full rebuild."""
+        self.board.add("C", 8.0)
+        self.board.add("C", 7.0)
+        self.board.add("A", -10.0)
+
+        extra = pd.DataFrame({"Movie Title": ["C", "C", "A"], "Average Score": [8.0, 7.0, -10.0]})
+        rebuilt = Leaderboard(min_reviews=3).add_scores(pd.concat([self.df_sentiment, extra]))
+        pd.testing.assert_frame_equal(self.board.top(10), rebuilt.top(10))
+        self.assertEqual(self.board.top(1)["Movie Title"].iloc[0], "C")
+
+    def test_chunked_pipeline_matches_whole_frame(self):
+        """Scoring a file chunk by chunk gives the same scores, IDs and ranking as scoring it at once.
+        IDs are row numbers, also after a row without text."""
+        temp_csv = tempfile.NamedTemporaryFile(delete=False, suffix=".csv", mode="w", encoding="utf-8")
+        pd.DataFrame({
+            "movie_title": ["A", "B", "A", "B", "A", "B", "A", "B"],
+            "review_content": ["Great fun.", "Awful. Boring.", None, "I love it", "Bad", "Good good", "Terrible",
+                               "Fine"],
+        }).to_csv(temp_csv.name, index=False)
+        temp_csv.close()
+        processor = TextProcessor("datas/AFINN-en-165.txt")
+
+        whole = score_corpus(pd.read_csv(temp_csv.name), processor)
+        chunked = score_corpus(processor.load_reviews(temp_csv.name, chunksize=3), processor)
+        board = Leaderboard(min_reviews=1).add_scores(
+            iter_chunks(score_corpus, processor.load_reviews(temp_csv.name, chunksize=2), processor)
+        )
+        os.remove(temp_csv.name)
+
+        pd.testing.assert_frame_equal(chunked, whole)
+        self.assertEqual(whole["Review ID"].tolist(), [0, 1, 3, 4, 5, 6, 7])
+        pd.testing.assert_frame_equal(board.top(2), Leaderboard(min_reviews=1).add_scores(whole).top(2))
+
+    def test_summarize_movies_min_reviews(self):
+        top, _ = summarize_movies(self.df_sentiment, top_n=1, min_reviews=3)
+        self.assertEqual(top["Movie Title"].iloc[0], "A")
+
+    def test_printed_ranking_uses_threshold(self):
+        """The console ranking leaves out the same movies as the leaderboard."""
+        out = io.StringIO()
+        with redirect_stdout(out):
+            print_top_bottom_movies(self.df_sentiment, top_n=1, min_reviews=self.board.min_reviews)
+        self.assertNotIn("C", out.getvalue().split())
+        self.assertIn("A", out.getvalue().split())
+
+    def test_export_json(self):
+        out = os.path.join(tempfile.mkdtemp(), "top_worst.json")
+        export_top_worst_movies_to_json(self.board.top(2), self.board.worst(2), output_file=out)
+        with open(out, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(data["top_movies"], ["A", "D"])
+        self.assertEqual(os.listdir(os.path.dirname(out)), ["top_worst.json"])  # no temp files left behind
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# to test: python -m unittest tests/leaderboard_test.py
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import time
+import unittest
+from lexicon import LexiconRegistry, load_compiled, CACHE_SUFFIX
+from text_processing import TextProcessor
+
+
+class TestLexiconRegistry(unittest.TestCase):
+
+    def setUp(self):
+        """Create a temporary dictionary file before each test."""
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "lexicon.txt")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("good\t3\nbad\t-2\n")
+        self.registry = LexiconRegistry()
+
+    def tearDown(self):
+        for name in os.listdir(self.dir):
+            os.remove(os.path.join(self.dir, name))
+        os.rmdir(self.dir)
+
+    def test_loaded_once_and_shared(self):
+        first = self.registry.get(self.path)
+        second = self.registry.get(self.path)
+        self.assertIs(first, second)
+        self.assertEqual(first, {"good": 3, "bad": -2})
+
+    def test_compiled_cache_written_and_used(self):
+        self.registry.get(self.path)
+        self.assertTrue(os.path.exists(self.path + CACHE_SUFFIX))
+        self.assertEqual(load_compiled(self.path), {"good": 3, "bad": -2})
+
+    def test_edited_file_is_reloaded(self):
+        self.registry.get(self.path)
+        time.sleep(0.01)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("good\t5\n")
+        os.utime(self.path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+        self.assertIsNone(load_compiled(self.path))  # stale cache is ignored
+        self.assertEqual(self.registry.get(self.path), {"good": 5})
+
+    def test_processors_share_dictionary(self):
+        self.assertIs(TextProcessor(self.path).sentiment_dict, TextProcessor(self.path).sentiment_dict)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# to test: python -m unittest tests/lexicon_test.py
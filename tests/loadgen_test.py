@@ -0,0 +1,49 @@
+import random
+import unittest
+from flask import Flask, jsonify
+from loadgen import parse_mix, build_request, inprocess_sender, run_load, summarize, compare_to_baseline
+
+
+class TestLoadgen(unittest.TestCase):
+
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("search=2, all_movies=1"), {"search": 2.0, "all_movies": 1.0})
+        with self.assertRaises(ValueError):
+            parse_mix("nope=1")
+
+    def test_build_request(self):
+        rng = random.Random(0)
+        method, path, body = build_request("add_review", rng, ["A", "B"])
+        self.assertEqual((method, path), ("POST", "/add_review"))
+        self.assertIn(body["movie_name"], ["A", "B"])
+        self.assertTrue(build_request("compare_movies", rng, ["A", "B"])[1].startswith("/compare_movies?movie1="))
+
+    def test_run_against_inprocess_app(self):
+        app = Flask(__name__)
+        app.add_url_rule("/all_movies", "all_movies", lambda: jsonify([]))
+        app.add_url_rule("/search", "search", lambda: ("", 500))
+
+        records = run_load(inprocess_sender(app), ["A", "B"], {"all_movies": 1, "search": 1},
+                           rate=200, duration=0.2, concurrency=4, seed=1)
+        self.assertEqual(len(records), 40)
+
+        summary = summarize(records)
+        self.assertEqual(summary["all_movies"]["errors"], 0)
+        self.assertEqual(summary["search"]["errors"], summary["search"]["count"])
+        self.assertLessEqual(summary["all_movies"]["p50_ms"], summary["all_movies"]["p99_ms"])
+
+    def test_compare_to_baseline(self):
+        baseline = {"search": {"p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0}}
+        current = {"search": {"p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 45.0},
+                   "all_movies": {"p50_ms": 1.0, "p95_ms": 1.0, "p99_ms": 1.0}}
+        comparison = compare_to_baseline(current, baseline, threshold=0.2)
+        self.assertEqual(comparison["search"]["p99_ms"], 0.5)
+        self.assertTrue(comparison["search"]["regressed"])
+        self.assertNotIn("all_movies", comparison)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# to test: python -m unittest tests/loadgen_test.py
@@ -79,6 +79,51 @@ class TestMovieComparison(unittest.TestCase):
         self.assertIn("Unknown 2", result)
         self.assertIn("error", result["Unknown 2"])
 
+    def test_review_chunks_accepted(self):
+        """An iterator of review chunks gives the same result as the file."""
+        chunks = pd.read_csv(self.temp_csv.name, chunksize=2)
+        streamed = compare_movies(self.temp_csv.name, "Movie A", "Movie B", dict_path=self.temp_dict.name,
+                                  df_reviews=chunks)
+        direct = compare_movies(self.temp_csv.name, "Movie A", "Movie B", dict_path=self.temp_dict.name)
+        self.assertEqual(streamed, direct)
+
+    def test_exact_mode_reported(self):
+        result = compare_movies(self.temp_csv.name, "Movie A", "Movie B", dict_path=self.temp_dict.name)
+        self.assertEqual(result["Movie A"]["mode"], "exact")
+
+    def test_approximate_mode_samples(self):
+        """With a sample smaller than the movie, only that many reviews are scored."""
+        result = compare_movies(
+            self.temp_csv.name,
+            "Movie A",
+            "Movie C",
+            dict_path=self.temp_dict.name,
+            approximate=True,
+            sample_size=1,
+            seed=0
+        )
+        self.assertEqual(result["Movie A"]["mode"], "approximate")
+        self.assertEqual(result["Movie A"]["sampled_count"], 1)
+        self.assertEqual(result["Movie A"]["review_count"], 2)
+        # Movie C has a single review, so its sample is the whole movie
+        self.assertEqual(result["Movie C"]["mode"], "exact")
+        self.assertEqual(result["Movie C"]["margin_of_error"], 0.0)
+
+    def test_approximate_refines_to_target(self):
+        """A zero target error keeps refining until every review is scored."""
+        exact = compare_movies(self.temp_csv.name, "Movie A", "Movie B", dict_path=self.temp_dict.name)
+        result = compare_movies(
+            self.temp_csv.name,
+            "Movie A",
+            "Movie B",
+            dict_path=self.temp_dict.name,
+            approximate=True,
+            sample_size=1,
+            target_error=0.0
+        )
+        self.assertEqual(result["Movie A"]["mode"], "exact")
+        self.assertAlmostEqual(result["Movie A"]["average_sentiment"], exact["Movie A"]["average_sentiment"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+import pandas as pd
+from movie_profiles import MovieProfiles
+
+
+class TestMovieProfiles(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        frames = []
+        # two liked and two disliked movies, with enough reviews to be suggested
+        for title, mean, genres in [("Liked 1", 4, "Comedy"), ("Liked 2", 4, "Comedy"),
+                                    ("Disliked 1", -4, "Horror"), ("Disliked 2", -4, "Horror, Comedy")]:
+            frames.append(pd.DataFrame({
+                "Movie Title": title, "Genres": genres, "Average Score": rng.normal(mean, 1, 50),
+            }))
+        frames.append(pd.DataFrame({"Movie Title": ["Tiny"], "Genres": ["Comedy"], "Average Score": [4.0]}))
+        self.df = pd.concat(frames, ignore_index=True)
+        self.profiles = MovieProfiles(min_reviews=5).add_scores(self.df)
+
+    def test_similar_ranks_alike_movies_first(self):
+        matches = self.profiles.similar("liked 1", k=3)
+        self.assertEqual(matches[0][0], "Liked 2")
+        self.assertEqual(matches[0][2], 50)
+        self.assertGreater(matches[0][1], matches[-1][1])
+        self.assertNotIn("Liked 1", [m[0] for m in matches])
+        self.assertNotIn("Tiny", [m[0] for m in matches])  # below min_reviews
+
+    def test_genre_scope(self):
+        matches = self.profiles.similar("Disliked 1", k=5, scope="genre")
+        self.assertEqual([m[0] for m in matches], ["Disliked 2"])
+        with self.assertRaises(ValueError):
+            self.profiles.similar("Disliked 1", scope="movie")
+        with self.assertRaises(KeyError):
+            self.profiles.similar("Nope")
+
+    def test_profile(self):
+        profile = self.profiles.profile("Disliked 2")
+        self.assertEqual(profile["review_count"], 50)
+        self.assertEqual(profile["genres"], ["Comedy", "Horror"])
+        self.assertGreater(profile["negative_share"], 0.9)
+
+    def test_incremental_matches_batch(self):
+        profiles = MovieProfiles(min_reviews=5).add_scores(self.df.iloc[:120])
+        profiles.similar("Liked 1")  # refresh, then update some rows
+        for title, genres, score in self.df.iloc[120:].itertuples(index=False):
+            profiles.add(title, genres, score)
+        for title in ["Liked 1", "Disliked 2"]:
+            expected = self.profiles.similar(title, k=4)
+            actual = profiles.similar(title, k=4)
+            self.assertEqual([m[0] for m in actual], [m[0] for m in expected])
+            np.testing.assert_allclose([m[1] for m in actual], [m[1] for m in expected], rtol=1e-5)
+
+    def test_many_movies_grow(self):
+        df = pd.DataFrame({
+            "Movie Title": [f"Movie {i % 300}" for i in range(3000)],
+            "Genres": "Drama",
+            "Average Score": np.random.default_rng(1).normal(0, 3, 3000),
+        })
+        profiles = MovieProfiles().add_scores(df)
+        self.assertEqual(len(profiles), 300)
+        self.assertEqual(len(profiles.similar("Movie 7", k=10)), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# to test: python -m unittest tests/movie_profiles_test.py
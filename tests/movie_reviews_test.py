@@ -0,0 +1,74 @@
+import random
+import unittest
+import pandas as pd
+from movie_reviews import MovieReviewIndex
+
+
+class TestMovieReviewIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.rows = [(i, rng.choice(["Movie A", "Movie B"]), rng.choice([-2.0, -0.5, 0.0, 1.0, 1.0, 3.5]))
+                     for i in range(200)]
+        self.index = MovieReviewIndex().add_scores(self.scores(self.rows[:150]))
+        self.index.add_scores(self.scores(self.rows[150:]))  # pending until the next query
+
+    @staticmethod
+    def scores(rows):
+        return pd.DataFrame(rows, columns=["Review ID", "Movie Title", "Average Score"])
+
+    def expected(self, title, descending, min_score=None, max_score=None):
+        rows = [(i, s) for i, t, s in self.rows if t == title
+                and (min_score is None or s >= min_score) and (max_score is None or s <= max_score)]
+        return sorted(rows, key=lambda r: (r[1], r[0]), reverse=descending)
+
+    def walk(self, title, **kwargs):
+        """All reviews by following the cursors page by page"""
+        seen, after = [], None
+        while True:
+            rows, total, after = self.index.page(title, after=after, limit=7, **kwargs)
+            seen.extend(rows)
+            if after is None:
+                return seen, total
+
+    def test_pages_follow_score_order(self):
+        for descending in (True, False):
+            seen, total = self.walk("Movie A", descending=descending)
+            self.assertEqual(seen, self.expected("Movie A", descending))
+            self.assertEqual(total, len(seen))
+
+    def test_score_range(self):
+        seen, total = self.walk("movie b", descending=False, min_score=-0.5, max_score=1.0)
+        self.assertEqual(seen, self.expected("Movie B", False, -0.5, 1.0))
+        self.assertEqual(total, len(seen))
+        self.assertEqual(self.index.page("Movie B", min_score=5), ([], 0, None))
+
+    def test_new_reviews_do_not_break_cursor(self):
+        first, _, after = self.index.page("Movie A", limit=5)
+        self.index.add_scores(self.scores([(500, "Movie A", 10.0), (501, "Movie A", -10.0)]))
+        rest, _, _ = self.index.page("Movie A", after=after, limit=1000)
+        self.assertEqual(rest[-1], (501, -10.0))  # lower than the cursor: still ahead
+        self.assertNotIn((500, 10.0), rest)  # higher than the cursor: already passed
+        self.assertEqual(len(first) + len(rest), len(self.expected("Movie A", True)) + 1)
+
+    def test_adds_touch_only_their_movie(self):
+        self.index.compact()
+        other = self.index._runs[self.index._movie_index["movie b"]]
+        self.index.add_scores(self.scores([(600, "Movie A", 1.0), (-1, "Movie A", 1.0), (601, "Movie A", -9.0)]))
+        self.index.compact()
+        self.assertIs(self.index._runs[self.index._movie_index["movie b"]], other)
+        self.rows += [(600, "Movie A", 1.0), (-1, "Movie A", 1.0), (601, "Movie A", -9.0)]
+        self.assertEqual(self.walk("Movie A", descending=False)[0], self.expected("Movie A", False))
+        self.assertEqual(len(self.index), 203)
+
+    def test_unknown_movie(self):
+        self.assertIsNone(self.index.find("Missing"))
+        with self.assertRaises(KeyError):
+            self.index.page("Missing")
+        self.assertEqual(self.index.find("  MOVIE a "), "Movie A")
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# to test: python -m unittest tests/movie_reviews_test.py
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from profiling import SamplingProfiler, profile_run, pop_profile_flags
+
+
+def busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(100))
+
+
+class TestProfiling(unittest.TestCase):
+
+    def test_pop_profile_flags(self):
+        self.assertEqual(pop_profile_flags(["A", "--profile", "B"]), (True, None, ["A", "B"]))
+        self.assertEqual(pop_profile_flags(["--profile-interval=2"]), (True, 2.0, []))
+        self.assertEqual(pop_profile_flags(["A"]), (False, None, ["A"]))
+
+    def test_samples_calling_thread(self):
+        profiler = SamplingProfiler(interval_ms=1).start()
+        busy_loop(0.1)
+        profiler.stop()
+        lines = profiler.folded()
+        self.assertTrue(lines)
+        self.assertTrue(any("busy_loop" in line for line in lines))
+        stack, count = lines[0].rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+
+    def test_wrap_follows_other_thread(self):
+        profiler = SamplingProfiler(interval_ms=1).start()
+        worker = threading.Thread(target=profiler.wrap(busy_loop), args=(0.1,), name="worker")
+        worker.start()
+        worker.join()
+        profiler.stop()
+        self.assertTrue(any(line.startswith("worker;") for line in profiler.folded()))
+
+    def test_profile_run_writes_file(self):
+        out_dir = tempfile.mkdtemp()
+        with profile_run("unit", interval_ms=1, out_dir=out_dir):
+            busy_loop(0.05)
+        files = os.listdir(out_dir)
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].startswith("unit-") and files[0].endswith(".folded"))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# to test: python -m unittest tests/profiling_test.py
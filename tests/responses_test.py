@@ -0,0 +1,100 @@
+import gzip
+import json
+import unittest
+import numpy as np
+from flask import Flask, jsonify
+from website import responses
+from website.responses import FastJSONProvider, compress_response, parse_fields, parse_page, paginate
+from website.responses import encode_cursor, decode_cursor
+
+
+def make_app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.after_request(compress_response)
+
+    @app.route("/numbers")
+    def numbers():
+        return jsonify({"count": np.int64(3), "mean": np.float32(0.5), "values": np.arange(3)})
+
+    @app.route("/big")
+    def big():
+        return jsonify({"items": ["review text"] * 500})
+
+    return app
+
+
+class TestFastJSON(unittest.TestCase):
+    def setUp(self):
+        self.client = make_app().test_client()
+
+    def test_numpy_values_serialised(self):
+        body = self.client.get("/numbers").get_json()
+        self.assertEqual(body, {"count": 3, "mean": 0.5, "values": [0, 1, 2]})
+
+    def test_output_is_compact(self):
+        text = self.client.get("/numbers").get_data(as_text=True)
+        self.assertNotIn(": ", text)
+        self.assertNotIn(", ", text)
+
+    def test_numpy_without_orjson(self):
+        original, responses.orjson = responses.orjson, None
+        try:
+            body = self.client.get("/numbers").get_json()
+        finally:
+            responses.orjson = original
+        self.assertEqual(body, {"count": 3, "mean": 0.5, "values": [0, 1, 2]})
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.client = make_app().test_client()
+
+    def test_gzip_when_accepted(self):
+        response = self.client.get("/big", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(len(json.loads(gzip.decompress(response.data))["items"]), 500)
+
+    def test_brotli_preferred_when_available(self):
+        response = self.client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+        expected = "br" if responses.brotli is not None else "gzip"
+        self.assertEqual(response.headers["Content-Encoding"], expected)
+
+    def test_small_or_unaccepted_bodies_untouched(self):
+        self.assertNotIn("Content-Encoding", self.client.get("/numbers", headers={"Accept-Encoding": "gzip"}).headers)
+        self.assertNotIn("Content-Encoding", self.client.get("/big").headers)
+
+
+class TestPagination(unittest.TestCase):
+    def test_parse_fields(self):
+        self.assertEqual(parse_fields("", ["a", "b"]), ["a", "b"])
+        self.assertEqual(parse_fields("b", ["a", "b"]), ["b"])
+        with self.assertRaises(ValueError):
+            parse_fields("c", ["a", "b"])
+
+    def test_parse_page(self):
+        self.assertEqual(parse_page({}, default_size=10), (1, 10))
+        self.assertEqual(parse_page({"page": "2", "page_size": "9999"}, max_size=500), (2, 500))
+        with self.assertRaises(ValueError):
+            parse_page({"page": "0"})
+
+    def test_paginate(self):
+        records = [{"a": i, "b": -i} for i in range(5)]
+        result = paginate(records, page=2, page_size=2, fields=["a"])
+        self.assertEqual(result["items"], [{"a": 2}, {"a": 3}])
+        self.assertEqual((result["total"], result["pages"]), (5, 3))
+
+    def test_cursor_round_trip(self):
+        token = encode_cursor((-1.25, 42))
+        self.assertNotIn("=", token)
+        self.assertEqual(decode_cursor(token, 2), (-1.25, 42))
+        for bad in ("not a cursor", encode_cursor((1,))):
+            with self.assertRaises(ValueError):
+                decode_cursor(bad, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# to test: python -m unittest tests/responses_test.py
@@ -0,0 +1,80 @@
+import unittest
+import numpy as np
+import pandas as pd
+from review_index import ReviewIndex, blocked_top_k
+from text_store import CompressedTextStore
+
+
+class TestReviewIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Build an index over a small sample of reviews."""
+        cls.df = pd.DataFrame({
+            "movie_title": ["Inception", "Inception", "Titanic", "Avatar", "Titanic"],
+            "review_content": [
+                "Amazing visuals and a clever dream story",
+                "Clever dream story with amazing visuals",
+                "A romantic and emotional masterpiece",
+                "Amazing visuals but a weak story",
+                "Emotional romantic story on a sinking ship",
+            ],
+            "genres": ["Action,Sci-Fi", "Action,Sci-Fi", "Romance,Drama", "Sci-Fi,Adventure", "Romance,Drama"],
+        })
+        cls.index = ReviewIndex(block_size=2).build(cls.df)
+
+    def test_most_similar_review_first(self):
+        """The reworded review of the same film should be the best match."""
+        matches = self.index.similar(0, k=3)
+        self.assertEqual(matches[0][0], 1)
+        self.assertGreater(matches[0][1], matches[1][1])
+
+    def test_query_review_excluded(self):
+        matches = self.index.similar(2, k=10)
+        self.assertNotIn(2, [rid for rid, _ in matches])
+
+    def test_scope_movie(self):
+        matches = self.index.similar(2, k=10, scope="movie")
+        self.assertEqual([rid for rid, _ in matches], [4])
+
+    def test_scope_genre(self):
+        """Avatar shares Sci-Fi with Inception but nothing with Titanic."""
+        matches = self.index.similar(3, k=10, scope="genre")
+        self.assertCountEqual([rid for rid, _ in matches], [0, 1])
+
+    def test_unknown_review_id(self):
+        with self.assertRaises(IndexError):
+            self.index.similar(99)
+
+    def test_added_reviews_are_found(self):
+        index = ReviewIndex(block_size=2, merge_every=2).build(self.df.iloc[:3])
+        index.add_reviews(self.df.iloc[3:4])
+        self.assertEqual(index.n_docs, 4)
+        self.assertEqual(index.review(3)["movie_title"], "Avatar")
+        self.assertIn(3, [rid for rid, _ in index.similar(0, k=3)])  # still pending, scanned directly
+        self.assertEqual(index.similar(3, k=1)[0][0], 0)
+        index.add_reviews(self.df.iloc[4:])  # reaches merge_every: postings rebuilt
+        self.assertEqual(len(index._added), 0)
+        self.assertEqual([rid for rid, _ in index.similar(2, k=10, scope="movie")], [4])
+        self.assertCountEqual([rid for rid, _ in index.similar(3, k=10, scope="genre")], [0, 1])
+
+    def test_shared_text_store(self):
+        texts = CompressedTextStore().extend(self.df["review_content"].iloc[:3])
+        index = ReviewIndex(block_size=2).build(self.df.iloc[:3], texts=texts)
+        self.assertIs(index.texts, texts)
+        texts.extend(self.df["review_content"].iloc[3:4])  # the owner adds the text, the index only the vector
+        index.add_reviews(self.df.iloc[3:4])
+        self.assertEqual(len(texts), 4)
+        self.assertEqual(index.review(3)["review_content"], self.df["review_content"].iloc[3])
+
+    def test_blocked_top_k_matches_full_sort(self):
+        scores = np.random.default_rng(0).random(1000)
+        top = blocked_top_k(scores, 7, block_size=64)
+        self.assertEqual(top.tolist(), np.argsort(-scores)[:7].tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# to test: python -m unittest tests/review_index_test.py
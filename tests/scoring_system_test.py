@@ -1,5 +1,7 @@
 import unittest
+import pandas as pd
 from text_processing import TextProcessor
+from scoring_system import score_corpus, score_lexicons, compare_lexicons
 
 
 class TestScoringSystem(unittest.TestCase):
@@ -41,5 +43,45 @@ class TestScoringSystem(unittest.TestCase):
         self.assertTrue(hasattr(self.scorer, "afinn"))
         self.assertIsInstance(self.scorer.afinn, dict)
         self.assertGreater(len(self.scorer.afinn), 0)
-        
+
+
+class TestMultipleLexicons(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.domain = {"love": 1, "boring": -5, "gripping": 4}
+        cls.processor = TextProcessor("datas/AFINN-en-165.txt",
+                                      lexicons={"afinn": "datas/AFINN-en-165.txt", "domain": cls.domain})
+        cls.reviews = pd.DataFrame({
+            "movie_title": ["A", "B", "C", None],
+            "review_content": ["I love it. Gripping and never boring!", "Terrible, boring film.", None, "Good"],
+        })
+
+    def test_columns_match_single_lexicon_scoring(self):
+        scores = score_lexicons(self.reviews, self.processor)
+        self.assertEqual(list(scores.columns), ["Review ID", "Movie Title", "afinn", "domain"])
+        baseline = score_corpus(self.reviews, self.processor)
+        self.assertEqual(scores["Review ID"].tolist(), baseline["Review ID"].tolist())
+        self.assertEqual(scores["afinn"].tolist(), baseline["Average Score"].tolist())
+        domain = TextProcessor()
+        domain.sentiment_dict = self.domain
+        expected = [domain.score_review(t) for t in self.reviews["review_content"][:2]]
+        self.assertEqual(scores["domain"].tolist(), expected)
+
+    def test_chunks_and_comparison(self):
+        chunks = [self.reviews.iloc[:1], self.reviews.iloc[1:]]
+        scores = score_lexicons(chunks, self.processor)
+        pd.testing.assert_frame_equal(scores, score_lexicons(self.reviews, self.processor))
+        summary = compare_lexicons(scores, self.processor.lexicon_names)
+        self.assertEqual(summary["Lexicon"].tolist(), ["afinn", "domain"])
+        self.assertEqual(summary["Sign Agreement"].iloc[0], 1.0)
+
+    def test_default_lexicon(self):
+        self.assertEqual(TextProcessor("datas/AFINN-en-165.txt").lexicon_names, ["default"])
+        self.assertEqual(TextProcessor().score_reviews_multi(["Good."]).shape, (1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
 # to test: python -m unittest tests/scoring_system_test.py   
\ No newline at end of file
@@ -2,7 +2,8 @@ import os
 import tempfile
 import unittest
 import pandas as pd
-from website.search import search_reviews  # adjust if your path differs
+from website.search import search_reviews, search_reviews_df, iter_snapshot_matches  # adjust if your path differs
+from dataset import DatasetStore
 
 
 class TestSearchReviews(unittest.TestCase):
@@ -58,5 +59,21 @@ class TestSearchReviews(unittest.TestCase):
         self.assertEqual(len(result), 4)
 
 
+    def test_snapshot_matches_agree_with_dataframe_search(self):
+        """Searching a snapshot block by block finds the same rows as searching its frame."""
+        rows = pd.read_csv(self.temp_csv.name)
+        rows = pd.concat([rows] * 30, ignore_index=True)
+        rows.loc[5, "review_content"] = None
+        rows.loc[77, "movie_title"] = None
+        path = os.path.join(tempfile.mkdtemp(), "reviews.csv")
+        rows.to_csv(path, index=False)
+        store = DatasetStore(path)
+        snapshot = store.current()
+        store.append([{"movie_title": "Avatar", "review_content": "Great again"}])  # after the snapshot
+        for keyword in ["great", "AVATAR", "dark", "aliens", "", "^the", "good|weak"]:
+            expected = search_reviews_df(snapshot.with_text(), keyword).index.tolist()
+            self.assertEqual(list(iter_snapshot_matches(snapshot, keyword)), expected, keyword)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from sharding import ShardCoordinator, partition_csv, shard_for, shard_path, REVIEW_ID
+from analytics import Analytics
+from movie_comparison import compare_movies
+from text_processing import TextProcessor
+from website.search import search_reviews_df
+
+
+class TestSharding(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.dict_path = os.path.join(cls.temp_dir, "dict.txt")
+        with open(cls.dict_path, "w", encoding="utf-8") as f:
+            f.write("good\t3\nbad\t-2\namazing\t4\nterrible\t-3\n")
+
+        titles = ["Movie A", "Movie B", "Movie C", "Movie D", "Movie E"]
+        texts = ["good and amazing", "bad story", "terrible, bad acting", "amazing good fun", "just good"]
+        cls.df = pd.DataFrame({
+            "movie_title": [titles[i % 5] for i in range(40)],
+            "review_content": [f"{texts[(i * 3) % 5]} number {i}" for i in range(40)],
+            "genres": ["Drama"] * 40,
+        })
+        cls.csv = os.path.join(cls.temp_dir, "reviews.csv")
+        cls.df.to_csv(cls.csv, index=False)
+
+        cls.shard_dir = os.path.join(cls.temp_dir, "shards")
+        cls.manifest = partition_csv(cls.csv, cls.shard_dir, n_shards=3, chunksize=7)
+        cls.coordinator = ShardCoordinator(cls.shard_dir, cls.dict_path, min_reviews=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.coordinator.close()
+        shutil.rmtree(cls.temp_dir)
+
+    def test_partition_keeps_movies_together(self):
+        self.assertEqual(sum(self.manifest["shard_reviews"]), 40)
+        for i in range(3):
+            shard = pd.read_csv(shard_path(self.shard_dir, i))
+            self.assertTrue(all(shard_for(t, 3) == i for t in shard["movie_title"]))
+            self.assertEqual(shard[REVIEW_ID].tolist(), sorted(shard[REVIEW_ID]))
+
+    def test_search_matches_single_node(self):
+        total, records = self.coordinator.search("good", limit=7)
+        expected = search_reviews_df(self.df, "good")
+        self.assertEqual(total, len(expected))
+        self.assertEqual([r[REVIEW_ID] for r in records], expected.index[:7].tolist())
+
+    def test_leaderboard_matches_single_node(self):
+        top, worst = self.coordinator.leaderboard(n=2)
+        board = Analytics(TextProcessor(self.dict_path), min_reviews=2).build(self.df).leaderboard
+        pd.testing.assert_frame_equal(top, board.top(2))
+        pd.testing.assert_frame_equal(worst, board.worst(2))
+
+    def test_compare_matches_single_node(self):
+        result = self.coordinator.compare("Movie A", "movie c")
+        expected = compare_movies(self.csv, "Movie A", "movie c", dict_path=self.dict_path, df_reviews=self.df)
+        self.assertEqual(result["Movie A"]["average_sentiment"], expected["Movie A"]["average_sentiment"])
+        self.assertEqual(result["movie c"]["review_count"], expected["movie c"]["review_count"])
+        self.assertIn("error", self.coordinator.compare("Nope", "Nope 2"))
+
+    def test_distribution_matches_single_node(self):
+        df = pd.concat([pd.read_csv(shard_path(self.shard_dir, i)) for i in range(3)])  # with added reviews
+        distributions = Analytics(TextProcessor(self.dict_path), min_reviews=2).build(df).distributions
+        name, sketch = self.coordinator.distribution(movie="movie b")
+        self.assertEqual(name, "Movie B")
+        self.assertEqual(sketch.summary(), distributions.movie("Movie B").summary())
+        name, sketch = self.coordinator.distribution(genre="drama")
+        self.assertEqual(name, "Drama")
+        expected = distributions.genre("Drama")
+        self.assertEqual(sketch.hist.tolist(), expected.hist.tolist())
+        self.assertEqual(sketch.count, expected.count)
+        self.assertIsNone(self.coordinator.distribution(movie="Nope"))
+
+    def test_added_reviews_are_searchable(self):
+        self.coordinator.add_reviews([{"movie_title": "Movie F", "review_content": "zebra crossing", "genres": "Drama"}])
+        total, records = self.coordinator.search("zebra")
+        self.assertEqual(total, 1)
+        self.assertGreaterEqual(records[0][REVIEW_ID], 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# to test: python -m unittest tests/sharding_test.py
@@ -0,0 +1,65 @@
+import threading
+import time
+import unittest
+from task_pool import BoundedExecutor, Overloaded, DeadlineExceeded
+
+
+class TestBoundedExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = BoundedExecutor(max_workers=1, max_queue=1)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_returns_result_and_records_stats(self):
+        self.assertEqual(self.pool.run("add", lambda a, b: a + b, 2, 3), 5)
+        stats = self.pool.snapshot_stats()["routes"]["add"]
+        self.assertEqual(stats["completed"], 1)
+        self.assertIsNotNone(stats["exec_ms"]["p50"])
+        self.assertEqual(self.pool.queue_depth(), 0)
+
+    def test_rejects_when_queue_full(self):
+        release = threading.Event()
+        blockers = [threading.Thread(target=self.pool.run, args=("slow", release.wait), kwargs={"timeout": 5})
+                    for _ in range(2)]
+        for t in blockers:
+            t.start()
+        time.sleep(0.1)  # one running, one queued
+
+        with self.assertRaises(Overloaded):
+            self.pool.run("slow", lambda: None)
+        release.set()
+        for t in blockers:
+            t.join()
+        self.assertEqual(self.pool.snapshot_stats()["routes"]["slow"]["rejected"], 1)
+
+    def test_deadline_exceeded(self):
+        with self.assertRaises(DeadlineExceeded):
+            self.pool.run("sleepy", time.sleep, 0.5, timeout=0.05)
+        self.assertEqual(self.pool.snapshot_stats()["routes"]["sleepy"]["timed_out"], 1)
+
+    def test_queued_task_dropped_after_deadline(self):
+        """A task whose deadline passes while it waits for a worker never runs."""
+        ran = []
+        blocker = threading.Thread(target=self.pool.run, args=("slow", time.sleep, 0.3), kwargs={"timeout": 5})
+        blocker.start()
+        time.sleep(0.05)
+        with self.assertRaises(DeadlineExceeded):
+            self.pool.run("late", ran.append, 1, timeout=0.05)
+        blocker.join()
+        time.sleep(0.05)
+        self.assertEqual(ran, [])
+        self.assertEqual(self.pool.queue_depth(), 0)
+
+    def test_errors_propagate(self):
+        with self.assertRaises(ZeroDivisionError):
+            self.pool.run("boom", lambda: 1 / 0)
+        self.assertEqual(self.pool.snapshot_stats()["routes"]["boom"]["failed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+# to test: python -m unittest tests/task_pool_test.py
@@ -0,0 +1,80 @@
+import sys
+import threading
+import unittest
+from collections import Counter
+import numpy as np
+from term_stats import MovieTermCounts
+
+LEXICON = {"good": 3, "great": 3, "fun": 4, "bad": -3, "boring": -2, "dull": -2}
+
+
+class TestMovieTermCounts(unittest.TestCase):
+
+    def setUp(self):
+        self.reviews = [
+            ("A", ["good", "fun", "good"]),
+            ("B", ["bad", "boring", "good"]),
+            ("A", ["great", "unknown"]),
+            ("C", ["dull", "dull", "bad"]),
+            ("B", ["boring"]),
+        ]
+        self.counts = MovieTermCounts(LEXICON, compact_every=4)
+        for title, words in self.reviews:
+            self.counts.add(title, words)
+
+    def expected(self, titles):
+        counter = Counter(w for t, words in self.reviews if t in titles for w in words if w in LEXICON)
+        return np.array([counter[t] for t in self.counts.terms])
+
+    def test_counts_match_naive(self):
+        for titles in (["A"], ["B"], ["A", "C"], ["A", "B", "C"], ["missing"]):
+            np.testing.assert_array_equal(self.counts.counts(titles), self.expected(titles))
+
+    def test_compaction_keeps_counts(self):
+        before = self.counts.counts(["A", "B", "C"])
+        self.counts.compact()
+        self.assertEqual(len(self.counts._pending_rows), 0)
+        np.testing.assert_array_equal(self.counts.counts(["A", "B", "C"]), before)
+        self.assertEqual(self.counts.indptr[-1], len(self.counts.data))
+
+    def test_top_terms(self):
+        top = self.counts.top_terms(["A", "B"], k=2)
+        self.assertEqual([t["term"] for t in top["positive"]], ["good", "fun"])
+        self.assertEqual(top["positive"][0]["count"], 3)
+        self.assertEqual([t["term"] for t in top["negative"]], ["boring", "bad"])
+
+    def test_updates_after_add(self):
+        self.counts.add("C", ["fun"] * 5)
+        self.assertEqual(self.counts.top_terms(["C"], k=1)["positive"][0], {"term": "fun", "count": 5, "weight": 4})
+
+    def test_concurrent_add_and_counts(self):
+        counts = MovieTermCounts(LEXICON, compact_every=1500)
+        errors = []
+
+        def read():
+            try:
+                for _ in range(300):
+                    counts.counts(["A", "B"])
+            except Exception as e:
+                errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # switch threads often enough to hit the race without the lock
+        try:
+            readers = [threading.Thread(target=read) for _ in range(3)]
+            for t in readers:
+                t.start()
+            for i in range(2000):
+                counts.add("AB"[i % 2], ["good", "bad"])
+            for t in readers:
+                t.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(errors, [])
+        self.assertEqual(counts.counts(["A", "B"]).sum(), 4000)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# to test: python -m unittest tests/term_stats_test.py
@@ -80,6 +80,40 @@ class TestTextProcessing(unittest.TestCase):
         self.assertTrue("movie_title" in result[0])
         self.assertTrue("review_content" in result[0])
 
+    def test_load_reviews_iterator(self):
+        """Iterator mode yields projected chunks and stops after n rows."""
+        temp_csv = tempfile.NamedTemporaryFile(delete=False, suffix=".csv", mode="w", encoding="utf-8")
+        pd.DataFrame({
+            "movie_title": [f"M{i}" for i in range(10)],
+            "review_content": ["Good movie", None] * 5,
+            "genres": ["Drama"] * 10,
+        }).to_csv(temp_csv.name, index=False)
+        temp_csv.close()
+
+        chunks = list(self.processor.load_reviews(temp_csv.name, n=3, chunksize=2))
+        head = self.processor.load_reviews(temp_csv.name, n=3, return_df=True)
+        os.remove(temp_csv.name)
+
+        self.assertEqual([len(c) for c in chunks], [1, 1, 1])
+        self.assertEqual(list(chunks[0].columns), ["movie_title", "review_content"])
+        self.assertEqual([i for c in chunks for i in c.index], [0, 2, 4])  # rows without text dropped
+        self.assertEqual(head.index.tolist(), [0, 2, 4])
+        self.assertIn("genres", head.columns)
+
+    def test_load_reviews_n_without_text(self):
+        """With n set and no row having text, an empty frame comes back instead of an error."""
+        temp_csv = tempfile.NamedTemporaryFile(delete=False, suffix=".csv", mode="w", encoding="utf-8")
+        pd.DataFrame({"movie_title": ["M1", "M2"], "review_content": [None, None]}).to_csv(temp_csv.name, index=False)
+        temp_csv.close()
+
+        head = self.processor.load_reviews(temp_csv.name, n=5, return_df=True)
+        records = self.processor.load_reviews(temp_csv.name, n=5)
+        os.remove(temp_csv.name)
+
+        self.assertTrue(head.empty)
+        self.assertEqual(list(head.columns), ["movie_title", "review_content"])
+        self.assertEqual(records, [])
+
     def test_process_reviews(self):
         reviews = [
             {"movie_title": "Movie 1", "review_content": "Good and amazing film"},
@@ -0,0 +1,57 @@
+import random
+import unittest
+import zlib
+from text_store import CompressedTextStore, ZlibCodec, build_dictionary
+
+
+class TestCompressedTextStore(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(3)
+        words = ["the", "movie", "was", "great", "boring", "acting", "plot", "é", "film", "and"]
+        self.texts = [" ".join(rng.choice(words) for _ in range(rng.randint(0, 40))) for _ in range(250)]
+        self.store = CompressedTextStore(block_size=16, cache_blocks=2).extend(self.texts[:200])
+
+    def test_random_access(self):
+        for i in random.Random(5).sample(range(200), 60):
+            self.assertEqual(self.store.get(i), self.texts[i])
+        self.assertEqual(self.store.get_many([7, 3, 7, 199]), [self.texts[i] for i in (7, 3, 7, 199)])
+        with self.assertRaises(IndexError):
+            self.store.get(200)
+        with self.assertRaises(IndexError):
+            self.store.get(-1)
+
+    def test_appends_fill_blocks(self):
+        for text in self.texts[200:]:
+            self.store.extend([text])
+        self.assertEqual(len(self.store), 250)
+        self.assertEqual(len(self.store._tail), 250 % 16)
+        self.assertEqual([self.store.get(i) for i in range(250)], self.texts)
+
+    def test_iter_blocks(self):
+        self.store.extend(self.texts[200:205])  # a partly filled last block
+        blocks = list(self.store.iter_blocks())
+        self.assertEqual([first for first, _ in blocks], list(range(0, 205, 16)))
+        self.assertEqual([t for _, texts in blocks for t in texts], self.texts[:205])
+        self.assertEqual(len(self.store._cache), 0)  # scans do not evict cached blocks
+
+    def test_missing_texts_become_empty(self):
+        store = CompressedTextStore().extend(["good", None, float("nan")])
+        self.assertEqual(store.get_many([0, 1, 2]), ["good", "", ""])
+
+    def test_smaller_than_raw(self):
+        raw = sum(len(t.encode("utf-8")) for t in self.texts[:200])
+        self.assertLess(self.store.nbytes, raw)
+
+    def test_dictionary_helps_small_blocks(self):
+        codec = ZlibCodec(self.texts)
+        self.assertLessEqual(len(build_dictionary(self.texts, size=100)), 100)
+        sample = self.texts[0].encode("utf-8")
+        self.assertLess(len(codec.compress(sample)), len(zlib.compress(sample, 6)))
+        self.assertEqual(codec.decompress(codec.compress(sample)), sample)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# to test: python -m unittest tests/text_store_test.py
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from dataset import DatasetStore
+from movie_comparison import compare_movies
+from title_offsets import TitleOffsetIndex, index_path, open_index, update_index
+
+
+class TestTitleOffsetIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv = os.path.join(self.temp_dir, "reviews.csv")
+        self.dict_path = os.path.join(self.temp_dir, "lexicon.txt")
+        with open(self.dict_path, "w", encoding="utf-8") as f:
+            f.write("good\t3\nbad\t-2\n")
+        self.df = pd.DataFrame({
+            "movie_title": ["Movie A", "Movie A", "Movie B", "movie  a", "Movie C"],
+            "review_content": ["good", 'a "quoted"\nmultiline, review', "bad", "good again", "fine"],
+            "genres": ["Drama", "Drama", "Comedy", "Drama", None],
+        })
+        self.df.to_csv(self.csv, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_ranges_read_only_that_movie(self):
+        index = update_index(self.csv)
+        self.assertEqual(index.rows, 5)
+        self.assertEqual(len(index.ranges("Movie A")), 2)  # first two rows share a range
+        rows = index.read(self.csv, ["MOVIE A"])
+        self.assertEqual(rows["review_content"].tolist(), ["good", 'a "quoted"\nmultiline, review', "good again"])
+        self.assertTrue(index.read(self.csv, ["missing"]).empty)
+
+    def test_append_extends_and_rewrite_rebuilds(self):
+        update_index(self.csv)
+        store = DatasetStore(self.csv)
+        store.append([{"movie_title": "Movie B", "review_content": "good now", "genres": "Comedy"}])
+        index = TitleOffsetIndex.load(index_path(self.csv))
+        self.assertEqual(index.rows, 6)
+        self.assertEqual(index.read(self.csv, ["movie b"])["review_content"].tolist(), ["bad", "good now"])
+
+        self.df.iloc[2:].to_csv(self.csv, index=False)
+        index = open_index(self.csv)
+        self.assertEqual(index.rows, 3)
+        self.assertEqual(len(index.ranges("Movie A")), 1)
+
+    def test_unfinished_row_waits(self):
+        with open(self.csv, "a", encoding="utf-8") as f:
+            f.write('Movie C,"half')
+        index = update_index(self.csv)
+        self.assertEqual(index.rows, 5)
+        with open(self.csv, "a", encoding="utf-8") as f:
+            f.write(' written",\n')
+        index = update_index(self.csv)
+        self.assertEqual(index.read(self.csv, ["Movie C"])["review_content"].tolist(), ["fine", "half written"])
+
+    def test_compare_movies_uses_index(self):
+        streamed = compare_movies(self.csv, "Movie A", "Movie B", dict_path=self.dict_path)
+        update_index(self.csv)
+        indexed = compare_movies(self.csv, "Movie A", "Movie B", dict_path=self.dict_path)
+        self.assertEqual(indexed, streamed)
+        missing = compare_movies(self.csv, "Nothing", "Else", dict_path=self.dict_path)
+        self.assertEqual(missing["error"], "No reviews found for the given movies.")
+
+    def test_compare_movies_with_held_index(self):
+        """An index passed in is used as it is: the sidecar file is neither read nor written."""
+        index = TitleOffsetIndex()
+        index.update(self.csv)
+        streamed = compare_movies(self.csv, "Movie A", "Movie B", dict_path=self.dict_path)
+        self.assertEqual(compare_movies(self.csv, "Movie A", "Movie B", dict_path=self.dict_path,
+                                        title_index=index), streamed)
+        self.assertFalse(os.path.exists(index_path(self.csv)))
+        missing = compare_movies(self.csv, "Nothing", "Else", dict_path=self.dict_path, title_index=index)
+        self.assertIn("movie a", missing["debug"]["available_titles_sample"])
+
+    def test_no_index(self):
+        self.assertIsNone(open_index(self.csv))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# to test: python -m unittest tests/title_offsets_test.py
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from analytics import Analytics
+from text_processing import TextProcessor
+from warm_start import load_analytics, save_analytics
+
+
+class TestWarmStart(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.dict_path = os.path.join(self.temp_dir, "lexicon.txt")
+        self.csv = os.path.join(self.temp_dir, "reviews.csv")
+        self.snapshot = os.path.join(self.temp_dir, "analytics.snapshot")
+        with open(self.dict_path, "w", encoding="utf-8") as f:
+            f.write("good\t3\nbad\t-2\namazing\t4\nterrible\t-3\n")
+        self.processor = TextProcessor(self.dict_path)
+        pd.DataFrame({
+            "movie_title": ["A", "B", "A", "C"],
+            "review_content": ["good and amazing. Really good", "bad", "terrible start, good end", "nothing"],
+            "genres": ["Drama", "Comedy, Drama", "Drama", None],
+        }).to_csv(self.csv, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def build_and_save(self):
+        df = pd.read_csv(self.csv)
+        built = Analytics(self.processor, min_reviews=1).build(df)
+        save_analytics(self.snapshot, built, self.csv, os.path.getsize(self.csv), self.dict_path)
+        return built
+
+    def load(self):
+        return load_analytics(self.snapshot, self.processor, self.csv, self.dict_path, min_reviews=1)
+
+    def test_round_trip(self):
+        built = self.build_and_save()
+        restored, covered = self.load()
+        self.assertEqual(covered, 4)
+        pd.testing.assert_frame_equal(restored.scores, built.scores, check_dtype=False)
+        pd.testing.assert_frame_equal(restored.leaderboard.top(3), built.leaderboard.top(3))
+        self.assertEqual(restored.genres.summary(), built.genres.summary())
+        for review_id in range(4):
+            self.assertEqual(restored.explanations.explain(review_id), built.explanations.explain(review_id))
+        self.assertEqual(restored.term_counts.top_terms(["A"]), built.term_counts.top_terms(["A"]))
+
+    def test_restored_state_accepts_new_reviews(self):
+        self.build_and_save()
+        with open(self.csv, "a", encoding="utf-8") as f:
+            f.write("B,terrible and bad,Comedy\n")
+        restored, covered = self.load()  # an append keeps the snapshot valid
+        df = pd.read_csv(self.csv)
+        restored.add_reviews(df.iloc[covered:], start_id=covered)
+
+        rebuilt = Analytics(self.processor, min_reviews=1).build(df)
+        pd.testing.assert_frame_equal(restored.scores, rebuilt.scores, check_dtype=False)
+        self.assertEqual(restored.explanations.explain(4), rebuilt.explanations.explain(4))
+        self.assertEqual(restored.term_counts.top_terms(["B"]), rebuilt.term_counts.top_terms(["B"]))
+
+    def test_invalidated_by_source_changes(self):
+        self.build_and_save()
+        with open(self.dict_path, "a", encoding="utf-8") as f:
+            f.write("dull\t-2\n")
+        self.assertIsNone(self.load())
+
+        self.build_and_save()
+        pd.DataFrame({"movie_title": ["A"], "review_content": ["good"], "genres": ["Drama"]}).to_csv(
+            self.csv, index=False)
+        self.assertIsNone(self.load())
+
+    def test_missing_or_corrupt_file(self):
+        self.assertIsNone(self.load())
+        with open(self.snapshot, "wb") as f:
+            f.write(b"not a snapshot")
+        self.assertIsNone(self.load())
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# to test: python -m unittest tests/warm_start_test.py
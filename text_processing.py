@@ -1,7 +1,9 @@
 import re  # for cleaning text
+import numpy as np
 import pandas as pd  # reading CSV files
 import nltk
 from nltk.tokenize import sent_tokenize
+from lexicon import registry, parse_lexicon_file
 
 nltk.download("punkt", quiet=True)  # for sentence splitting
 
@@ -10,30 +12,63 @@ Handling text processing and sentiment scoring
 """
 
 
+def _usecols(columns):
+    """pandas usecols that skips requested columns the file does not have"""
+    if columns is None or callable(columns):
+        return columns
+    return set(columns).__contains__
+
+
 class TextProcessor:
-    def __init__(self, dict_path=None):
+    def __init__(self, dict_path=None, lexicons=None):
         """
         Initialise processor
         dict_path: path to AFINN sentiment dictionary
+        lexicons: optional {name: path or {word: score}} of lexicons to compare with
+            score_reviews_multi (default: the dict_path dictionary, named "default")
+        Dictionaries are loaded once per process and shared by all processors.
         """
         if dict_path:
-            self.sentiment_dict = self.load_dict(dict_path)
+            self.sentiment_dict = registry.get(dict_path)
         else:
             self.sentiment_dict = {}  # empty dict if no path provided
             
         self.afinn = self.sentiment_dict
-        
+
+        self.lexicons = {}
+        self._term_table = None
+        if lexicons is None and dict_path:
+            lexicons = {"default": self.sentiment_dict}
+        for name, lexicon in (lexicons or {}).items():
+            self.add_lexicon(name, lexicon)
+
+    def add_lexicon(self, name, lexicon):
+        """Add (or replace) a named lexicon for score_reviews_multi; lexicon is a file path or {word: score}"""
+        self.lexicons[name] = registry.get(lexicon) if isinstance(lexicon, str) else lexicon
+        self._term_table = None
+
+    @property
+    def lexicon_names(self):
+        return list(self.lexicons)
+
+    def term_table(self):
+        """
+        All lexicons merged into one lookup: ({word: row}, weights), where weights[row, j]
+        is the word's score in the j-th lexicon (0 when that lexicon does not have it)
+        """
+        table = self._term_table
+        if table is None:
+            words = sorted(set().union(*self.lexicons.values()))
+            rows = {w: i for i, w in enumerate(words)}
+            weights = np.zeros((len(words), len(self.lexicons)))
+            for j, lexicon in enumerate(self.lexicons.values()):
+                weights[[rows[w] for w in lexicon], j] = list(lexicon.values())
+            table = self._term_table = (rows, weights)
+        return table
+
     def load_dict(self, filepath):
         """Load dictionary into Python dict {word: score}"""
-        afinn = {}
-        with open(filepath, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                word, score = line.split("\t")
-                afinn[word] = int(score)
-        return afinn
+        return parse_lexicon_file(filepath)
 
     def load_reviews(
         self,
@@ -41,24 +76,73 @@ class TextProcessor:
         title_column="movie_title",
         text_column="review_content",
         n=None,
-        return_df=False
+        return_df=False,
+        chunksize=None,
+        columns=None
     ):
         """
         Load reviews and movie titles from CSV
         title_column: column containing movie titles
         text_column: column containing review text
-        n: number of rows to load for testing
+        n: number of rows to load for testing (reading stops once n rows are found)
         return_df: if True, return DataFrame instead of list of dicts
+        chunksize: if set, return an iterator of DataFrames of up to chunksize rows (see iter_reviews)
+        columns: columns to read (default: all, or only title and text columns in iterator mode)
         """
-        df = pd.read_csv(filepath, low_memory=False)
-        df = df.dropna(subset=[text_column])  # remove empty rows
+        if chunksize:
+            return self.iter_reviews(filepath, title_column, text_column, n=n, chunksize=chunksize, columns=columns)
+
         if n:
-            df = df.head(n)  # take only first n rows
+            columns = columns if columns is not None else (lambda column: True)
+            chunks = list(self.iter_reviews(filepath, title_column, text_column, n=n, chunksize=max(n, 1000),
+                                            columns=columns))
+            # no row has text: an empty frame with the file's columns, as without n
+            df = pd.concat(chunks) if chunks else pd.read_csv(filepath, nrows=0, usecols=_usecols(columns))
+        else:
+            df = pd.read_csv(filepath, low_memory=False, usecols=_usecols(columns))
+            df = df.dropna(subset=[text_column])  # remove empty rows
 
         if return_df:
             return df
         return df[[title_column, text_column]].to_dict("records")
 
+    def iter_reviews(
+        self,
+        filepath,
+        title_column="movie_title",
+        text_column="review_content",
+        n=None,
+        chunksize=10000,
+        columns=None
+    ):
+        """
+        Read reviews from CSV in chunks, so any file size fits in constant memory
+        Yields DataFrames of up to chunksize rows with only the requested columns
+        (default: title and text). Title and text are read as strings; rows without
+        text are dropped and the index keeps the row number in the file.
+        n: stop reading once n rows have been yielded
+        columns: list of column names (missing ones are skipped) or a pandas usecols callable
+        """
+        if columns is None:
+            columns = [title_column, text_column]
+        reader = pd.read_csv(
+            filepath,
+            usecols=_usecols(columns),
+            dtype={title_column: str, text_column: str},
+            chunksize=chunksize,
+        )
+        remaining = n
+        with reader:
+            for chunk in reader:
+                chunk = chunk.dropna(subset=[text_column])  # remove empty rows
+                if remaining is not None:
+                    chunk = chunk.head(remaining)
+                    remaining -= len(chunk)
+                if len(chunk):
+                    yield chunk
+                if remaining is not None and remaining <= 0:
+                    break
+
     def preprocess_text(self, text):
         """Clean and normalise text"""
         text = re.sub(r"<[^>]+>", " ", text)  # remove HTML tags
@@ -70,6 +154,12 @@ class TextProcessor:
         """Split text into sentences using nltk"""
         return sent_tokenize(text)
 
+    def tokenize(self, text):
+        """Split text into lowercase word tokens (same rule used for scoring)"""
+        if not isinstance(text, str):
+            return []
+        return re.findall(r"\w+", text.lower())
+
     # def score_sentence(self, sentence):
     #     """Score a single sentence using the sentiment dictionary"""
     #     words = re.findall(r"\w+", sentence.lower())  # convert to lowercase
@@ -84,7 +174,7 @@ class TextProcessor:
         if not isinstance(sentence, str):
             return 0  # Handle None or non-string input safely
 
-        words = re.findall(r"\w+", sentence.lower())
+        words = self.tokenize(sentence)
         score = 0
         for w in words:
             if w in self.sentiment_dict:
@@ -106,6 +196,55 @@ class TextProcessor:
         return float(sum(scores)) / len(sentences)
 
 
+    def explain_review(self, review):
+        """
+        Score a review and record which words produced the score
+        Returns (score, sentence count, hits) where hits is a list of
+        (word, character offset in review, weight); score equals score_review(review)
+        """
+        sentences = self.split_sentences(review)
+        if not sentences:
+            return 0.0, 0, []
+        hits, total, cursor = [], 0, 0
+        for sentence in sentences:
+            start = review.find(sentence, cursor)  # sentences are substrings of the review
+            if start >= 0:
+                cursor = start + len(sentence)
+            for m in re.finditer(r"\w+", sentence.lower()):
+                weight = self.sentiment_dict.get(m.group())
+                if weight:
+                    hits.append((m.group(), start + m.start() if start >= 0 else -1, weight))
+                    total += weight
+        return float(total) / len(sentences), len(sentences), hits
+
+    def score_reviews_multi(self, reviews):
+        """
+        Score reviews against every named lexicon with one tokenization pass
+        reviews: iterable of (preprocessed) review texts
+        Returns an array of shape (number of reviews, number of lexicons); column j is
+        what score_review gives with the j-th lexicon as sentiment_dict.
+        """
+        rows, weights = self.term_table()
+        hit_rows, owners, sentence_counts = [], [], []
+        for i, review in enumerate(reviews):
+            sentences = self.split_sentences(review)
+            sentence_counts.append(len(sentences))
+            for sentence in sentences:
+                for w in self.tokenize(sentence):
+                    row = rows.get(w)  # one lookup serves every lexicon
+                    if row is not None:
+                        hit_rows.append(row)
+                        owners.append(i)
+
+        n = len(sentence_counts)
+        totals = np.zeros((n, weights.shape[1]))
+        if hit_rows:
+            hits = weights[hit_rows]
+            for j in range(weights.shape[1]):
+                totals[:, j] = np.bincount(owners, weights=hits[:, j], minlength=n)
+        counts = np.array(sentence_counts, dtype=np.float64)[:, None]
+        return np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+
     def process_reviews(self, reviews, title_column="movie_title", text_column="review_content"):
         """
         Process a list of reviews
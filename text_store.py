@@ -0,0 +1,158 @@
+from array import array
+from collections import Counter, OrderedDict
+import re
+import threading
+import zlib
+
+"""
+Compressed review texts with random access by review id
+
+Texts are packed into blocks of block_size consecutive reviews and each block
+is compressed on its own, with a dictionary built from a sample of the texts
+so that even small blocks compress well. An offset index (where each block
+starts in the compressed buffer and where each text ends inside its block)
+gives random access: reading one review decompresses one block, and a small
+cache keeps recently used blocks. Blocks are zlib streams with a preset
+dictionary.
+"""
+
+BLOCK_SIZE = 32
+DICT_SIZE = 32 * 1024  # zlib only uses the last 32 KiB of a preset dictionary
+SAMPLE_SIZE = 2000  # texts used to build the dictionary
+
+
+def sample_texts(texts, n=SAMPLE_SIZE):
+    """Up to n texts spread evenly over texts"""
+    step = max(1, len(texts) // n)
+    return texts[::step][:n]
+
+
+def build_dictionary(samples, size=DICT_SIZE):
+    """
+    Raw preset dictionary of the most common words and punctuation in samples
+    The most common ones come last, closest to the data, where they are cheapest to reference.
+    """
+    counts = Counter(w for text in samples for w in re.findall(r"\w+|[^\w\s]+", text))
+    pieces, total = [], 0
+    for word, _ in counts.most_common():
+        piece = (" " + word).encode("utf-8")
+        if total + len(piece) > size:
+            break
+        pieces.append(piece)
+        total += len(piece)
+    return b"".join(reversed(pieces))
+
+
+class ZlibCodec:
+    name = "zlib"
+
+    def __init__(self, samples, level=6):
+        self.level = level
+        self.dictionary = build_dictionary(samples)
+
+    def compress(self, data):
+        c = zlib.compressobj(self.level, zdict=self.dictionary) if self.dictionary else zlib.compressobj(self.level)
+        return c.compress(data) + c.flush()
+
+    def decompress(self, data):
+        d = zlib.decompressobj(zdict=self.dictionary) if self.dictionary else zlib.decompressobj()
+        return d.decompress(data) + d.flush()
+
+
+class CompressedTextStore:
+    def __init__(self, block_size=BLOCK_SIZE, level=6, cache_blocks=16):
+        """
+        Initialise an empty store
+        block_size: texts per compressed block (larger compresses better, smaller reads faster)
+        level: compression level
+        cache_blocks: decompressed blocks kept for repeated reads
+        """
+        self.block_size = block_size
+        self.level = level
+        self.codec = None  # built from the first texts added
+        self._data = bytearray()  # compressed blocks, back to back
+        self._block_starts = array("q", [0])  # block b is _data[_block_starts[b]:_block_starts[b + 1]]
+        self._ends = array("I")  # end of each text inside its decompressed block
+        self._tail = []  # texts of the last block until it is full
+        self._cache = OrderedDict()
+        self._cache_blocks = cache_blocks
+        self._lock = threading.Lock()
+
+    def extend(self, texts):
+        """Append texts (strings; None and NaN are stored as ""); the first call also builds the dictionary"""
+        texts = [t if isinstance(t, str) else "" for t in texts]
+        with self._lock:
+            if self.codec is None:
+                self.codec = ZlibCodec(sample_texts(texts), self.level)
+            pending = self._tail + texts
+            full = len(pending) - len(pending) % self.block_size
+            for start in range(0, full, self.block_size):
+                self._flush(pending[start:start + self.block_size])
+            self._tail = pending[full:]
+        return self
+
+    def _flush(self, texts):
+        encoded = [t.encode("utf-8") for t in texts]
+        end = 0
+        for e in encoded:
+            end += len(e)
+            self._ends.append(end)
+        self._data += self.codec.compress(b"".join(encoded))
+        self._block_starts.append(len(self._data))
+
+    def _block(self, b):
+        block = self._cache.get(b)
+        if block is None:
+            block = self.codec.decompress(bytes(self._data[self._block_starts[b]:self._block_starts[b + 1]]))
+            self._cache[b] = block
+            if len(self._cache) > self._cache_blocks:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(b)
+        return block
+
+    def get(self, review_id):
+        """Text of one review; raises IndexError for an unknown id"""
+        if review_id < 0:
+            raise IndexError(review_id)
+        with self._lock:
+            compressed = len(self._ends)
+            if review_id >= compressed:
+                return self._tail[review_id - compressed]
+            block = self._block(review_id // self.block_size)
+            start = self._ends[review_id - 1] if review_id % self.block_size else 0
+            return block[start:self._ends[review_id]].decode("utf-8")
+
+    def iter_blocks(self):
+        """
+        Yield (id of the first text, texts) for every block in id order, the texts not yet in a block last
+        Blocks are decompressed one at a time as the caller goes and are not put in the cache.
+        """
+        with self._lock:
+            n_blocks = len(self._block_starts) - 1
+            tail_start, tail = len(self._ends), list(self._tail)
+        for b in range(n_blocks):
+            first = b * self.block_size
+            with self._lock:  # _data may be reallocated by extend()
+                data = bytes(self._data[self._block_starts[b]:self._block_starts[b + 1]])
+                ends = self._ends[first:first + self.block_size].tolist()
+            block = self.codec.decompress(data)
+            yield first, [block[start:end].decode("utf-8") for start, end in zip([0] + ends[:-1], ends)]
+        if tail:
+            yield tail_start, tail
+
+    def get_many(self, review_ids):
+        """Texts of several reviews, in the given order"""
+        # reading in id order decompresses each block once
+        texts = {i: self.get(i) for i in sorted(set(review_ids))}
+        return [texts[i] for i in review_ids]
+
+    @property
+    def nbytes(self):
+        """Approximate memory held, excluding the block cache"""
+        dict_size = len(self.codec.dictionary) if self.codec is not None else 0
+        return (len(self._data) + self._block_starts.itemsize * len(self._block_starts)
+                + self._ends.itemsize * len(self._ends) + sum(len(t) for t in self._tail) + dict_size)
+
+    def __len__(self):
+        return len(self._ends) + len(self._tail)
@@ -0,0 +1,198 @@
+from array import array
+import csv
+import io
+import os
+import threading
+import numpy as np
+import pandas as pd
+from autocomplete import normalize_title
+from file_utils import atomic_write, prefix_fingerprint
+
+"""
+Sidecar index of where each movie's rows are in a review CSV
+
+For every normalized title the index keeps the byte ranges of its rows
+(consecutive rows of the same movie share one range), so a loader can seek
+to one movie's rows and parse only those. The index is saved next to the
+CSV as <csv>.titles.npz, built by the ETL and extended when rows are
+appended: it remembers how much of the file it covers and a fingerprint of
+that part, so appended bytes are scanned on their own and a rewritten file
+is indexed again from scratch.
+
+An index held by a long-running process (see DatasetStore.title_index) can
+be read by several threads while one of them updates it.
+"""
+
+INDEX_SUFFIX = ".titles.npz"
+
+
+def index_path(csv_file):
+    return str(csv_file) + INDEX_SUFFIX
+
+
+def iter_rows(data, start):
+    """
+    Yield (start offset, end offset, row bytes) of each complete CSV row in data
+    A newline inside a quoted field does not end a row, and a last row without a
+    newline is not complete yet (it may still be being written). data begins at file offset start.
+    """
+    row_start, quotes = 0, 0
+    pos = 0
+    while pos < len(data):
+        end = data.find(b"\n", pos)
+        if end < 0:
+            return
+        end += 1
+        quotes += data.count(b'"', pos, end)
+        pos = end
+        if quotes % 2 == 0:
+            yield start + row_start, start + end, data[row_start:end]
+            row_start, quotes = end, 0
+
+
+class TitleOffsetIndex:
+    def __init__(self, title_column="movie_title"):
+        self.title_column = title_column
+        self._lock = threading.Lock()  # held by update() and while readers look up ranges
+        self._reset()
+
+    def _reset(self):
+        self.header = b""  # header line, put in front of the ranges read
+        self.covered = 0  # bytes of the file indexed so far
+        self.fingerprint = None  # prefix_fingerprint of the covered bytes
+        self.rows = 0  # rows indexed
+        self._ranges = {}  # {normalized title: array of start, end, start, end, ...}
+        self._last = None  # title of the last indexed row, whose range may grow
+
+    def _scan(self, csv_file):
+        """Index the rows after self.covered"""
+        with open(csv_file, "rb") as f:
+            if not self.covered:
+                self.header = f.readline()
+                columns = next(csv.reader([self.header.decode("utf-8")]))
+                if self.title_column not in columns:
+                    raise ValueError(f"No {self.title_column!r} column in {csv_file}")
+                self.covered = len(self.header)
+            f.seek(self.covered)
+            data = f.read()
+
+        columns = next(csv.reader([self.header.decode("utf-8")]))
+        title_idx = columns.index(self.title_column)
+        covered = self.covered
+        for start, end, row in iter_rows(data, self.covered):
+            covered = end
+            fields = next(csv.reader([row.decode("utf-8")]), [])
+            if len(fields) <= title_idx:
+                continue  # blank line
+            title = normalize_title(fields[title_idx])
+            ranges = self._ranges.setdefault(title, array("q"))
+            if title == self._last and ranges[-1] == start:
+                ranges[-1] = end  # same movie as the row before: grow its range
+            else:
+                ranges.extend((start, end))
+            self._last = title
+            self.rows += 1
+        self.covered = covered  # an unfinished last row is left for the next update
+        self.fingerprint = prefix_fingerprint(csv_file, self.covered)
+
+    def update(self, csv_file):
+        """
+        Bring the index up to date with csv_file
+        Returns True if it changed: only appended bytes are scanned, unless the file was rewritten.
+        """
+        size = os.path.getsize(csv_file)
+        if size == self.covered and self.fingerprint == prefix_fingerprint(csv_file, size):
+            return False
+        with self._lock:
+            if size < self.covered or self.fingerprint != prefix_fingerprint(csv_file, self.covered):
+                self._reset()  # rewritten: start over
+            self._scan(csv_file)
+        return True
+
+    def titles(self):
+        """Sorted normalized titles"""
+        with self._lock:
+            return sorted(self._ranges)
+
+    def ranges(self, title):
+        """Byte ranges [(start, end), ...] of a movie's rows, in file order"""
+        with self._lock:
+            flat = self._ranges.get(normalize_title(title), array("q"))
+            return list(zip(flat[::2], flat[1::2]))
+
+    def read(self, csv_file, titles, **read_csv_kwargs):
+        """Parse only the rows of the given movies (file order); keyword arguments go to pandas.read_csv"""
+        with self._lock:  # the header and the ranges of one version of the index
+            header = self.header
+            flat = [self._ranges.get(t, array("q")) for t in set(map(normalize_title, titles))]
+            ranges = sorted(r for f in flat for r in zip(f[::2], f[1::2]))
+        parts = [header]
+        with open(csv_file, "rb") as f:
+            for start, end in ranges:
+                f.seek(start)
+                part = f.read(end - start)
+                parts.append(part)
+        return pd.read_csv(io.BytesIO(b"".join(parts)), **read_csv_kwargs)
+
+    def save(self, path):
+        with self._lock, atomic_write(path, "wb") as f:
+            titles = list(self._ranges)
+            np.savez(
+                f,
+                titles=np.array(titles, dtype=str),
+                lengths=np.array([len(self._ranges[t]) for t in titles], dtype=np.int64),
+                ranges=np.concatenate([np.frombuffer(self._ranges[t], dtype=np.int64) for t in titles])
+                if titles else np.zeros(0, dtype=np.int64),
+                header=np.frombuffer(self.header, dtype=np.uint8),
+                meta=np.array([self.title_column, self.fingerprint or "", self._last or ""]),
+                counts=np.array([self.covered, self.rows], dtype=np.int64),
+            )
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved index, or None if it is missing or unreadable"""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                title_column, fingerprint, last = data["meta"].tolist()
+                index = cls(title_column)
+                index.header = data["header"].tobytes()
+                index.covered, index.rows = data["counts"].tolist()
+                index.fingerprint = fingerprint or None
+                index._last = last or None
+                flat = data["ranges"]
+                offsets = np.concatenate(([0], np.cumsum(data["lengths"])))
+                for i, title in enumerate(data["titles"].tolist()):
+                    index._ranges[title] = array("q", flat[offsets[i]:offsets[i + 1]].tobytes())
+        except (OSError, KeyError, ValueError):
+            return None
+        return index
+
+    def __len__(self):
+        return len(self._ranges)
+
+
+def update_index(csv_file, title_column="movie_title"):
+    """Build or extend the sidecar index of csv_file and save it if it changed; returns the index"""
+    path = index_path(csv_file)
+    index = TitleOffsetIndex.load(path)
+    if index is None or index.title_column != title_column:
+        index = TitleOffsetIndex(title_column)
+    if index.update(csv_file):
+        try:
+            index.save(path)
+        except OSError:
+            pass  # read-only location: the index still serves this process
+    return index
+
+
+def open_index(csv_file, title_column="movie_title"):
+    """
+    The up-to-date sidecar index of csv_file, for reading single movies with index.read()
+    Returns None when the file has no index (callers then read the whole file).
+    """
+    if not os.path.exists(index_path(csv_file)):
+        return None
+    try:
+        return update_index(csv_file, title_column)
+    except ValueError:  # no title column
+        return None
@@ -40,8 +40,9 @@ def get_all_movie_names(csv_file="datas/cleaned_reviews.csv"):
     print(f"Sample movies: {movie_names[:10]}")
     return movie_names
 
-def suggest_movie_name(movie_name, csv_file="datas/cleaned_reviews.csv"):
-    movie_list = get_all_movie_names(csv_file)
+def suggest_movie_name(movie_name, csv_file="datas/cleaned_reviews.csv", movie_list=None):
+    if movie_list is None:
+        movie_list = get_all_movie_names(csv_file)
     if not movie_list:
         return None
     best_match, score = process.extractOne(movie_name, movie_list)
@@ -1,9 +1,23 @@
 import pandas as pd
 
 
+def split_genres(value):
+    """Split a comma-separated genres cell into a list of clean genre names"""
+    if not isinstance(value, str):
+        return []
+    return [g.strip() for g in value.split(",") if g.strip()]
+
+
+COLUMNS = ["movie_title", "genres"]
+
+
 class MovieViewer:
-    def __init__(self, filepath):
-        self.df = pd.read_csv(filepath)
+    def __init__(self, filepath=None, df=None):
+        """Read the reviews from filepath, or use an already loaded df; only titles and genres are kept"""
+        if df is None:
+            df = pd.read_csv(filepath, usecols=lambda column: column in COLUMNS)
+        # reindex copies every column, so a frame that already has just these columns is used as it is
+        self.df = df if df.columns.tolist() == COLUMNS else df.reindex(columns=COLUMNS)
 
     def get_all_movies(self):
         """Return list of all unique movies with their genres"""
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from file_utils import atomic_write, prefix_fingerprint
+
+"""
+Versioned snapshot of the derived analytics state, for fast restarts
+
+Scoring the corpus is by far the slowest part of starting the app. After a
+build, the scores, explanation hits and term counts are written to a single
+file: a small JSON header followed by 64-byte aligned raw arrays. At startup
+the file is memory-mapped and the arrays are used in place, so loading costs
+little more than reading the header.
+
+The header records what the state was built from: the review CSV (its size
+and a fingerprint of its contents up to that size) and the lexicon (content
+hash). A changed lexicon or a rewritten CSV invalidates the snapshot; rows
+appended to the CSV since are simply scored on top of it.
+"""
+
+MAGIC = b"MRGWARM\0"
+FORMAT_VERSION = 2  # 2: explanation weights are int16
+ALIGN = 64
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def source_state(csv_file, csv_size, dict_path):
+    return {
+        "csv_file": os.path.abspath(csv_file),
+        "csv_size": csv_size,
+        "csv_fingerprint": prefix_fingerprint(csv_file, csv_size),
+        "lexicon_sha256": file_sha256(dict_path),
+    }
+
+
+def write_snapshot(path, meta, arrays):
+    """Write meta (JSON-serialisable) and named numpy arrays to one file"""
+    layout, offset = {}, 0
+    for name, a in arrays.items():
+        a = np.ascontiguousarray(a)
+        arrays[name] = a
+        layout[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+        offset = _align(offset + a.nbytes)
+    header = json.dumps({"version": FORMAT_VERSION, "meta": meta, "arrays": layout}).encode("utf-8")
+    data_start = _align(len(MAGIC) + 8 + len(header))
+
+    with atomic_write(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for name, a in arrays.items():
+            f.write(b"\0" * (data_start + layout[name]["offset"] - f.tell()))
+            f.write(a.tobytes())
+
+
+def read_snapshot(path):
+    """Return (meta, {name: read-only array view of the memory-mapped file}), or None if unreadable"""
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            header_len = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_len).decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+    if header.get("version") != FORMAT_VERSION:
+        return None
+
+    data_start = _align(len(MAGIC) + 8 + header_len)
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        start = data_start + spec["offset"]
+        arrays[name] = buffer[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+    return header["meta"], arrays
+
+
+def save_analytics(path, analytics, csv_file, csv_size, dict_path):
+    """
+    Write the derived state of analytics (built from the first csv_size bytes of csv_file)
+    The snapshot covers len(analytics.explanations) reviews.
+    """
+    scores = analytics.scores
+    title_codes, titles = pd.factorize(scores["Movie Title"])
+    genre_codes, genres = pd.factorize(scores["Genres"])
+    arrays = {
+        "review_id": scores["Review ID"].to_numpy(dtype=np.int64),
+        "score": scores["Average Score"].to_numpy(dtype=np.float64),
+        "title_code": title_codes.astype(np.int32),
+        "genres_code": genre_codes.astype(np.int32),
+    }
+    arrays.update({"expl_" + k: v for k, v in analytics.explanations.arrays().items()})
+    arrays.update({"terms_" + k: v for k, v in analytics.term_counts.arrays().items()})
+    meta = {
+        "source": source_state(csv_file, csv_size, dict_path),
+        "min_reviews": analytics.min_reviews,
+        "n_reviews": len(analytics.explanations),
+        "titles": titles.tolist(),
+        "genres": genres.tolist(),
+        "explanation_terms": analytics.explanations.terms,
+        "term_movies": analytics.term_counts.movies,
+    }
+    write_snapshot(path, meta, arrays)
+
+
+def load_analytics(path, processor, csv_file, dict_path, min_reviews=5):
+    """
+    Restore Analytics from a snapshot written by save_analytics
+    Returns (analytics, number of reviews covered) or None if the snapshot is missing or stale.
+    Reviews after that number still have to be added with analytics.add_reviews().
+    """
+    from analytics import Analytics
+    from explanations import ExplanationStore
+    from term_stats import MovieTermCounts
+
+    if not os.path.exists(path):
+        return None
+    snapshot = read_snapshot(path)
+    if snapshot is None:
+        return None
+    meta, arrays = snapshot
+    source = meta["source"]
+    if (meta["min_reviews"] != min_reviews
+            or source["csv_file"] != os.path.abspath(csv_file)
+            or os.path.getsize(csv_file) < source["csv_size"]
+            or prefix_fingerprint(csv_file, source["csv_size"]) != source["csv_fingerprint"]
+            or file_sha256(dict_path) != source["lexicon_sha256"]):
+        return None
+
+    titles = np.array(meta["titles"], dtype=object)
+    genres = np.array(meta["genres"] + [np.nan], dtype=object)  # code -1 (no genres) picks the NaN
+    scores = pd.DataFrame({
+        "Review ID": arrays["review_id"],
+        "Movie Title": titles[arrays["title_code"]],
+        "Genres": genres[arrays["genres_code"]],
+        "Average Score": arrays["score"],
+    })
+    explanations = ExplanationStore.from_arrays(
+        meta["explanation_terms"], arrays["expl_review_ptr"], arrays["expl_sentence_counts"],
+        arrays["expl_term_ids"], arrays["expl_offsets"], arrays["expl_weights"]
+    )
+    term_counts = MovieTermCounts.from_arrays(
+        processor.sentiment_dict, meta["term_movies"],
+        arrays["terms_indptr"], arrays["terms_indices"], arrays["terms_data"]
+    )
+    analytics = Analytics.restore(processor, scores, explanations, term_counts, min_reviews=min_reviews)
+    return analytics, meta["n_reviews"]
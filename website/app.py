@@ -1,22 +1,260 @@
-from flask import Flask, request, jsonify, render_template
-from pathlib import Path
+from flask import Flask, request, jsonify, render_template, g
 import sys
 import os
+import threading
+import hmac
+import math
+import re
+from itertools import islice
 import pandas as pd
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from search import search_reviews
-from user_input import check_review_exists, save_to_csv, suggest_movie_name, get_all_movie_names
+from search import iter_snapshot_matches
+from user_input import suggest_movie_name
 from sliding_window import get_sentiment_windows
-from view_movies import MovieViewer
 from movie_comparison import compare_movies 
+from review_index import ReviewIndex
+from analytics import Analytics
+from distributions import DEFAULT_QUANTILES
+from warm_start import load_analytics, save_analytics
+from explanations import highlight
+from autocomplete import TitleAutocomplete
+from bulk_import import parse_batch, plan_import
+from dataset import DatasetStore
+from autocomplete import normalize_title
+from task_pool import BoundedExecutor, Overloaded, DeadlineExceeded
+from profiling import SamplingProfiler
+from text_processing import TextProcessor
+from jobs import JobStore, JobWorkers, JOB_TYPES
+from responses import FastJSONProvider, compress_response, parse_fields, parse_page, paginate
+from responses import encode_cursor, decode_cursor
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
-CSVPATH = Path("../datas/cleaned_reviews.csv")
+app.json = FastJSONProvider(app)  # compact output, numpy values serialised directly
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # goes up one folder
-CSV_PATH = os.path.join(BASE_DIR, "datas", "cleaned_reviews.csv")
-movie_viewer = MovieViewer(str(CSV_PATH))
+# REVIEWS_CSV serves (and appends to) another review file, e.g. a scratch copy for load tests
+CSV_PATH = os.environ.get("REVIEWS_CSV") or os.path.join(BASE_DIR, "datas", "cleaned_reviews.csv")
+DICT_PATH = os.path.join(BASE_DIR, "datas", "AFINN-en-165.txt")
+processor = TextProcessor(DICT_PATH)
+
+# Requests read from one snapshot for their whole duration; writers publish a new one.
+# write_lock only serialises writers (check-then-append), readers never take it.
+store = DatasetStore(CSV_PATH)
+write_lock = threading.Lock()
+title_autocomplete = TitleAutocomplete().build(store.current().df)
+analytics = None  # scored corpus and derived stats, built on first use, see get_analytics()
+review_index = None  # similar-reviews index, built on first use and extended as reviews arrive
+# Building and extending analytics and review_index happen under build_lock, from a snapshot, never
+# under write_lock; *_rows count the dataset rows each has taken in, see catch_up(). Writes only
+# append: the reviews they add are taken in by a background thread, see request_catch_up().
+build_lock = threading.Lock()
+analytics_rows = index_rows = 0
+catch_up_needed = threading.Event()
+catch_up_thread = None
+catch_up_thread_lock = threading.Lock()
+# Analytics state is saved here after each build and memory-mapped back on the next start,
+# see warm_start.py. An empty WARM_START_PATH disables it.
+WARM_START_PATH = os.environ.get("WARM_START_PATH", os.path.join(BASE_DIR, "datas", "analytics.snapshot"))
+
+# CPU-heavy routes run here so they cannot occupy every Flask worker thread
+heavy_pool = BoundedExecutor(
+    max_workers=int(os.environ.get("HEAVY_POOL_WORKERS", 2)),
+    max_queue=int(os.environ.get("HEAVY_POOL_QUEUE", 8))
+)
+HEAVY_ROUTE_TIMEOUT = float(os.environ.get("HEAVY_ROUTE_TIMEOUT", 10))
+
+# Background jobs (full rescoring and export, shard rebuilds) run in worker processes, see jobs.py.
+# JOB_WORKERS=0 leaves them to an external "python jobs.py worker".
+JOBS_DB = os.environ.get("JOBS_DB", os.path.join(BASE_DIR, "datas", "jobs.sqlite3"))
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 1))
+job_store = JobStore(JOBS_DB)
+job_workers = None
+job_workers_lock = threading.Lock()
+
+
+def run_heavy(name, fn, *args, **kwargs):
+    """Run fn on the heavy pool; returns (result, None) or (None, error response)"""
+    profiler = g.get('profiler')
+    if profiler is not None:
+        fn = profiler.wrap(fn)  # follow the work onto the pool thread
+    try:
+        return heavy_pool.run(name, fn, *args, timeout=HEAVY_ROUTE_TIMEOUT, **kwargs), None
+    except Overloaded:
+        response = jsonify({"error": "Server busy, please retry shortly."})
+        response.headers['Retry-After'] = '1'
+        return None, (response, 503)
+    except DeadlineExceeded:
+        return None, (jsonify({"error": "Request took too long and was cancelled."}), 504)
+
+
+def get_review_index():
+    """Similar-reviews index, built once; later reviews are added to it as they arrive"""
+    global review_index, index_rows
+    if review_index is None:
+        with build_lock:
+            if review_index is None:
+                snapshot = store.current()
+                index = ReviewIndex().build(snapshot.with_text(), texts=snapshot.texts)
+                review_index, index_rows = index, len(snapshot)
+                _catch_up()  # rows appended while it was being built
+    return review_index
+
+
+def get_analytics():
+    """Score the whole corpus once; later reviews are added incrementally as they arrive"""
+    global analytics, analytics_rows
+    if analytics is None:
+        with build_lock:
+            if analytics is None:
+                snapshot = store.current()
+                analytics, analytics_rows = load_or_build_analytics(snapshot), len(snapshot)
+                _catch_up()
+    return analytics
+
+
+def _catch_up():
+    """Add the rows appended since analytics and the review index last took rows in; call with build_lock held"""
+    global analytics_rows, index_rows
+    snapshot = store.current()
+    if analytics is not None and analytics_rows < len(snapshot):
+        analytics.add_reviews(snapshot.with_text(slice(analytics_rows, None)), start_id=analytics_rows)
+        analytics_rows = len(snapshot)
+    if review_index is not None and index_rows < len(snapshot):
+        review_index.add_reviews(snapshot.with_text(slice(index_rows, None)))
+        index_rows = len(snapshot)
+
+
+def catch_up():
+    """Bring analytics and the review index up to the latest snapshot (waits for a build in progress)"""
+    with build_lock:
+        _catch_up()
+
+
+def catch_up_loop():
+    while True:
+        catch_up_needed.wait()
+        catch_up_needed.clear()
+        try:
+            catch_up()
+        except Exception:  # the rows are not marked as taken in, so the next request retries them
+            app.logger.exception("Could not add new reviews to the analytics")
+
+
+def request_catch_up():
+    """Have the background thread take newly appended reviews into analytics and the review index"""
+    global catch_up_thread
+    if catch_up_thread is None:
+        with catch_up_thread_lock:
+            if catch_up_thread is None:
+                catch_up_thread = threading.Thread(target=catch_up_loop, name="catch-up", daemon=True)
+                catch_up_thread.start()
+    catch_up_needed.set()
+
+
+def save_warm_start(result, snapshot):
+    try:
+        save_analytics(WARM_START_PATH, result, store.csv_file, snapshot.source_stat[0], DICT_PATH)
+    except OSError as e:
+        app.logger.warning("Could not write warm-start file %s: %s", WARM_START_PATH, e)
+
+
+def load_or_build_analytics(snapshot):
+    """Restore the analytics from the warm-start file when it is still valid, otherwise score everything"""
+    warm_start = bool(WARM_START_PATH) and snapshot.source_stat is not None
+    if warm_start:
+        restored = load_analytics(WARM_START_PATH, processor, store.csv_file, DICT_PATH, min_reviews=5)
+        if restored is not None:
+            result, covered = restored
+            if covered < len(snapshot):  # reviews appended to the CSV since it was written
+                result.add_reviews(snapshot.with_text(slice(covered, None)), start_id=covered)
+                save_warm_start(result, snapshot)
+            return result
+    result = Analytics(processor, min_reviews=5).build(snapshot.with_text())
+    if warm_start:
+        save_warm_start(result, snapshot)
+    return result
+
+
+def record_new_titles(titles):
+    """Add the titles of appended rows to the autocomplete (analytics and the review index use catch_up())"""
+    for title in titles:
+        title_autocomplete.add(title)
+
+
+def sync_with_csv():
+    """Take in reviews other processes appended to the CSV; call with write_lock held, before writing"""
+    global analytics, review_index, title_autocomplete
+    snapshot, start = store.refresh()
+    if start == 0:  # the file was rewritten: derived structures are rebuilt on next use
+        with build_lock:  # not left half-updated by a catch-up still reading the old rows
+            analytics = review_index = None
+        title_autocomplete = TitleAutocomplete().build(snapshot.df)
+    elif start is not None:
+        record_new_titles(snapshot.df['movie_title'].iloc[start:].dropna().tolist())
+        request_catch_up()
+
+
+def job_params(kind):
+    """Parameters for a job kind; paths are fixed here, never taken from the request"""
+    params = {"csv_file": store.csv_file, "dict_path": DICT_PATH}
+    if kind == "rescore":
+        params["scores_file"] = os.path.join(BASE_DIR, "datas", "review_scores.csv")
+    elif kind == "partition":
+        params["shard_dir"] = os.path.join(BASE_DIR, "datas", "shards")
+    return params
+
+
+def enqueue_job(kind, delay=0.0, coalesce=False):
+    """Queue a background job, starting the worker processes on first use"""
+    global job_workers
+    if JOB_WORKERS > 0 and job_workers is None:
+        with job_workers_lock:
+            if job_workers is None:
+                # separate interpreters that never import this module (see JobWorkers)
+                job_workers = JobWorkers(JOBS_DB, workers=JOB_WORKERS)
+    return job_store.enqueue(kind, job_params(kind), delay=delay, coalesce=coalesce)
+
+
+# Profiling: PROFILE_ROUTES=1 profiles every request. With PROFILE_SECRET set, a request whose
+# X-Profile header carries that secret is profiled on its own; without it the header is ignored.
+PROFILE_ROUTES = os.environ.get("PROFILE_ROUTES") == "1"
+PROFILE_SECRET = os.environ.get("PROFILE_SECRET", "")
+
+
+def profile_requested():
+    header = request.headers.get('X-Profile')
+    return bool(PROFILE_SECRET) and header is not None and hmac.compare_digest(header.encode(), PROFILE_SECRET.encode())
+
+
+@app.before_request
+def start_profiling():
+    if PROFILE_ROUTES or profile_requested():
+        g.profiler = SamplingProfiler().start()
+
+
+@app.after_request
+def finish_profiling(response):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop()
+        name = (request.endpoint or 'unknown').replace('.', '_')
+        # only the file name: the server's directory layout is none of the client's business
+        response.headers['X-Profile-File'] = os.path.basename(profiler.write(f"route-{name}"))
+    return response
+
+
+@app.after_request
+def compress(response):
+    return compress_response(response)
+
+
+@app.teardown_request
+def stop_profiling(exc):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:  # after_request was skipped because of an error
+        profiler.stop()
+
 
 @app.route('/')
 def index():
@@ -40,16 +278,34 @@ def sentiment_analysis():
     }
     return jsonify(result)
 
+SEARCH_FIELDS = ['movie_title', 'review_content']
+MOVIE_FIELDS = ['movie_title', 'genres']
+
+
 @app.route('/search', methods=['GET'])
 def search():
     q = request.args.get('q', '').strip()
     if not q:
         return jsonify({"error": "No query provided"}), 400
     try:
-        df = search_reviews(str(CSVPATH), q)
-    except FileNotFoundError:
-        return jsonify({"error": "CSV file not found"}), 500
-    records = df.head(20)[['movie_title', 'review_content']].fillna('').to_dict(orient='records')
+        page, page_size = parse_page(request.args, default_size=20, max_size=100)
+        fields = parse_fields(request.args.get('fields'), SEARCH_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def run_search(snapshot):
+        # only the texts up to the end of the page are decompressed, and only the page's rows are kept
+        start = (page - 1) * page_size
+        ids = list(islice(iter_snapshot_matches(snapshot, q), start, start + page_size))
+        return snapshot.with_text(ids)[fields].fillna('').to_dict(orient='records')
+
+    try:
+        re.compile(q.lower())
+    except re.error as e:
+        return jsonify({"error": f"Invalid search pattern: {e}"}), 400
+    records, error = run_heavy('search', run_search, store.current())
+    if error:
+        return error
     return jsonify(records)
 
 @app.route('/add_review', methods=['POST'])
@@ -62,12 +318,16 @@ def add_review():
     if not movie_name or not review:
         return jsonify({"error": "Missing movie_name or review"}), 400
 
-    movie_list = get_all_movie_names(str(CSVPATH))
+    snapshot = store.current()
+    movie_list = snapshot.movie_titles()
 
-    movie_exists = any(m.lower() == movie_name.lower() for m in movie_list)
+    matches = [m for m in movie_list if normalize_title(m) == normalize_title(movie_name)]
+    movie_exists = bool(matches)
+    if movie_exists:
+        movie_name = matches[0]
 
     if not movie_exists:
-        suggested = suggest_movie_name(movie_name)
+        suggested = suggest_movie_name(movie_name, movie_list=movie_list)
         if suggested and suggested.lower() != movie_name.lower():
             if confirm != 'yes':
                 return jsonify({
@@ -81,22 +341,73 @@ def add_review():
     if not movie_exists:
         return jsonify({"error": "Movie name not recognized. Please correct it."}), 400
 
-    if check_review_exists(movie_name, review):
-        return jsonify({"message": "Review already exists"}), 409
-
-    save_to_csv(movie_name, review)
+    with write_lock:
+        sync_with_csv()
+        # re-check against the latest snapshot now that no other writer can run
+        if store.current().has_review(movie_name, review):
+            return jsonify({"message": "Review already exists"}), 409
+        snapshot = store.current()
+        new_rows = [{
+            "movie_title": movie_name,
+            "review_content": review,
+            "genres": snapshot.movie_genres().get(movie_name)
+        }]
+        store.append(new_rows)
+        record_new_titles([movie_name])
+    request_catch_up()
 
     return jsonify({"message": "Review added successfully"})
 
 
+@app.route('/bulk_import', methods=['POST'])
+def bulk_import():
+    fmt = request.args.get('format') or ('csv' if 'csv' in (request.content_type or '') else 'ndjson')
+    if fmt not in ('ndjson', 'csv'):
+        return jsonify({"error": "format must be 'ndjson' or 'csv'"}), 400
+    try:
+        rows = parse_batch(request.get_data(as_text=True), fmt)
+    except Exception as e:
+        return jsonify({"error": f"Could not parse batch: {e}"}), 400
+    if not rows:
+        return jsonify({"error": "Empty batch"}), 400
+
+    accept = request.args.get('accept_suggestions') == 'yes'
+    with write_lock:
+        sync_with_csv()
+        snapshot = store.current()
+        results, new_rows = plan_import(rows, snapshot.df, accept_suggestions=accept,
+                                        has_review=snapshot.has_review)
+        store.append(new_rows)
+        record_new_titles([row["movie_title"] for row in new_rows])
+
+    added = sum(1 for r in results if r["status"] == "added")
+    if added:
+        request_catch_up()
+    return jsonify({"added": added, "total": len(results), "results": results})
+
+
+def build_movie_list(df):
+    df = df.drop_duplicates(subset=['movie_title'])
+    df = df.reindex(columns=MOVIE_FIELDS).astype(object)
+    return df.where(pd.notnull(df), None).to_dict(orient='records')
+
+
 @app.route('/all_movies')
 def all_movies():
+    """All movies; ?page=&page_size= pages the list and ?fields=movie_title keeps only some fields"""
     try:
-        df = pd.read_csv(CSV_PATH)
-        df = df.drop_duplicates(subset=['movie_title'])
-        df = df.where(pd.notnull(df), None)
-        movies = df[['movie_title', 'genres']].to_dict(orient='records')
-        return jsonify({'movies': movies})
+        fields = parse_fields(request.args.get('fields'), MOVIE_FIELDS)
+        page, page_size = parse_page(request.args, default_size=100, max_size=500)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        movies = store.current().cached("all_movies", build_movie_list)
+        if 'page' not in request.args and 'page_size' not in request.args:
+            if len(fields) < len(MOVIE_FIELDS):
+                movies = [{f: m[f] for f in fields} for m in movies]
+            return jsonify({'movies': movies})
+        result = paginate(movies, page, page_size, fields)
+        return jsonify({'movies': result.pop('items'), **result})
     except Exception as e:
         print("Error in /all_movies:", e)
         return jsonify({'error': str(e)}), 500
@@ -118,6 +429,20 @@ def all_movies():
 #     )
 #     return jsonify(result)
 
+def positive_float_arg(name):
+    """Optional positive number from the query string: None when absent, ValueError when invalid"""
+    raw = request.args.get(name, '')
+    if not raw:
+        return None
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+    if not math.isfinite(value) or value <= 0:
+        raise ValueError(f"{name} must be a positive number")
+    return value
+
+
 @app.route('/compare_movies')
 def compare_movies_route():
     movie1 = request.args.get('movie1')
@@ -126,6 +451,21 @@ def compare_movies_route():
     if not movie1 or not movie2:
         return jsonify({"error": "Please provide both movie names."}), 400
 
+    mode = request.args.get('mode', 'exact')
+    if mode not in ('exact', 'approximate'):
+        return jsonify({"error": "mode must be 'exact' or 'approximate'"}), 400
+    try:
+        sample_size = int(request.args.get('sample_size', 200))
+    except ValueError:
+        return jsonify({"error": "sample_size must be an integer"}), 400
+    if sample_size < 2:
+        return jsonify({"error": "sample_size must be at least 2"}), 400
+    try:
+        target_error = positive_float_arg('target_error')
+        time_budget = positive_float_arg('time_budget')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         # Debug prints to Flask console
         print("=== /compare_movies called ===")
@@ -135,12 +475,22 @@ def compare_movies_route():
         dict_path = os.path.join(BASE_DIR, "datas", "AFINN-en-165.txt")
         print("dict_path:", dict_path, "exists?:", os.path.exists(dict_path))
 
-        result = compare_movies(
-            CSV_PATH,
+        # only the two movies' rows are read from the file, through the store's title index
+        result, error = run_heavy(
+            'compare_movies',
+            compare_movies,
+            store.csv_file,
             movie1,
             movie2,
-            dict_path=dict_path
+            dict_path=dict_path,
+            approximate=(mode == 'approximate'),
+            sample_size=sample_size,
+            target_error=target_error,
+            time_budget=time_budget,
+            title_index=store.title_index
         )
+        if error:
+            return error
 
         # Print a short summary of result to console for debugging
         if isinstance(result, dict):
@@ -158,5 +508,247 @@ def compare_movies_route():
         return jsonify({"error": str(e), "traceback": tb}), 500
 
 
+@app.route('/similar_reviews')
+def similar_reviews():
+    scope = request.args.get('scope') or None
+    try:
+        review_id = int(request.args.get('review_id', ''))
+        k = int(request.args.get('k', 10))
+    except ValueError:
+        return jsonify({"error": "review_id and k must be integers"}), 400
+    if scope not in (None, 'movie', 'genre'):
+        return jsonify({"error": "scope must be 'movie' or 'genre'"}), 400
+
+    index = get_review_index()
+    if not 0 <= review_id < index.n_docs:
+        return jsonify({"error": f"Unknown review id: {review_id}"}), 404
+
+    matches = index.similar(review_id, k=max(1, min(k, 100)), scope=scope)
+    return jsonify({
+        'review': index.review(review_id),
+        'similar': [dict(index.review(rid), similarity=round(sim, 4)) for rid, sim in matches]
+    })
+
+
+@app.route('/similar_movies')
+def similar_movies():
+    """Movies with the closest sentiment profiles to ?movie= (score histogram, positive/negative share, genres)"""
+    movie = request.args.get('movie', '').strip()
+    scope = request.args.get('scope') or None
+    if not movie:
+        return jsonify({"error": "No movie provided"}), 400
+    try:
+        k = max(1, min(int(request.args.get('k', 10)), 100))
+    except ValueError:
+        return jsonify({"error": "k must be an integer"}), 400
+    if scope not in (None, 'genre'):
+        return jsonify({"error": "scope must be 'genre'"}), 400
+
+    profiles = get_analytics().profiles
+    movie_title = profiles.find(movie)
+    if movie_title is None:
+        return jsonify({"error": f"Unknown movie: {movie}"}), 404
+    matches = profiles.similar(movie_title, k=k, scope=scope)
+    return jsonify({
+        'movie': profiles.profile(movie_title),
+        'similar': [{'movie_title': title, 'similarity': round(sim, 4), 'review_count': count}
+                    for title, sim, count in matches]
+    })
+
+
+@app.route('/leaderboard')
+def leaderboard_route():
+    try:
+        n = int(request.args.get('n', 5))
+    except ValueError:
+        return jsonify({"error": "n must be an integer"}), 400
+    n = max(1, min(n, 100))
+
+    board = get_analytics().leaderboard
+    return jsonify({
+        'min_reviews': board.min_reviews,
+        'top_movies': board.top(n).to_dict(orient='records'),
+        'worst_movies': board.worst(n).to_dict(orient='records')
+    })
+
+
+@app.route('/autocomplete')
+def autocomplete():
+    q = request.args.get('q', '')
+    try:
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    return jsonify({'suggestions': title_autocomplete.complete(q, limit=max(1, min(limit, 50)))})
+
+
+@app.route('/genre_sentiment')
+def genre_sentiment():
+    genre = request.args.get('genre')
+    summary = get_analytics().genres.summary()  # cached until the next review is added
+    if genre:
+        summary = [g for g in summary if g['genre'].lower() == genre.strip().lower()]
+        if not summary:
+            return jsonify({"error": f"Unknown genre: {genre}"}), 404
+    return jsonify({'genres': summary})
+
+
+@app.route('/top_terms')
+def top_terms():
+    """Most frequent positive/negative lexicon words of a movie (?movie=) or a genre (?genre=)"""
+    movie = request.args.get('movie', '').strip()
+    genre = request.args.get('genre', '').strip()
+    if bool(movie) == bool(genre):
+        return jsonify({"error": "Provide either movie or genre"}), 400
+    try:
+        k = max(1, min(int(request.args.get('k', 10)), 100))
+    except ValueError:
+        return jsonify({"error": "k must be an integer"}), 400
+
+    current = get_analytics()
+    if movie:
+        titles = [t for t in current.term_counts.movies if normalize_title(t) == normalize_title(movie)]
+        if not titles:
+            return jsonify({"error": f"Unknown movie: {movie}"}), 404
+        return jsonify(dict(current.term_counts.top_terms(titles, k), movie_title=titles[0]))
+
+    genres = {name.lower(): name for name in current.genres.movie_totals}
+    name = genres.get(genre.lower())
+    if name is None:
+        return jsonify({"error": f"Unknown genre: {genre}"}), 404
+    titles = list(current.genres.movie_totals[name])
+    return jsonify(dict(current.term_counts.top_terms(titles, k), genre=name, movie_count=len(titles)))
+
+
+@app.route('/movies/<path:title>/reviews')
+def movie_reviews(title):
+    """
+    One movie's reviews ordered by score: ?order=desc|asc, ?min_score=&max_score= (inclusive),
+    ?limit= and ?cursor= (next_cursor of the previous page)
+    """
+    order = request.args.get('order', 'desc')
+    if order not in ('desc', 'asc'):
+        return jsonify({"error": "order must be 'desc' or 'asc'"}), 400
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), 100))
+        min_score = float(request.args['min_score']) if request.args.get('min_score') else None
+        max_score = float(request.args['max_score']) if request.args.get('max_score') else None
+    except ValueError:
+        return jsonify({"error": "limit, min_score and max_score must be numbers"}), 400
+    after = None
+    if request.args.get('cursor'):
+        try:
+            score, review_id = decode_cursor(request.args['cursor'], 2)
+            after = (float(score), int(review_id))
+        except (TypeError, ValueError):
+            return jsonify({"error": "Invalid cursor"}), 400
+
+    index = get_analytics().movie_reviews
+    movie_title = index.find(title)
+    if movie_title is None:
+        return jsonify({"error": f"Unknown movie: {title}"}), 404
+    rows, total, next_after = index.page(movie_title, descending=(order == 'desc'), min_score=min_score,
+                                         max_score=max_score, after=after, limit=limit)
+
+    snapshot = store.current()  # read after the index, so it holds every review id on the page
+    texts = snapshot.review_texts([review_id for review_id, _ in rows])
+    return jsonify({
+        'movie_title': movie_title,
+        'order': order,
+        'total': total,
+        'reviews': [{'review_id': review_id, 'score': score, 'review_content': text}
+                    for (review_id, score), text in zip(rows, texts)],
+        'next_cursor': encode_cursor(next_after) if next_after else None,
+    })
+
+
+@app.route('/distribution')
+def distribution():
+    """
+    Score distribution (quantiles and a 1-point histogram) of a movie (?movie=), a genre (?genre=)
+    or, with neither, of all reviews; ?q=0.1,0.5,0.9 picks the quantiles
+    """
+    movie = request.args.get('movie', '').strip()
+    genre = request.args.get('genre', '').strip()
+    if movie and genre:
+        return jsonify({"error": "Provide either movie or genre, not both"}), 400
+    qs = DEFAULT_QUANTILES
+    if request.args.get('q'):
+        try:
+            qs = [float(q) for q in request.args['q'].split(',')]
+        except ValueError:
+            qs = None
+        if not qs or not all(0 <= q <= 1 for q in qs):
+            return jsonify({"error": "q must be comma-separated numbers between 0 and 1"}), 400
+
+    distributions = get_analytics().distributions
+    if movie:
+        name = distributions.find_movie(movie)
+        if name is None:
+            return jsonify({"error": f"Unknown movie: {movie}"}), 404
+        return jsonify(dict(distributions.movie(name).summary(qs), movie_title=name))
+    if genre:
+        name = distributions.find_genre(genre)
+        if name is None:
+            return jsonify({"error": f"Unknown genre: {genre}"}), 404
+        return jsonify(dict(distributions.genre(name).summary(qs), genre=name))
+    return jsonify(distributions.overall().summary(qs))
+
+
+@app.route('/explain')
+def explain():
+    try:
+        review_id = int(request.args.get('review_id', ''))
+    except ValueError:
+        return jsonify({"error": "review_id must be an integer"}), 400
+
+    snapshot = store.current()
+    explanations = get_analytics().explanations
+    if not 0 <= review_id < min(len(snapshot), len(explanations)):
+        return jsonify({"error": f"Unknown review id: {review_id}"}), 404
+
+    result = explanations.explain(review_id)
+    review = snapshot.text(review_id)
+    text = processor.preprocess_text(review) if isinstance(review, str) else ''
+    result['movie_title'] = snapshot.df['movie_title'].iloc[review_id]
+    result['review_content'] = text
+    result['highlighted'] = highlight(text, result['contributions'])
+    return jsonify(result)
+
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    data = request.get_json(silent=True) or {}
+    kind = data.get('kind')
+    if kind not in JOB_TYPES:
+        return jsonify({"error": f"kind must be one of: {', '.join(sorted(JOB_TYPES))}"}), 400
+    job_id = enqueue_job(kind, coalesce=bool(data.get('coalesce', True)))
+    response = jsonify({'job': job_store.get(job_id)})
+    response.headers['Location'] = f"/jobs/{job_id}"
+    return response, 202
+
+
+@app.route('/jobs')
+def list_jobs():
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), 200))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    return jsonify({'jobs': job_store.list(status=request.args.get('status'), limit=limit)})
+
+
+@app.route('/jobs/<int:job_id>')
+def get_job(job_id):
+    job = job_store.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job id: {job_id}"}), 404
+    return jsonify(job)
+
+
+@app.route('/pool_stats')
+def pool_stats():
+    return jsonify(heavy_pool.snapshot_stats())
+
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,129 @@
+import base64
+import gzip
+import json
+import numpy as np
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson  # optional: much faster serialisation, handles numpy arrays natively
+except ImportError:
+    orjson = None
+
+try:
+    import brotli  # optional: better compression than gzip for text
+except ImportError:
+    brotli = None
+
+"""
+Response helpers: fast numpy-aware JSON, compression, pagination (page numbers or cursors)
+and field selection
+"""
+
+
+def _default(o):
+    """Serialise numpy and pandas values that the json module does not know"""
+    if isinstance(o, np.generic):
+        return o.item()
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    if hasattr(o, "isoformat"):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Compact JSON that serialises numpy values directly; uses orjson when installed"""
+    sort_keys = False
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs.get("indent"):
+            return orjson.dumps(
+                obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            ).decode("utf-8")
+        kwargs.setdefault("separators", (",", ":"))
+        return super().dumps(obj, **kwargs)
+
+
+def compress_response(response, min_size=1024, gzip_level=6, brotli_quality=5):
+    """
+    Compress a text/JSON response with brotli or gzip, whichever the client accepts
+    Bodies smaller than min_size bytes are sent as they are.
+    """
+    if (response.direct_passthrough
+            or not 200 <= response.status_code < 300
+            or "Content-Encoding" in response.headers
+            or not (response.mimetype == "application/json" or response.mimetype.startswith("text/"))):
+        return response
+
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        body, encoding = brotli.compress(data, quality=brotli_quality), "br"
+    elif accepted["gzip"]:
+        body, encoding = gzip.compress(data, compresslevel=gzip_level), "gzip"
+    else:
+        return response
+
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def parse_fields(value, allowed):
+    """
+    Parse a "fields=a,b" query value
+    Returns the list of fields (all allowed fields when value is empty); raises ValueError for unknown ones.
+    """
+    if not value:
+        return list(allowed)
+    fields = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return fields
+
+
+def parse_page(args, default_size=50, max_size=500):
+    """Read page (1-based) and page_size from query args; raises ValueError when invalid"""
+    page = int(args.get("page", 1))
+    page_size = int(args.get("page_size", default_size))
+    if page < 1 or page_size < 1:
+        raise ValueError("page and page_size must be positive")
+    return page, min(page_size, max_size)
+
+
+def paginate(records, page, page_size, fields=None):
+    """Return one page of records, keeping only the given fields"""
+    start = (page - 1) * page_size
+    items = records[start:start + page_size]
+    if fields is not None:
+        items = [{f: r.get(f) for f in fields} for r in items]
+    return {
+        "total": len(records),
+        "page": page,
+        "page_size": page_size,
+        "pages": (len(records) + page_size - 1) // page_size,
+        "items": items,
+    }
+
+
+def encode_cursor(values):
+    """Opaque, URL-safe token for a keyset cursor (e.g. the (score, review id) of the last item of a page)"""
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, length):
+    """Inverse of encode_cursor; raises ValueError for a malformed token"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError("Invalid cursor")
+    return tuple(values)
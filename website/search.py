@@ -1,5 +1,9 @@
+import re
+import numpy as np
 import pandas as pd
 
+REGEX_CHARACTERS = set(".^$*+?{}[]\\|()")
+
 
 def search_reviews(filepath, keyword, title_column="movie_title", text_column="review_content"):
     """
@@ -7,7 +11,13 @@ def search_reviews(filepath, keyword, title_column="movie_title", text_column="r
     Returns a DataFrame of matches.
     """
     df = pd.read_csv(filepath, low_memory=False)
+    return search_reviews_df(df, keyword, title_column, text_column)
+
 
+def search_reviews_df(df, keyword, title_column="movie_title", text_column="review_content"):
+    """
+    Same as search_reviews, but on a DataFrame that is already loaded.
+    """
     # drop rows missing title or review
     df = df.dropna(subset=[title_column, text_column])
 
@@ -19,6 +29,33 @@ def search_reviews(filepath, keyword, title_column="movie_title", text_column="r
     return df[mask]
 
 
+def iter_snapshot_matches(snapshot, keyword, title_column="movie_title"):
+    """
+    Ids of the reviews of a DatasetSnapshot that search_reviews_df would return, in id order
+    Titles are matched once per movie, and review texts are decompressed one block at a time, only as far
+    as the caller keeps iterating. Raises re.error for an invalid pattern (the keyword is a regular
+    expression, as in str.contains).
+    """
+    keyword = (keyword or "").lower()
+    pattern = re.compile(keyword)
+    literal = not REGEX_CHARACTERS.intersection(keyword)
+    titles = snapshot.df[title_column]
+    matching = [code for code, title in enumerate(titles.cat.categories) if pattern.search(str(title).lower())]
+    codes = titles.cat.codes.to_numpy()
+    title_match = np.isin(codes, matching)
+    for first, texts in snapshot.texts.iter_blocks():
+        texts = texts[:len(snapshot) - first]  # the store may hold rows appended after the snapshot
+        if not texts:
+            return
+        last = first + len(texts)
+        # a block with no title match and without the keyword anywhere in its text is skipped whole
+        if literal and not title_match[first:last].any() and keyword not in "\n".join(texts).lower():
+            continue
+        for review_id, text in enumerate(texts, first):
+            if codes[review_id] >= 0 and text and (title_match[review_id] or pattern.search(text.lower())):
+                yield review_id
+
+
 if __name__ == "__main__":
     # Example usage
     filepath = "datas/cleaned_reviews.csv"